@@ -3,8 +3,13 @@
 Convert numbers from a file to binary and hexadecimal using basic algorithms.
 """
 
+import io
 import os
+import itertools
 import sys
+from collections import deque
+from functools import partial
+from multiprocessing import Pool
 
 # Add project root to path so utils can be imported when run as script
 _project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -12,11 +17,33 @@ if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
 # pylint: disable=wrong-import-position
-from utils.parse_numbers import read_and_parse_numbers
-from utils.run_main import run_timed_main
+from utils.parse_numbers import (
+    invalid_line_message, parse_number_lines, parse_numbers,
+    read_and_parse_numbers,
+)
+from utils.run_main import (
+    int_option, parse_cli, run_timed_file_main, run_timed_main
+)
 # pylint: enable=wrong-import-position
 
+# Re-export for tests
+__all__ = [
+    "parse_numbers", "to_binary", "to_hexadecimal", "render_conversions",
+    "record_widths", "record_header", "render_records", "read_record",
+    "run_conversions", "run_conversion_records", "run_conversions_parallel",
+    "line_chunks",
+]
+
 HEX_DIGITS = "0123456789ABCDEF"
+HEADER = "Number to Binary and Hexadecimal\n" + "=" * 40 + "\n"
+DEFAULT_CHUNK_SIZE = 50000
+SCAN_BLOCK_SIZE = 1 << 16
+RECORD_MAGIC = "CONVREC1"
+RECORD_FIELDS = ("value", "bits", "binary", "hex")
+USAGE = (
+    "Usage: python convert_numbers.py fileWithData.txt [output_dir]"
+    " [--workers N] [--chunk-size N] [--format text|records]"
+)
 
 
 def to_binary(num):
@@ -49,6 +76,82 @@ def to_hexadecimal(num):
     return "".join(digits)
 
 
+def render_conversions(numbers):
+    """
+    Render the text block for a list of numbers: one entry per number,
+    entries separated by a blank line, no trailing blank line.
+    """
+    blocks = []
+    for num in numbers:
+        bin_str = to_binary(num)
+        hex_str = to_hexadecimal(num)
+        blocks.append(
+            f"Number: {num}\n"
+            f"  Binary: {bin_str}\n"
+            f"  Hexadecimal: {hex_str}\n"
+        )
+    return "\n".join(blocks)
+
+
+def record_widths(numbers):
+    """
+    Column widths (value, bits, binary, hex) wide enough for every number,
+    computed from the magnitudes without converting each number.
+    """
+    max_bits = 1
+    value_width = 1
+    for num in numbers:
+        max_bits = max(max_bits, abs(int(num)).bit_length())
+        value_width = max(value_width, len(str(num)))
+    hex_width = (max_bits + 3) // 4
+    return value_width, len(str(max_bits)), max_bits, hex_width
+
+
+def record_header(count, widths):
+    """Index header line: magic, record count, record size and column widths."""
+    columns = " ".join(
+        f"{name}={width}" for name, width in zip(RECORD_FIELDS, widths)
+    )
+    return f"{RECORD_MAGIC} count={count} size={sum(widths) + 4} {columns}\n"
+
+
+def render_records(numbers, widths):
+    """
+    Render fixed-width records (value, bit length, binary, hex), one per line.
+    Columns are right-aligned and space separated, so every record has the
+    same size and record N starts at len(header) + N * size.
+    """
+    value_width, bits_width, bin_width, hex_width = widths
+    records = []
+    for num in numbers:
+        # |num| < 1 truncates to zero, which the basic algorithms render as ""
+        bin_str = to_binary(num) or "0"
+        hex_str = to_hexadecimal(num) or "0"
+        records.append(
+            f"{str(num):>{value_width}} {len(bin_str):>{bits_width}} "
+            f"{bin_str:>{bin_width}} {hex_str:>{hex_width}}\n"
+        )
+    return "".join(records)
+
+
+def read_record(path, index):
+    """
+    Read record `index` from a records file with one seek.
+    Return (value, bits, binary, hex); raises IndexError if out of range.
+    """
+    with open(path, "rb") as file:
+        header = file.readline().decode("ascii").split()
+        if not header or header[0] != RECORD_MAGIC:
+            raise ValueError(f"Not a conversion records file: {path}")
+        fields = dict(item.split("=") for item in header[1:])
+        if not 0 <= index < int(fields["count"]):
+            raise IndexError(f"Record {index} out of range")
+        size = int(fields["size"])
+        file.seek(file.tell() + index * size)
+        value, bits, bin_str, hex_str = file.read(size).decode("ascii").split()
+    return float(value), int(bits), bin_str, hex_str
+
+
 def run_conversions(input_path):
     """
     Read file, convert each number to binary and hex.
@@ -58,33 +161,211 @@ def run_conversions(input_path):
     if not numbers:
         return "No valid numbers found in file.\n", False
 
-    lines_out = ["Number to Binary and Hexadecimal", "=" * 40]
-    for num in numbers:
-        bin_str = to_binary(num)
-        hex_str = to_hexadecimal(num)
-        lines_out.append(f"Number: {num}")
-        lines_out.append(f"  Binary: {bin_str}")
-        lines_out.append(f"  Hexadecimal: {hex_str}")
-        lines_out.append("")
+    return HEADER + render_conversions(numbers), True
+
 
-    return "\n".join(lines_out), True
+def run_conversion_records(input_path):
+    """
+    Read file and render the compact fixed-width records format.
+    Return (results_text, success). Caller appends elapsed time.
+    """
+    numbers, _ = read_and_parse_numbers(input_path)
+    if not numbers:
+        return "No valid numbers found in file.\n", False
+
+    widths = record_widths(numbers)
+    return record_header(len(numbers), widths) + render_records(
+        numbers, widths
+    ), True
+
+
+def line_chunks(input_path, lines_per_chunk, block_size=SCAN_BLOCK_SIZE):
+    """
+    Yield (start, end) byte ranges of a file holding lines_per_chunk lines
+    each (the last one may hold fewer). Newlines are counted a block at a
+    time, so the file is never held in memory.
+    """
+    start = pos = lines = 0
+    with open(input_path, "rb") as file:
+        for block in iter(partial(file.read, block_size), b""):
+            offset = 0
+            while block.count(b"\n", offset) >= lines_per_chunk - lines:
+                # Smallest cut with the missing newlines in [offset, cut)
+                need = lines_per_chunk - lines
+                low, high = offset, len(block)
+                while low < high:
+                    mid = (low + high) // 2
+                    if block.count(b"\n", offset, mid) < need:
+                        low = mid + 1
+                    else:
+                        high = mid
+                yield start, pos + low
+                start = pos + low
+                offset = low
+                lines = 0
+            lines += block.count(b"\n", offset)
+            pos += len(block)
+    if pos > start:
+        yield start, pos
+
+
+def _read_range_lines(task):
+    """Lines of the (input_path, start, end) range, read like readlines."""
+    input_path, start, end = task
+    with open(input_path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    return io.StringIO(data.decode("utf-8"), newline=None).readlines()
+
+
+def _scan_range(task):
+    """
+    Worker: parse one range. Return (record_widths, count, line_count,
+    invalid) with invalid numbered from the range's first line.
+    """
+    lines = _read_range_lines(task)
+    numbers, invalid = parse_number_lines(lines)
+    return record_widths(numbers), len(numbers), len(lines), invalid
+
+
+def _render_range(task, render):
+    """Worker: parse one range and return (render(numbers), count)."""
+    numbers, _ = parse_number_lines(_read_range_lines(task))
+    return render(numbers), len(numbers)
+
+
+def _imap_bounded(pool, func, tasks, window):
+    """
+    Yield func(task) for every task in order, computed in the pool with at
+    most `window` tasks in flight (Pool.imap reads all the tasks at once).
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(func, (task,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def _scan_ranges(input_path, workers, chunk_size):
+    """
+    Parse the file in ranges of chunk_size lines in a process pool,
+    printing invalid lines to stderr in order. Return (widths, count) for
+    the whole file (see record_widths).
+    """
+    widths = record_widths(())
+    count = line_offset = 0
+    tasks = (
+        (input_path, start, end)
+        for start, end in line_chunks(input_path, chunk_size)
+    )
+    with Pool(processes=workers) as pool:
+        window = 2 * (workers or os.cpu_count() or 1)
+        for part_widths, part_count, line_count, invalid in _imap_bounded(
+                pool, _scan_range, tasks, window):
+            widths = tuple(map(max, widths, part_widths))
+            count += part_count
+            for line_num, line in invalid:
+                print(invalid_line_message(line_offset + line_num, line),
+                      file=sys.stderr)
+            line_offset += line_count
+    return widths, count
+
+
+def _iter_parallel_blocks(input_path, workers, chunk_size, render, separator):
+    """
+    Render ranges of chunk_size lines in a process pool and yield the
+    non-empty blocks in input order, separated by separator, as soon as
+    each next range is ready.
+    """
+    tasks = (
+        (input_path, start, end)
+        for start, end in line_chunks(input_path, chunk_size)
+    )
+    with Pool(processes=workers) as pool:
+        window = 2 * (workers or os.cpu_count() or 1)
+        first = True
+        for block, count in _imap_bounded(
+                pool, partial(_render_range, render=render), tasks, window):
+            if not count:
+                continue
+            if not first:
+                yield separator
+            first = False
+            yield block
+
+
+def run_conversions_parallel(
+        input_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+        output_format="text"):
+    """
+    Same output as run_conversions (or run_conversion_records when
+    output_format is "records"), but the file is split into ranges of
+    chunk_size lines that pool workers read, parse and convert themselves.
+    A first pass over the ranges reports invalid lines and counts the
+    numbers (and sizes the record columns).
+    Return (iterable_of_text_chunks, success); the chunks are produced in the
+    original order so the caller can stream them to the output file.
+    """
+    widths, count = _scan_ranges(input_path, workers, chunk_size)
+    if not count:
+        return "No valid numbers found in file.\n", False
+
+    if output_format == "records":
+        header = record_header(count, widths)
+        render = partial(render_records, widths=widths)
+        separator = ""
+    else:
+        header = HEADER
+        render = render_conversions
+        separator = "\n"
+    blocks = _iter_parallel_blocks(
+        input_path, workers, chunk_size, render, separator
+    )
+    return itertools.chain((header,), blocks), True
+
+
+def _parse_options(options):
+    """Return (workers, chunk_size, output_format, parallel) from the options."""
+    output_format = options.get("format", "text")
+    if output_format not in ("text", "records"):
+        raise ValueError(f"Unknown --format: {output_format}")
+    return (
+        int_option(options, "workers"),
+        int_option(options, "chunk-size", DEFAULT_CHUNK_SIZE),
+        output_format,
+        "workers" in options or "chunk-size" in options,
+    )
 
 
 def main():
     """Entry point: parse args, run conversions, write output and time."""
-    if len(sys.argv) < 2:
-        print(
-            "Usage: python convert_numbers.py fileWithData.txt [output_dir]",
-            file=sys.stderr,
-        )
-        sys.exit(1)
+    args, (workers, chunk_size, output_format, parallel) = parse_cli(
+        sys.argv[1:], USAGE, _parse_options
+    )
 
-    input_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) >= 3 else ""
-    out_file = "ConvertionResults.txt"
+    input_path = args[0]
+    output_dir = args[1] if len(args) >= 2 else ""
+    if output_format == "records":
+        out_file = "ConvertionResults.dat"
+    else:
+        out_file = "ConvertionResults.txt"
     output_path = os.path.join(output_dir, out_file) if output_dir else out_file
 
-    run_timed_main(run_conversions, input_path, output_path)
+    if parallel:
+        run_func = partial(
+            run_conversions_parallel, workers=workers, chunk_size=chunk_size,
+            output_format=output_format,
+        )
+    elif output_format == "records":
+        run_func = run_conversion_records
+    else:
+        run_func = run_conversions
+    if output_format == "records":
+        run_timed_file_main(run_func, input_path, output_path)
+    else:
+        run_timed_main(run_func, input_path, output_path)
 
 
 if __name__ == "__main__":
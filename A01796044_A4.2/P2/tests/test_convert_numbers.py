@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 """Unit tests for convertNumbers module (P2)."""
 
+import contextlib
+import io
 import os
 import sys
 import tempfile
 import unittest
+from unittest import mock
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
 
@@ -82,5 +85,121 @@ class TestRunConversions(unittest.TestCase):
             os.unlink(path)
 
 
+class TestRunConversionsParallel(unittest.TestCase):
+    """Tests for run_conversions_parallel."""
+
+    def test_same_output_as_sequential(self):
+        """Chunked pool output matches the sequential report, in order."""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".txt", delete=False
+        ) as f:
+            f.write("\n".join(str(i) for i in range(25)) + "\n")
+            path = f.name
+        try:
+            expected, _ = cn.run_conversions(path)
+            chunks, success = cn.run_conversions_parallel(
+                path, workers=2, chunk_size=4
+            )
+            self.assertTrue(success)
+            self.assertEqual("".join(chunks), expected)
+        finally:
+            os.unlink(path)
+
+    def test_workers_read_line_ranges(self):
+        """Workers parse their own ranges; errors keep their line numbers."""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".txt", delete=False, newline=""
+        ) as f:
+            f.write("1\n\nabc\r\n2.5\r\n-7\rxyz\n\n\n8")
+            path = f.name
+        try:
+            sequential_errors = io.StringIO()
+            with contextlib.redirect_stderr(sequential_errors):
+                expected, _ = cn.run_conversions(path)
+            parallel_errors = io.StringIO()
+            with contextlib.redirect_stderr(parallel_errors), \
+                    mock.patch.object(cn, "read_and_parse_numbers",
+                                      side_effect=AssertionError):
+                chunks, success = cn.run_conversions_parallel(
+                    path, workers=2, chunk_size=2
+                )
+                text = "".join(chunks)
+            self.assertTrue(success)
+            self.assertEqual(text, expected)
+            self.assertEqual(
+                parallel_errors.getvalue(), sequential_errors.getvalue()
+            )
+            self.assertIn("line 6", parallel_errors.getvalue())
+        finally:
+            os.unlink(path)
+
+    def test_line_chunks(self):
+        """Ranges hold lines_per_chunk lines and cover the whole file."""
+        with tempfile.NamedTemporaryFile(
+            mode="wb", suffix=".txt", delete=False
+        ) as f:
+            f.write(b"1\n22\n\n333\n4")
+            path = f.name
+        try:
+            for block_size in (1, 3, 1 << 16):
+                self.assertEqual(
+                    list(cn.line_chunks(path, 2, block_size)),
+                    [(0, 5), (5, 10), (10, 11)],
+                )
+        finally:
+            os.unlink(path)
+
+
+class TestConversionRecords(unittest.TestCase):
+    """Tests for the fixed-width records format."""
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".txt", delete=False
+        ) as f:
+            f.write("10\n255\n0.5\n-16\n")
+            self.input_path = f.name
+
+    def tearDown(self):
+        os.unlink(self.input_path)
+
+    def test_records_have_fixed_size(self):
+        """Every record line has the size announced in the header."""
+        text, success = cn.run_conversion_records(self.input_path)
+        self.assertTrue(success)
+        header, *records = text.splitlines(keepends=True)
+        self.assertIn("count=4", header)
+        self.assertIn(f"size={len(records[0])}", header)
+        self.assertEqual({len(r) for r in records}, {len(records[0])})
+
+    def test_read_record_seeks_by_index(self):
+        """read_record returns value, bit length, binary and hex."""
+        text, _ = cn.run_conversion_records(self.input_path)
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".dat", delete=False
+        ) as f:
+            f.write(text)
+            records_path = f.name
+        try:
+            self.assertEqual(
+                cn.read_record(records_path, 1), (255.0, 8, "11111111", "FF")
+            )
+            self.assertEqual(
+                cn.read_record(records_path, 2), (0.5, 1, "0", "0")
+            )
+            with self.assertRaises(IndexError):
+                cn.read_record(records_path, 4)
+        finally:
+            os.unlink(records_path)
+
+    def test_parallel_records_match(self):
+        """Parallel records output matches the sequential one."""
+        expected, _ = cn.run_conversion_records(self.input_path)
+        chunks, _ = cn.run_conversions_parallel(
+            self.input_path, workers=2, chunk_size=1, output_format="records"
+        )
+        self.assertEqual("".join(chunks), expected)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,179 @@
+"""
+Memory-compact word-frequency table: the sorted vocabulary is stored as one
+UTF-8 byte arena plus array('Q') offsets and counts (about len(word) + 16
+bytes per entry instead of a str and an int object per dict entry).
+"""
+
+from array import array
+from itertools import accumulate, chain, islice
+
+# Stands in for the next entry of an exhausted table in merge_tables
+_END = (None, 0)
+
+
+class CompactFrequencyTable:
+    """Immutable, alphabetically sorted word -> count table."""
+
+    def __init__(self, arena=b"", offsets=None, counts=None):
+        """Wrap prebuilt buffers; use from_items or merged to build one."""
+        self.arena = arena
+        self.offsets = offsets if offsets is not None else array("Q", [0])
+        self.counts = counts if counts is not None else array("Q")
+
+    @classmethod
+    def from_items(cls, items):
+        """Build a table from (word, count) pairs sorted by word, without duplicates."""
+        arena = bytearray()
+        offsets = array("Q", [0])
+        counts = array("Q")
+        for word, count in items:
+            arena += word.encode("utf-8")
+            offsets.append(len(arena))
+            counts.append(count)
+        return cls(arena, offsets, counts)
+
+    @classmethod
+    def from_counts(cls, freq):
+        """Build a table from an unsorted word -> count dict."""
+        words = sorted(freq)
+        encoded = [word.encode("utf-8") for word in words]
+        return cls(
+            b"".join(encoded),
+            array("Q", accumulate(map(len, encoded), initial=0)),
+            array("Q", map(freq.__getitem__, words)),
+        )
+
+    def merged(self, freq):
+        """New table with the counts of a word -> count dict added in."""
+        return merge_tables(self, CompactFrequencyTable.from_counts(freq))
+
+    def __len__(self):
+        return len(self.counts)
+
+    def word_at(self, idx):
+        """Word stored at position idx."""
+        return self.arena[self.offsets[idx]:self.offsets[idx + 1]].decode("utf-8")
+
+    def get(self, word, default=0):
+        """Count of word by binary search over the arena (UTF-8 bytes sort
+        in code point order, like str)."""
+        key = word.encode("utf-8")
+        arena, offsets = self.arena, self.offsets
+        low, high = 0, len(self.counts)
+        while low < high:
+            mid = (low + high) // 2
+            if arena[offsets[mid]:offsets[mid + 1]] < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(self.counts) and arena[offsets[low]:offsets[low + 1]] == key:
+            return self.counts[low]
+        return default
+
+    def byte_items(self):
+        """(UTF-8 word, count) pairs in alphabetical order."""
+        bounds = map(slice, self.offsets, islice(self.offsets, 1, None))
+        return zip(map(self.arena.__getitem__, bounds), self.counts)
+
+    def items(self):
+        """(word, count) pairs in alphabetical order."""
+        return ((self.word_at(idx), count) for idx, count in enumerate(self.counts))
+
+    def total(self):
+        """Sum of all counts."""
+        return sum(self.counts)
+
+    def nbytes(self):
+        """Bytes used by the arena, offsets and counts buffers."""
+        return (
+            len(self.arena)
+            + self.offsets.itemsize * len(self.offsets)
+            + self.counts.itemsize * len(self.counts)
+        )
+
+
+def sum_equal_words(entries):
+    """Collapse an alphabetically sorted (word, count) stream, summing duplicates."""
+    current, total = None, 0
+    for word, count in entries:
+        if word == current:
+            total += count
+            continue
+        if current is not None:
+            yield current, total
+        current, total = word, count
+    if current is not None:
+        yield current, total
+
+
+def merge_tables(first, second):
+    """
+    One table with the counts of two tables added up. Entries are compared
+    and copied as UTF-8 bytes in a single loop, without decoding the words.
+    """
+    entries_a, entries_b = first.byte_items(), second.byte_items()
+    word_a, count_a = next(entries_a, _END)
+    word_b, count_b = next(entries_b, _END)
+    arena = bytearray()
+    offsets = array("Q", [0])
+    counts = array("Q")
+    add_count, add_offset = counts.append, offsets.append
+    while word_a is not None and word_b is not None:
+        if word_a < word_b:
+            word, count = word_a, count_a
+            word_a, count_a = next(entries_a, _END)
+        elif word_b < word_a:
+            word, count = word_b, count_b
+            word_b, count_b = next(entries_b, _END)
+        else:
+            word, count = word_a, count_a + count_b
+            word_a, count_a = next(entries_a, _END)
+            word_b, count_b = next(entries_b, _END)
+        arena += word
+        add_count(count)
+        add_offset(len(arena))
+    for word, count in chain(
+        ((word_a, count_a), (word_b, count_b)), entries_a, entries_b
+    ):
+        if word is not None:
+            arena += word
+            add_count(count)
+            add_offset(len(arena))
+    return CompactFrequencyTable(arena, offsets, counts)
+
+
+def add_sorted_run(runs, freq):
+    """
+    Add the counts of a word -> count dict to `runs`, a list of tables of
+    decreasing size, as a new sorted run. Runs of similar size are merged
+    (like a binary counter: while the previous run is no larger than the
+    last one), so there are O(log(words / len(freq))) runs and every word
+    is re-merged that many times at most.
+    """
+    runs.append(CompactFrequencyTable.from_counts(freq))
+    while len(runs) > 1 and len(runs[-2]) <= len(runs[-1]):
+        last = runs.pop()
+        runs[-1] = merge_tables(runs[-1], last)
+
+
+def count_words_compact(words, buffer_size=200000):
+    """
+    Count words (case-insensitive) into a CompactFrequencyTable. Counts are
+    buffered in a dict of at most buffer_size words; every full buffer
+    becomes a sorted run (see add_sorted_run), and the runs are merged
+    smallest first into one table at the end.
+    """
+    runs = []
+    buffer = {}
+    for word in words:
+        word_lower = word.lower()
+        buffer[word_lower] = buffer.get(word_lower, 0) + 1
+        if len(buffer) >= buffer_size:
+            add_sorted_run(runs, buffer)
+            buffer = {}
+    if buffer:
+        add_sorted_run(runs, buffer)
+    table = runs.pop() if runs else CompactFrequencyTable()
+    while runs:
+        table = merge_tables(runs.pop(), table)
+    return table
@@ -0,0 +1,253 @@
+"""
+N-gram counting with an interned vocabulary: words become integer IDs and
+each n-gram is packed into one integer key. Bigrams (32-bit IDs) and
+trigrams (21-bit IDs, about 2M words) fit in 64 bits and are counted in an
+open-addressing table backed by two array('Q') buffers (16 bytes per slot);
+longer n-grams, and a vocabulary that outgrows those widths, use 32-bit IDs
+and Python int keys in a dict.
+"""
+
+import heapq
+from array import array
+
+MASK64 = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+MAX_LOAD = 0.6
+ID_BITS = 32
+PACKED_MAX_N = 3
+
+
+class Vocabulary:
+    """Bidirectional word <-> integer ID map; IDs start at 1 (0 is unused)."""
+
+    def __init__(self):
+        """Create an empty vocabulary."""
+        self.ids = {}
+        self.words = [""]
+
+    def intern(self, word):
+        """ID of a word, assigning the next one if it is new."""
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = len(self.words)
+            self.ids[word] = word_id
+            self.words.append(word)
+        return word_id
+
+    def __len__(self):
+        return len(self.words) - 1
+
+
+class PackedCounter:
+    """Counts of non-zero 64-bit integer keys, open addressing, linear probing."""
+
+    def __init__(self, capacity_bits=10):
+        """Create an empty table with 2**capacity_bits slots."""
+        self._allocate(capacity_bits)
+        self.size = 0
+
+    def _allocate(self, capacity_bits):
+        """Replace the buffers with empty ones of 2**capacity_bits slots."""
+        self.capacity_bits = capacity_bits
+        self.mask = (1 << capacity_bits) - 1
+        self.keys = array("Q", bytes(8 << capacity_bits))
+        self.counts = array("Q", bytes(8 << capacity_bits))
+
+    def _slot(self, key):
+        """Slot holding key, or the empty slot where it would be inserted."""
+        keys = self.keys
+        mask = self.mask
+        idx = ((key * GOLDEN) & MASK64) >> (64 - self.capacity_bits)
+        while keys[idx] and keys[idx] != key:
+            idx = (idx + 1) & mask
+        return idx
+
+    def add(self, key, count=1):
+        """Add count to key."""
+        idx = self._slot(key)
+        if not self.keys[idx]:
+            if self.size + 1 > MAX_LOAD * (self.mask + 1):
+                self._grow()
+                idx = self._slot(key)
+            self.keys[idx] = key
+            self.size += 1
+        self.counts[idx] += count
+
+    def _grow(self):
+        """Double the capacity and reinsert every key from the old buffers."""
+        old_keys, old_counts = self.keys, self.counts
+        self._allocate(self.capacity_bits + 1)
+        for key, count in zip(old_keys, old_counts):
+            if not key:
+                continue
+            idx = self._slot(key)
+            self.keys[idx] = key
+            self.counts[idx] = count
+
+    def get(self, key):
+        """Count of key (0 if absent)."""
+        return self.counts[self._slot(key)]
+
+    def items(self):
+        """(key, count) pairs in table order."""
+        return (
+            (key, count) for key, count in zip(self.keys, self.counts) if key
+        )
+
+    def __len__(self):
+        return self.size
+
+
+class DictCounter:
+    """Counts of integer keys of any size in a dict (PackedCounter interface)."""
+
+    def __init__(self):
+        """Create an empty table."""
+        self.counts = {}
+
+    def add(self, key, count=1):
+        """Add count to key."""
+        self.counts[key] = self.counts.get(key, 0) + count
+
+    def get(self, key):
+        """Count of key (0 if absent)."""
+        return self.counts.get(key, 0)
+
+    def items(self):
+        """(key, count) pairs."""
+        return self.counts.items()
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class NGramCounter:
+    """Counts n-grams of one size over a word stream, using a shared Vocabulary."""
+
+    def __init__(self, n, vocabulary):
+        """
+        Count n-grams of size n. Up to PACKED_MAX_N words each ID gets
+        64 // n bits of the key so that it fits the 64-bit PackedCounter;
+        longer n-grams get ID_BITS bits and a DictCounter.
+        """
+        if not 2 <= n <= 8:
+            raise ValueError("n-gram size must be between 2 and 8")
+        self.n = n
+        self.vocabulary = vocabulary
+        if n <= PACKED_MAX_N:
+            self.bits = 64 // n
+            self.table = PackedCounter()
+        else:
+            self.bits = ID_BITS
+            self.table = DictCounter()
+        self.total = 0
+        self._key = 0
+        self._filled = 0
+
+    def add_id(self, word_id):
+        """Slide the window by one word ID and count the n-gram it completes."""
+        if word_id >> self.bits:
+            self._widen(word_id)
+        self._key = ((self._key << self.bits) | word_id) & ((1 << self.bits * self.n) - 1)
+        if self._filled < self.n - 1:
+            self._filled += 1
+            return
+        self.table.add(self._key)
+        self.total += 1
+
+    def _widen(self, word_id):
+        """
+        Switch to ID_BITS bits per word and a DictCounter for a word ID that
+        does not fit the packed keys, re-keying the counts so far.
+        """
+        if word_id >> ID_BITS:
+            raise ValueError(
+                f"Vocabulary too large for {self.n}-grams ({ID_BITS} bits per word)"
+            )
+        table = DictCounter()
+        for key, count in self.table.items():
+            table.add(self._rekey(key), count)
+        self._key = self._rekey(self._key)
+        self.bits = ID_BITS
+        self.table = table
+
+    def _rekey(self, key):
+        """Repack a key of self.bits bits per word with ID_BITS bits per word."""
+        word_mask = (1 << self.bits) - 1
+        wide = 0
+        for shift in reversed(range(self.n)):
+            wide = (wide << ID_BITS) | ((key >> (self.bits * shift)) & word_mask)
+        return wide
+
+    def decode(self, key):
+        """Words of a packed n-gram key."""
+        word_mask = (1 << self.bits) - 1
+        ids = [(key >> (self.bits * shift)) & word_mask for shift in range(self.n)]
+        return tuple(self.vocabulary.words[word_id] for word_id in reversed(ids))
+
+    def count(self, words):
+        """Count of an n-gram given as a sequence of (lowercase) words."""
+        key = 0
+        for word in words:
+            word_id = self.vocabulary.ids.get(word)
+            if word_id is None:
+                return 0
+            key = (key << self.bits) | word_id
+        return self.table.get(key)
+
+    def __len__(self):
+        return len(self.table)
+
+
+class NGramCounters:
+    """Several NGramCounter sizes fed from one pass over the words."""
+
+    def __init__(self, sizes):
+        """Create one counter per n-gram size, sharing a Vocabulary."""
+        self.vocabulary = Vocabulary()
+        self.counters = {n: NGramCounter(n, self.vocabulary) for n in sizes}
+
+    def sections(self, top=None, min_count=None):
+        """Report lines of every n-gram size (see format_ngram_section)."""
+        lines_out = []
+        for counter in self.counters.values():
+            lines_out.extend(format_ngram_section(counter, top, min_count))
+        return lines_out
+
+    def track(self, words):
+        """Yield the lowercased words while counting their n-grams."""
+        counters = list(self.counters.values())
+        intern = self.vocabulary.intern
+        for word in words:
+            word = word.lower()
+            word_id = intern(word)
+            for counter in counters:
+                counter.add_id(word_id)
+            yield word
+
+
+def format_ngram_section(counter, top=None, min_count=None):
+    """
+    Report lines for one n-gram size: entries ordered by their words (or the
+    top most frequent), then distinct and total n-gram counts.
+    """
+    entries = (
+        (counter.decode(key), count) for key, count in counter.table.items()
+    )
+    if top is not None:
+        heading = f"Top {top} {counter.n}-grams by frequency:"
+        entries = heapq.nsmallest(top, entries, key=lambda item: (-item[1], item[0]))
+    elif min_count is not None:
+        heading = f"{counter.n}-grams with frequency >= {min_count}:"
+        entries = sorted(entry for entry in entries if entry[1] >= min_count)
+    else:
+        heading = f"{counter.n}-grams:"
+        entries = sorted(entries)
+    lines_out = [heading]
+    for words, count in entries:
+        lines_out.append(f"{' '.join(words)}: {count}")
+    lines_out.append("")
+    lines_out.append(f"Total distinct {counter.n}-grams: {len(counter)}")
+    lines_out.append(f"Total {counter.n}-grams: {counter.total}")
+    lines_out.append("")
+    return lines_out
@@ -0,0 +1,241 @@
+"""
+Mergeable probabilistic sketches for approximate word counting:
+HyperLogLog (distinct words) and Count-Min Sketch with a heavy-hitter list.
+"""
+
+import base64
+import hashlib
+import json
+import math
+import sys
+from array import array
+
+SKETCH_VERSION = 1
+
+
+def hash64(word):
+    """Stable 64-bit hash of a word (same value in every process and run)."""
+    digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _encode_array(values):
+    """Encode an array as base64 of its little-endian bytes."""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def _decode_array(typecode, text):
+    """Inverse of _encode_array."""
+    values = array(typecode)
+    values.frombytes(base64.b64decode(text))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2**precision registers."""
+
+    def __init__(self, precision=14):
+        """Create an empty sketch; standard error is 1.04 / sqrt(2**precision)."""
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @classmethod
+    def from_error(cls, error):
+        """Smallest sketch whose standard error is at most `error`."""
+        precision = math.ceil(math.log2((1.04 / error) ** 2))
+        return cls(min(max(precision, 4), 18))
+
+    @property
+    def standard_error(self):
+        """Relative standard error of the estimate."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add_hash(self, value):
+        """Add a 64-bit hash value."""
+        rest_bits = 64 - self.precision
+        idx = value >> rest_bits
+        rest = value & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def estimate(self):
+        """Estimated number of distinct values added."""
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        raw = alpha * size * size / sum(2.0 ** -reg for reg in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * size and zeros:
+            return size * math.log(size / zeros)
+        return raw
+
+    def merge(self, other):
+        """Merge another sketch with the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+
+class CountMinSketch:
+    """Count-Min Sketch: estimates never undercount, overcount <= epsilon * total."""
+
+    def __init__(self, epsilon=0.001, delta=0.01):
+        """Create an empty sketch; the bound holds with probability 1 - delta."""
+        if not (0 < epsilon < 1 and 0 < delta < 1):
+            raise ValueError("epsilon and delta must be between 0 and 1")
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.counts = array("Q", bytes(8 * self.width * self.depth))
+        self.total = 0
+
+    def _cells(self, value):
+        """Cell index of the value in each row (double hashing)."""
+        low = value & 0xFFFFFFFF
+        high = (value >> 32) | 1
+        width = self.width
+        return [
+            row * width + (low + row * high) % width for row in range(self.depth)
+        ]
+
+    def add_hash(self, value, count=1):
+        """Add `count` occurrences of a 64-bit hash value."""
+        counts = self.counts
+        for cell in self._cells(value):
+            counts[cell] += count
+        self.total += count
+
+    def estimate_hash(self, value):
+        """Estimated number of occurrences of a 64-bit hash value."""
+        counts = self.counts
+        return min(counts[cell] for cell in self._cells(value))
+
+    @property
+    def error_bound(self):
+        """Maximum overcount (epsilon * total) holding with probability 1 - delta."""
+        return self.epsilon * self.total
+
+    def merge(self, other):
+        """Merge another sketch with the same dimensions into this one."""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge Count-Min sketches of different size")
+        self.counts = array("Q", map(sum, zip(self.counts, other.counts)))
+        self.total += other.total
+
+
+class WordSketch:
+    """
+    Approximate word statistics: distinct words (HyperLogLog), frequencies
+    (Count-Min Sketch) and the `top` heaviest words seen. Mergeable and
+    serializable to JSON so partial runs can be combined.
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01, hll_error=0.01, top=100):
+        """Create an empty sketch with the given error parameters."""
+        self.distinct = HyperLogLog.from_error(hll_error)
+        self.frequency = CountMinSketch(epsilon, delta)
+        self.top = top
+        self.candidates = {}
+        self._threshold = 0
+
+    @property
+    def total(self):
+        """Exact number of words added."""
+        return self.frequency.total
+
+    def add(self, word):
+        """Add one occurrence of a word."""
+        value = hash64(word)
+        self.distinct.add_hash(value)
+        self.frequency.add_hash(value)
+        estimate = self.frequency.estimate_hash(value)
+        if word in self.candidates or estimate > self._threshold:
+            self.candidates[word] = estimate
+            if len(self.candidates) > 2 * self.top:
+                self._prune()
+
+    def update(self, words):
+        """Add every word of an iterable."""
+        for word in words:
+            self.add(word)
+
+    def _prune(self):
+        """Keep only the `top` candidates with the highest estimates."""
+        kept = self.heavy_hitters()
+        self.candidates = dict(kept)
+        if len(kept) >= self.top:
+            self._threshold = kept[-1][1]
+
+    def estimate(self, word):
+        """Estimated frequency of a word."""
+        return self.frequency.estimate_hash(hash64(word))
+
+    def heavy_hitters(self):
+        """Top (word, estimated_count) pairs, most frequent first."""
+        ranked = sorted(self.candidates.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:self.top]
+
+    def merge(self, other):
+        """Merge another WordSketch built with the same parameters."""
+        self.distinct.merge(other.distinct)
+        self.frequency.merge(other.frequency)
+        words = set(self.candidates) | set(other.candidates)
+        self.candidates = {word: self.estimate(word) for word in words}
+        self._threshold = 0
+        self._prune()
+
+    def to_dict(self):
+        """JSON-serializable representation."""
+        return {
+            "version": SKETCH_VERSION,
+            "epsilon": self.frequency.epsilon,
+            "delta": self.frequency.delta,
+            "precision": self.distinct.precision,
+            "top": self.top,
+            "total": self.frequency.total,
+            "registers": base64.b64encode(self.distinct.registers).decode("ascii"),
+            "counts": _encode_array(self.frequency.counts),
+            "candidates": self.heavy_hitters(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a sketch from to_dict output. Raises ValueError if the
+        registers or counts do not match the sketch dimensions.
+        """
+        if data.get("version") != SKETCH_VERSION:
+            raise ValueError("Unsupported sketch version")
+        sketch = cls(data["epsilon"], data["delta"], top=data["top"])
+        sketch.distinct = HyperLogLog(data["precision"])
+        registers = bytearray(base64.b64decode(data["registers"]))
+        if len(registers) != len(sketch.distinct.registers):
+            raise ValueError("Sketch registers do not match its precision")
+        counts = _decode_array("Q", data["counts"])
+        if len(counts) != len(sketch.frequency.counts):
+            raise ValueError("Sketch counts do not match its epsilon and delta")
+        sketch.distinct.registers = registers
+        sketch.frequency.counts = counts
+        sketch.frequency.total = data["total"]
+        sketch.candidates = dict(data["candidates"])
+        sketch._prune()
+        return sketch
+
+    def save(self, path):
+        """Write the sketch as JSON."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file)
+
+    @classmethod
+    def load(cls, path):
+        """Read a sketch written by save."""
+        with open(path, "r", encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
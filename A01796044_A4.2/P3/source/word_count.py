@@ -3,8 +3,14 @@
 Count distinct words and their frequency from a file using basic algorithms.
 """
 
+import codecs
+import heapq
 import os
+import re
 import sys
+import tempfile
+from functools import partial
+from multiprocessing import Pool
 
 # Add project root to path so utils can be imported when run as script
 _project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -12,24 +18,65 @@ if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
 # pylint: disable=wrong-import-position
-from utils.run_main import run_timed_main
+from compact_freq import count_words_compact, sum_equal_words
+from ngrams import NGramCounters
+from sketches import WordSketch
+from utils.run_main import float_option, int_option, parse_cli, run_timed_main
 # pylint: enable=wrong-import-position
 
 
+SEPARATORS = " \t\n\r"
+WORD_PATTERN = re.compile(r"[^ \t\n\r]+")
+SEPARATOR_BYTES = b" \t\n\r"
+CHUNK_SIZE = 1 << 20
+DEFAULT_HEAVY_HITTERS = 100
+REPORT_BATCH = 10000
+MERGE_FAN_IN = 32
+# Mode options (at most one per run) and the other options each mode uses;
+# None is the default streaming count
+MODE_OPTIONS = {
+    None: ("top", "min-count"),
+    "workers": ("top", "min-count"),
+    "approx": ("top", "epsilon", "delta", "hll-error", "sketch-in", "sketch-out"),
+    "memory-budget": ("top", "min-count", "spill-dir"),
+    "ngrams": ("top", "min-count"),
+    "compact-table": ("top", "min-count"),
+}
+USAGE = (
+    "Usage: python word_count.py fileWithData.txt [output_dir] [--workers N]"
+    " [--top K | --min-count N]"
+    " [--approx [--epsilon E] [--delta D] [--hll-error H]"
+    " [--sketch-in FILE[,FILE...]] [--sketch-out FILE]]"
+    " [--memory-budget N [--spill-dir DIR]] [--ngrams 2,3] [--compact-table]"
+)
+
+
 def split_into_words(text):
-    """Split text by whitespace (basic algorithm, no regex)."""
-    words = []
-    current = []
-    for char in text:
-        if char in " \t\n\r":
-            if current:
-                words.append("".join(current))
-                current = []
-        else:
-            current.append(char)
-    if current:
-        words.append("".join(current))
-    return words
+    """Split text by whitespace (space, tab, newline, carriage return)."""
+    return WORD_PATTERN.findall(text)
+
+
+def iter_chunk_words(chunks):
+    """
+    Yield the words of an iterable of text chunks.
+    A word cut by a chunk boundary is carried over and joined with the next chunk.
+    """
+    carry = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if carry:
+            chunk = carry + chunk
+        words = split_into_words(chunk)
+        carry = words.pop() if words and chunk[-1] not in SEPARATORS else ""
+        yield from words
+    if carry:
+        yield carry
+
+
+def iter_words(stream, chunk_size=CHUNK_SIZE):
+    """Yield the words of a text stream, reading chunk_size characters at a time."""
+    return iter_chunk_words(iter(partial(stream.read, chunk_size), ""))
 
 
 def count_words(words):
@@ -41,48 +88,449 @@ def count_words(words):
     return freq
 
 
-def run_word_count(input_path):
+def _by_frequency(item):
+    """Sort key: highest count first, then alphabetical."""
+    return -item[1], item[0]
+
+
+def top_words(freq, k):
+    """
+    Return the k most frequent (word, count) pairs, ties broken alphabetically,
+    using a bounded heap instead of sorting the whole vocabulary.
+    """
+    return heapq.nsmallest(k, freq.items(), key=_by_frequency)
+
+
+def format_report(freq, total_words, top=None, min_count=None):
+    """
+    Build the report text, then the totals. By default every word is listed
+    alphabetically; with top only the k most frequent words are listed, and
+    with min_count only the words seen at least that many times.
+    """
+    lines_out = ["Word Count Results", "=" * 40]
+    if top is not None:
+        lines_out.append(f"Top {top} words by frequency:")
+        entries = top_words(freq, top)
+    elif min_count is not None:
+        lines_out.append(f"Words with frequency >= {min_count}:")
+        entries = sorted(
+            (word, count) for word, count in freq.items() if count >= min_count
+        )
+    else:
+        entries = ((word, freq[word]) for word in sorted(freq))
+    for word, count in entries:
+        lines_out.append(f"{word}: {count}")
+    lines_out.append("")
+    lines_out.append(f"Total distinct words: {len(freq)}")
+    lines_out.append(f"Total words: {total_words}")
+    lines_out.append("")
+    return "\n".join(lines_out)
+
+
+def iter_report(entries, total_words, top=None, min_count=None):
+    """
+    Yield the same report as format_report, in text chunks, from an
+    alphabetically sorted stream of (word, count) entries. Only the top
+    heap (if any) is held in memory; distinct words are counted on the fly.
+    """
+    distinct = 0
+
+    def counted(stream):
+        nonlocal distinct
+        for entry in stream:
+            distinct += 1
+            yield entry
+
+    yield "Word Count Results\n" + "=" * 40 + "\n"
+    if top is not None:
+        yield f"Top {top} words by frequency:\n"
+        selected = heapq.nsmallest(top, counted(entries), key=_by_frequency)
+    elif min_count is not None:
+        yield f"Words with frequency >= {min_count}:\n"
+        selected = (entry for entry in counted(entries) if entry[1] >= min_count)
+    else:
+        selected = counted(entries)
+
+    batch = []
+    for word, count in selected:
+        batch.append(f"{word}: {count}\n")
+        if len(batch) >= REPORT_BATCH:
+            yield "".join(batch)
+            batch = []
+    yield "".join(batch)
+    yield f"\nTotal distinct words: {distinct}\nTotal words: {total_words}\n"
+
+
+def write_run(entries, spill_dir=None):
+    """
+    Write sorted (word, count) entries as a run ("word\tcount" lines) to an
+    anonymous temporary file and return it rewound for reading.
+    """
+    # pylint: disable-next=consider-using-with
+    run = tempfile.TemporaryFile(mode="w+", encoding="utf-8", dir=spill_dir)
+    for word, count in entries:
+        run.write(f"{word}\t{count}\n")
+    run.seek(0)
+    return run
+
+
+def spill_run(freq, spill_dir=None):
+    """Write a frequency map as a sorted run (see write_run)."""
+    return write_run(((word, freq[word]) for word in sorted(freq)), spill_dir)
+
+
+def add_run(levels, run, spill_dir=None, fan_in=MERGE_FAN_IN):
+    """
+    Add a sorted run to `levels`, a list of lists of runs where level i
+    holds runs merged from about fan_in**i spills. A level that reaches
+    fan_in runs is merged into one run of the next level, so fewer than
+    fan_in runs per level (and few files overall) stay open.
+    """
+    level = 0
+    while True:
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(run)
+        if len(levels[level]) < fan_in:
+            return
+        run = write_run(merge_runs({}, levels[level]), spill_dir)
+        levels[level] = []
+        level += 1
+
+
+def _read_run(run):
+    """Yield (word, count) entries from a sorted run file."""
+    for line in run:
+        word, _, count = line.rstrip("\n").partition("\t")
+        yield word, int(count)
+
+
+def count_words_spilling(words, memory_budget, spill_dir=None,
+                         fan_in=MERGE_FAN_IN):
+    """
+    Count words keeping at most memory_budget distinct words in memory;
+    whenever the table grows past it, it is spilled as a sorted run, and
+    runs are merged fan_in at a time as they pile up (see add_run).
+    Return (freq_in_memory, runs, total_words).
+    """
+    freq = {}
+    levels = []
+    total = 0
+    for word in words:
+        word_lower = word.lower()
+        freq[word_lower] = freq.get(word_lower, 0) + 1
+        total += 1
+        if len(freq) > memory_budget:
+            add_run(levels, spill_run(freq, spill_dir), spill_dir, fan_in)
+            freq = {}
+    return freq, [run for level in levels for run in level], total
+
+
+def merge_runs(freq, runs):
+    """
+    K-way merge of the sorted runs and the in-memory table into one
+    alphabetical stream of (word, count), summing counts of equal words.
+    Run files are closed once exhausted.
+    """
+    streams = [_read_run(run) for run in runs]
+    streams.append((word, freq[word]) for word in sorted(freq))
+    try:
+        yield from sum_equal_words(heapq.merge(*streams))
+    finally:
+        for run in runs:
+            run.close()
+
+
+def merge_counts(freq_a, freq_b):
+    """Merge two frequency maps, adding the smaller one into the larger."""
+    if len(freq_a) < len(freq_b):
+        freq_a, freq_b = freq_b, freq_a
+    for word, count in freq_b.items():
+        freq_a[word] = freq_a.get(word, 0) + count
+    return freq_a
+
+
+def tree_reduce(tables):
+    """Merge partial frequency maps pairwise, level by level."""
+    tables = list(tables)
+    if not tables:
+        return {}
+    while len(tables) > 1:
+        merged = [
+            merge_counts(tables[i], tables[i + 1])
+            for i in range(0, len(tables) - 1, 2)
+        ]
+        if len(tables) % 2:
+            merged.append(tables[-1])
+        tables = merged
+    return tables[0]
+
+
+def shard_boundaries(input_path, shards):
+    """
+    Split a file into up to `shards` byte ranges (start, end) that begin and
+    end on whitespace, so no word (nor UTF-8 sequence) is cut in two.
+    """
+    size = os.path.getsize(input_path)
+    cuts = [0]
+    with open(input_path, "rb") as file:
+        for i in range(1, shards):
+            pos = max(size * i // shards, cuts[-1])
+            file.seek(pos)
+            while True:
+                block = file.read(1 << 16)
+                if not block:
+                    pos = size
+                    break
+                found = [block.find(sep) for sep in SEPARATOR_BYTES]
+                found = [idx for idx in found if idx >= 0]
+                if found:
+                    pos += min(found)
+                    break
+                pos += len(block)
+            cuts.append(pos)
+    cuts.append(size)
+    return [(start, end) for start, end in zip(cuts, cuts[1:]) if end > start]
+
+
+def _iter_shard_text(input_path, start, end, chunk_size=CHUNK_SIZE):
+    """Yield the decoded UTF-8 text of bytes [start, end) of a file."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(input_path, "rb") as file:
+        file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = file.read(min(chunk_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield decoder.decode(block)
+    yield decoder.decode(b"", final=True)
+
+
+def count_shard(shard):
+    """Map step: count the words of one (input_path, start, end) shard."""
+    input_path, start, end = shard
+    return count_words(iter_chunk_words(_iter_shard_text(input_path, start, end)))
+
+
+def run_word_count(input_path, chunk_size=CHUNK_SIZE, **report_options):
     """
-    Read file, count distinct words and frequency.
+    Stream the file in chunks of chunk_size characters, counting words as
+    they are read; neither the whole text nor a word list is kept in memory.
+    report_options (top, min_count) are passed to format_report.
     Return (results_text, success). Caller appends elapsed time.
     """
     with open(input_path, "r", encoding="utf-8") as file:
-        content = file.read()
+        freq = count_words(iter_words(file, chunk_size))
+
+    if not freq:
+        return "No words found in file.\n", False
 
-    words = split_into_words(content)
+    return format_report(freq, sum(freq.values()), **report_options), True
 
-    if not words:
+
+def run_word_count_parallel(input_path, workers=None, **report_options):
+    """
+    Map-reduce word count: shards split at whitespace are counted in a
+    process pool and the partial maps are tree-reduced. Same output as
+    run_word_count. Return (results_text, success).
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = [
+        (input_path, start, end)
+        for start, end in shard_boundaries(input_path, workers)
+    ]
+    with Pool(processes=workers) as pool:
+        freq = tree_reduce(pool.imap_unordered(count_shard, shards))
+
+    if not freq:
         return "No words found in file.\n", False
 
-    freq = count_words(words)
-    sorted_words = sorted(freq.keys())
+    return format_report(freq, sum(freq.values()), **report_options), True
 
-    lines_out = ["Word Count Results", "=" * 40]
-    for word in sorted_words:
-        lines_out.append(f"{word}: {freq[word]}")
+
+def run_word_count_spill(
+        input_path, memory_budget, spill_dir=None, chunk_size=CHUNK_SIZE,
+        **report_options):
+    """
+    External-memory word count: the table is spilled to sorted runs when it
+    exceeds memory_budget distinct words, and the report is streamed from a
+    k-way merge of the runs. Return (iterable_of_text_chunks, success).
+    """
+    with open(input_path, "r", encoding="utf-8") as file:
+        freq, runs, total = count_words_spilling(
+            iter_words(file, chunk_size), memory_budget, spill_dir
+        )
+
+    if not total:
+        return "No words found in file.\n", False
+
+    return iter_report(merge_runs(freq, runs), total, **report_options), True
+
+
+def run_word_count_compact(input_path, chunk_size=CHUNK_SIZE, **report_options):
+    """
+    Word count into a CompactFrequencyTable (sorted byte arena + arrays)
+    instead of a dict; the report is streamed from the already sorted table.
+    Return (iterable_of_text_chunks, success).
+    """
+    with open(input_path, "r", encoding="utf-8") as file:
+        table = count_words_compact(iter_words(file, chunk_size))
+
+    if not table:
+        return "No words found in file.\n", False
+
+    return iter_report(table.items(), table.total(), **report_options), True
+
+
+def run_word_count_ngrams(
+        input_path, ngram_sizes, chunk_size=CHUNK_SIZE, **report_options):
+    """
+    Word count plus n-gram counts for each size in ngram_sizes, in one pass.
+    N-gram sections follow the word report and honor the same report options.
+    Return (results_text, success).
+    """
+    ngrams = NGramCounters(ngram_sizes)
+    with open(input_path, "r", encoding="utf-8") as file:
+        try:
+            freq = count_words(ngrams.track(iter_words(file, chunk_size)))
+        except ValueError as err:
+            return f"Error: {err}\n", False
+
+    if not freq:
+        return "No words found in file.\n", False
+
+    lines_out = [format_report(freq, sum(freq.values()), **report_options)]
+    lines_out.extend(ngrams.sections(**report_options))
+    return "\n".join(lines_out), True
+
+
+def format_approx_report(sketch):
+    """Build the report for an approximate (sketch-based) count."""
+    frequency = sketch.frequency
+    lines_out = ["Word Count Results (approximate)", "=" * 40]
+    lines_out.append(f"Top {sketch.top} words by estimated frequency:")
+    for word, count in sketch.heavy_hitters():
+        lines_out.append(f"{word}: ~{count}")
     lines_out.append("")
-    lines_out.append(f"Total distinct words: {len(freq)}")
-    lines_out.append(f"Total words: {len(words)}")
+    lines_out.append(
+        f"Total distinct words: ~{round(sketch.distinct.estimate())}"
+        f" (HyperLogLog, standard error {sketch.distinct.standard_error:.2%})"
+    )
+    lines_out.append(f"Total words: {sketch.total}")
+    lines_out.append(
+        f"Frequency estimates overcount by at most {frequency.error_bound:.0f}"
+        f" (epsilon={frequency.epsilon}) with probability"
+        f" {1 - frequency.delta:.2%}"
+    )
     lines_out.append("")
+    return "\n".join(lines_out)
 
-    return "\n".join(lines_out), True
+
+def run_word_count_approx(
+        input_path, sketch_in=(), sketch_out=None, **sketch_options):
+    """
+    Approximate word count in bounded memory with a WordSketch built from
+    sketch_options (epsilon, delta, hll_error, top). Sketches saved by earlier
+    runs (sketch_in) are merged in; the result is saved to sketch_out.
+    Return (results_text, success).
+    """
+    sketch = WordSketch(**sketch_options)
+    with open(input_path, "r", encoding="utf-8") as file:
+        sketch.update(word.lower() for word in iter_words(file))
+    try:
+        for path in sketch_in:
+            sketch.merge(WordSketch.load(path))
+    except (OSError, ValueError, KeyError) as err:
+        return f"Error: cannot merge sketch: {err}\n", False
+    if sketch_out:
+        sketch.save(sketch_out)
+
+    if not sketch.total:
+        return "No words found in file.\n", False
+
+    return format_approx_report(sketch), True
+
+
+def _check_mode(options):
+    """
+    Mode selected by the CLI options (a MODE_OPTIONS key). Raises ValueError
+    for an unknown option, two modes, or an option the mode does not use.
+    """
+    known = set(MODE_OPTIONS).union(*MODE_OPTIONS.values())
+    for name in options:
+        if name not in known:
+            raise ValueError(f"Unknown option --{name}")
+    modes = [mode for mode in MODE_OPTIONS if mode in options]
+    if len(modes) > 1:
+        raise ValueError(f"--{modes[0]} and --{modes[1]} cannot be combined")
+    mode = modes[0] if modes else None
+    for name in options:
+        if name == mode or name in MODE_OPTIONS[mode]:
+            continue
+        if mode is not None:
+            raise ValueError(f"--{name} cannot be combined with --{mode}")
+        users = [user for user, used in MODE_OPTIONS.items() if name in used]
+        raise ValueError(f"--{name} requires --{' or --'.join(users)}")
+    return mode
+
+
+def _select_run_func(options):
+    """Build the run function for the parsed CLI options (ValueError if invalid)."""
+    mode = _check_mode(options)
+    report_options = {
+        "top": int_option(options, "top"),
+        "min_count": int_option(options, "min-count"),
+    }
+    if None not in report_options.values():
+        raise ValueError("--top and --min-count are mutually exclusive")
+
+    if mode == "approx":
+        return partial(
+            run_word_count_approx,
+            epsilon=float_option(options, "epsilon", 0.001),
+            delta=float_option(options, "delta", 0.01),
+            hll_error=float_option(options, "hll-error", 0.01),
+            top=report_options["top"] or DEFAULT_HEAVY_HITTERS,
+            sketch_in=[
+                path for path in options.get("sketch-in", "").split(",") if path
+            ],
+            sketch_out=options.get("sketch-out"),
+        )
+    if mode == "ngrams":
+        sizes = sorted({int(size) for size in options["ngrams"].split(",")})
+        if not sizes or sizes[0] < 2 or sizes[-1] > 8:
+            raise ValueError("--ngrams sizes must be between 2 and 8")
+        return partial(run_word_count_ngrams, ngram_sizes=sizes, **report_options)
+    if mode == "compact-table":
+        return partial(run_word_count_compact, **report_options)
+    if mode == "memory-budget":
+        return partial(
+            run_word_count_spill,
+            memory_budget=int_option(options, "memory-budget"),
+            spill_dir=options.get("spill-dir"), **report_options
+        )
+    if mode == "workers":
+        return partial(
+            run_word_count_parallel, workers=int_option(options, "workers"),
+            **report_options
+        )
+    return partial(run_word_count, **report_options)
 
 
 def main():
     """Entry point: parse args, run word count, write output and time."""
-    if len(sys.argv) < 2:
-        print(
-            "Usage: python word_count.py fileWithData.txt [output_dir]",
-            file=sys.stderr,
-        )
-        sys.exit(1)
+    args, run_func = parse_cli(
+        sys.argv[1:], USAGE, _select_run_func, flags=("approx", "compact-table")
+    )
 
-    input_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) >= 3 else ""
+    input_path = args[0]
+    output_dir = args[1] if len(args) >= 2 else ""
     out_file = "WordCountResults.txt"
     output_path = os.path.join(output_dir, out_file) if output_dir else out_file
 
-    run_timed_main(run_word_count, input_path, output_path)
+    run_timed_main(run_func, input_path, output_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Persistent, incremental word-frequency index over many files (SQLite).
+Each file is counted once with word_count.count_words; the index remembers
+ingested files by content hash and can be queried without rescanning them.
+"""
+
+import hashlib
+import os
+import sqlite3
+import sys
+
+from word_count import count_words, iter_report, iter_words
+
+COMPACT_THRESHOLD = 1_000_000
+HASH_BLOCK = 1 << 20
+USAGE = (
+    "Usage: python word_index.py index.db add file [file ...]\n"
+    "       python word_index.py index.db count word [word ...]\n"
+    "       python word_index.py index.db top K\n"
+    "       python word_index.py index.db report\n"
+    "       python word_index.py index.db compact"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    words INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counts (
+    word TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS counts_by_count ON counts (count DESC, word);
+CREATE TABLE IF NOT EXISTS pending (
+    word TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pending_by_word ON pending (word);
+"""
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class WordIndex:
+    """
+    On-disk word-frequency index. New counts are appended to a `pending`
+    table (cheap inserts) and folded into `counts` by compact(), which keeps
+    lookups and top-K queries on a single indexed table.
+    """
+
+    def __init__(self, db_path, compact_threshold=COMPACT_THRESHOLD):
+        """Open (or create) the index stored at db_path."""
+        self.compact_threshold = compact_threshold
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_file(self, path):
+        """
+        Count and ingest one file. Return (status, message) where status is
+        "added", "skipped" (same content already ingested) or "error".
+        """
+        path = os.path.abspath(path)
+        try:
+            sha = file_sha256(path)
+            row = self.conn.execute(
+                "SELECT path, sha256 FROM files WHERE sha256 = ? OR path = ?",
+                (sha, path),
+            ).fetchone()
+            if row and row[1] == sha:
+                return "skipped", f"{path}: already ingested (as {row[0]})"
+            if row:
+                return "error", f"{path}: changed since it was ingested"
+            with open(path, "r", encoding="utf-8") as file:
+                freq = count_words(iter_words(file))
+        except (OSError, UnicodeDecodeError) as err:
+            return "error", f"{path}: {err}"
+
+        total = sum(freq.values())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO pending (word, count) VALUES (?, ?)", freq.items()
+            )
+            self.conn.execute(
+                "INSERT INTO files (path, sha256, size, words) VALUES (?, ?, ?, ?)",
+                (path, sha, os.path.getsize(path), total),
+            )
+        if self._pending_rows() > self.compact_threshold:
+            self.compact()
+        return "added", f"{path}: {total} words, {len(freq)} distinct"
+
+    def _pending_rows(self):
+        """Number of not yet compacted rows."""
+        return self.conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def compact(self, vacuum=False):
+        """Fold pending counts into the counts table (and optionally VACUUM)."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO counts (word, count)"
+                " SELECT word, SUM(count) FROM pending WHERE true GROUP BY word"
+                " ON CONFLICT (word) DO UPDATE SET count = count + excluded.count"
+            )
+            self.conn.execute("DELETE FROM pending")
+        if vacuum:
+            self.conn.execute("VACUUM")
+            self.conn.execute("ANALYZE")
+
+    def count(self, word):
+        """Total count of a word (case-insensitive) across ingested files."""
+        word = word.lower()
+        row = self.conn.execute(
+            "SELECT COALESCE((SELECT count FROM counts WHERE word = ?), 0)"
+            " + COALESCE((SELECT SUM(count) FROM pending WHERE word = ?), 0)",
+            (word, word),
+        ).fetchone()
+        return row[0]
+
+    def top(self, k):
+        """The k most frequent (word, count) pairs, ties alphabetical."""
+        if self._pending_rows():
+            self.compact()
+        return self.conn.execute(
+            "SELECT word, count FROM counts ORDER BY count DESC, word LIMIT ?",
+            (k,),
+        ).fetchall()
+
+    def total_words(self):
+        """Total number of words ingested."""
+        return self.conn.execute(
+            "SELECT COALESCE(SUM(words), 0) FROM files"
+        ).fetchone()[0]
+
+    def iter_entries(self):
+        """All (word, count) pairs in alphabetical order."""
+        if self._pending_rows():
+            self.compact()
+        return self.conn.execute("SELECT word, count FROM counts ORDER BY word")
+
+
+def main():
+    """Entry point: run one index command and print its result."""
+    if len(sys.argv) < 3:
+        print(USAGE, file=sys.stderr)
+        sys.exit(1)
+
+    db_path, command, args = sys.argv[1], sys.argv[2], sys.argv[3:]
+    success = True
+    with WordIndex(db_path) as index:
+        if command == "add" and args:
+            for path in args:
+                status, message = index.add_file(path)
+                print(f"{status}: {message}")
+                success = success and status != "error"
+        elif command == "count" and args:
+            for word in args:
+                print(f"{word.lower()}: {index.count(word)}")
+        elif command == "top" and len(args) == 1 and args[0].isdigit():
+            for word, count in index.top(int(args[0])):
+                print(f"{word}: {count}")
+        elif command == "report" and not args:
+            for chunk in iter_report(index.iter_entries(), index.total_words()):
+                print(chunk, end="")
+        elif command == "compact" and not args:
+            index.compact(vacuum=True)
+        else:
+            print(USAGE, file=sys.stderr)
+            success = False
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Unit tests for compact_freq module (P3)."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import compact_freq as cf
+
+
+class TestCompactFrequencyTable(unittest.TestCase):
+    """Tests for CompactFrequencyTable."""
+
+    def test_lookup_and_order(self):
+        """Lookups use binary search; items come out sorted."""
+        table = cf.CompactFrequencyTable.from_items(
+            [("apple", 2), ("año", 1), ("zebra", 5)]
+        )
+        self.assertEqual(table.get("año"), 1)
+        self.assertEqual(table.get("zebra"), 5)
+        self.assertEqual(table.get("banana"), 0)
+        self.assertEqual(
+            [word for word, _ in table.items()], ["apple", "año", "zebra"]
+        )
+        self.assertEqual(table.total(), 8)
+
+    def test_merged_adds_counts(self):
+        """Merging a dict sums shared words and inserts new ones."""
+        table = cf.CompactFrequencyTable.from_items([("b", 1), ("d", 2)])
+        table = table.merged({"a": 1, "d": 3, "c": 1})
+        self.assertEqual(
+            list(table.items()), [("a", 1), ("b", 1), ("c", 1), ("d", 5)]
+        )
+
+    def test_count_words_compact_matches_dict(self):
+        """Buffered counting gives the same counts as a plain dict."""
+        words = [f"W{i % 37}" for i in range(1000)] + ["x"]
+        table = cf.count_words_compact(words, buffer_size=5)
+        expected = {}
+        for word in words:
+            expected[word.lower()] = expected.get(word.lower(), 0) + 1
+        self.assertEqual(dict(table.items()), expected)
+        self.assertLess(table.nbytes(), 20 * len(table) + 16)
+
+    def test_runs_merged_geometrically(self):
+        """Runs stay few and of decreasing size; merging keeps every count."""
+        runs = []
+        for spill in range(12):
+            cf.add_sorted_run(
+                runs, {f"w{spill * 3 + i}": 1 for i in range(4)}
+            )
+            sizes = [len(run) for run in runs]
+            self.assertEqual(sizes, sorted(sizes, reverse=True))
+            self.assertEqual(len(set(sizes)), len(sizes))
+        self.assertLessEqual(len(runs), 3)
+        table = runs[0]
+        for run in runs[1:]:
+            table = cf.merge_tables(table, run)
+        self.assertEqual(len(table), 37)
+        self.assertEqual(table.total(), 48)
+        self.assertEqual(table.get("w3"), 2)
+        self.assertEqual(table.get("w36"), 1)
+        self.assertEqual(
+            [word for word, _ in table.items()],
+            sorted(f"w{i}" for i in range(37)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
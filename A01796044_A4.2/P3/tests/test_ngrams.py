@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Unit tests for ngrams module (P3)."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import ngrams as ng
+
+
+class TestPackedCounter(unittest.TestCase):
+    """Tests for PackedCounter."""
+
+    def test_counts_survive_growth(self):
+        """Counts are kept when the table resizes."""
+        table = ng.PackedCounter(capacity_bits=2)
+        for key in range(1, 200):
+            table.add(key, count=key)
+        table.add(7)
+        self.assertEqual(len(table), 199)
+        self.assertEqual(table.get(7), 8)
+        self.assertEqual(table.get(150), 150)
+        self.assertEqual(table.get(500), 0)
+
+
+class TestNGramCounters(unittest.TestCase):
+    """Tests for NGramCounters."""
+
+    def test_bigrams_and_trigrams(self):
+        """N-grams are counted over the lowercased word stream."""
+        counters = ng.NGramCounters([2, 3])
+        words = list(counters.track("A b a B a b".split()))
+        self.assertEqual(words, ["a", "b", "a", "b", "a", "b"])
+        bigrams, trigrams = counters.counters[2], counters.counters[3]
+        self.assertEqual(bigrams.count(["a", "b"]), 3)
+        self.assertEqual(bigrams.count(["b", "a"]), 2)
+        self.assertEqual(bigrams.total, 5)
+        self.assertEqual(trigrams.count(["a", "b", "a"]), 2)
+        self.assertEqual(trigrams.count(["x", "b", "a"]), 0)
+        self.assertEqual(len(trigrams), 2)
+
+    def test_decode_and_section(self):
+        """Report section decodes IDs back to words."""
+        counters = ng.NGramCounters([2])
+        list(counters.track("to be or not to be".split()))
+        lines = ng.format_ngram_section(counters.counters[2], top=1)
+        self.assertEqual(lines[:2], ["Top 1 2-grams by frequency:", "to be: 2"])
+        self.assertIn("Total distinct 2-grams: 4", lines)
+        self.assertIn("Total 2-grams: 5", lines)
+
+    def test_long_ngrams_large_vocabulary(self):
+        """8-grams over hundreds of distinct words use wide keys."""
+        counters = ng.NGramCounters([2, 8])
+        words = [f"w{i}" for i in range(300)] * 2
+        list(counters.track(words))
+        octagrams = counters.counters[8]
+        self.assertIsInstance(octagrams.table, ng.DictCounter)
+        self.assertEqual(octagrams.total, 593)
+        self.assertEqual(octagrams.count(words[296:304]), 1)
+        self.assertEqual(octagrams.count(words[:8]), 2)
+        lines = counters.sections(top=1)
+        self.assertEqual(lines[1], "w0 w1: 2")
+        self.assertIn("w0 w1 w2 w3 w4 w5 w6 w7: 2", lines)
+
+    def test_trigrams_packed_until_vocabulary_outgrows_ids(self):
+        """Trigrams use 21-bit IDs and switch to wide keys past that width."""
+        counters = ng.NGramCounters([3])
+        trigrams = counters.counters[3]
+        self.assertEqual(trigrams.bits, 21)
+        self.assertIsInstance(trigrams.table, ng.PackedCounter)
+        trigrams.bits = 3
+        words = "a b c a b c d e f g h a b c".split()
+        list(counters.track(words))
+        self.assertIsInstance(trigrams.table, ng.DictCounter)
+        self.assertEqual(trigrams.bits, ng.ID_BITS)
+        self.assertEqual(trigrams.count(["a", "b", "c"]), 3)
+        self.assertEqual(trigrams.count(["g", "h", "a"]), 1)
+        self.assertEqual(trigrams.total, 12)
+        self.assertEqual(len(trigrams), 10)
+
+    def test_invalid_size(self):
+        """Sizes outside 2..8 are rejected."""
+        with self.assertRaises(ValueError):
+            ng.NGramCounter(1, ng.Vocabulary())
+
+
+if __name__ == "__main__":
+    unittest.main()
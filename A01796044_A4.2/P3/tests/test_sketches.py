@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Unit tests for sketches module (P3)."""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import sketches as sk
+
+
+class TestHyperLogLog(unittest.TestCase):
+    """Tests for HyperLogLog."""
+
+    def test_estimate_within_error(self):
+        """Estimate is within a few standard errors of the true count."""
+        hll = sk.HyperLogLog.from_error(0.02)
+        for i in range(20000):
+            hll.add_hash(sk.hash64(f"word{i}"))
+        error = abs(hll.estimate() - 20000) / 20000
+        self.assertLess(error, 4 * hll.standard_error)
+
+    def test_merge_is_union(self):
+        """Merging sketches estimates the union, not the sum."""
+        left, right = sk.HyperLogLog(12), sk.HyperLogLog(12)
+        for i in range(1000):
+            left.add_hash(sk.hash64(f"w{i}"))
+            right.add_hash(sk.hash64(f"w{i + 500}"))
+        left.merge(right)
+        self.assertAlmostEqual(left.estimate(), 1500, delta=150)
+
+    def test_invalid_precision(self):
+        """Precision outside 4..18 is rejected."""
+        with self.assertRaises(ValueError):
+            sk.HyperLogLog(2)
+
+
+class TestCountMinSketch(unittest.TestCase):
+    """Tests for CountMinSketch."""
+
+    def test_never_undercounts(self):
+        """Estimates are >= true counts and within the error bound."""
+        cms = sk.CountMinSketch(epsilon=0.01, delta=0.01)
+        for i in range(300):
+            cms.add_hash(sk.hash64(f"w{i % 30}"), count=1)
+        for i in range(30):
+            estimate = cms.estimate_hash(sk.hash64(f"w{i}"))
+            self.assertGreaterEqual(estimate, 10)
+            self.assertLessEqual(estimate, 10 + cms.error_bound)
+
+
+class TestWordSketch(unittest.TestCase):
+    """Tests for WordSketch."""
+
+    @staticmethod
+    def _words():
+        return ["the"] * 50 + ["cat"] * 20 + [f"rare{i}" for i in range(200)]
+
+    def test_heavy_hitters(self):
+        """The most frequent words are reported first."""
+        sketch = sk.WordSketch(epsilon=0.001, top=2)
+        sketch.update(self._words())
+        hitters = sketch.heavy_hitters()
+        self.assertEqual([word for word, _ in hitters], ["the", "cat"])
+        self.assertEqual(sketch.total, 270)
+
+    def test_merge_matches_single_pass(self):
+        """Two merged halves equal one sketch over everything."""
+        words = self._words()
+        whole = sk.WordSketch(top=5)
+        whole.update(words)
+        first, second = sk.WordSketch(top=5), sk.WordSketch(top=5)
+        first.update(words[::2])
+        second.update(words[1::2])
+        first.merge(second)
+        self.assertEqual(first.total, whole.total)
+        self.assertEqual(first.distinct.registers, whole.distinct.registers)
+        self.assertEqual(first.frequency.counts, whole.frequency.counts)
+        self.assertEqual(first.heavy_hitters()[:2], whole.heavy_hitters()[:2])
+
+    def test_save_and_load(self):
+        """A saved sketch loads back with the same state."""
+        sketch = sk.WordSketch(top=3)
+        sketch.update(self._words())
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            path = f.name
+        try:
+            sketch.save(path)
+            loaded = sk.WordSketch.load(path)
+            self.assertEqual(loaded.to_dict(), sketch.to_dict())
+        finally:
+            os.unlink(path)
+
+    def test_truncated_arrays_rejected(self):
+        """Registers or counts of the wrong length raise ValueError."""
+        data = sk.WordSketch(top=3).to_dict()
+        for key in ("registers", "counts"):
+            short = sk.base64.b64decode(data[key])[:-8]
+            broken = dict(data, **{key: sk.base64.b64encode(short).decode()})
+            with self.subTest(key=key):
+                with self.assertRaises(ValueError):
+                    sk.WordSketch.from_dict(broken)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Unit tests for wordCount module (P3)."""
 
+import io
 import os
 import sys
 import tempfile
@@ -35,6 +36,30 @@ class TestSplitIntoWords(unittest.TestCase):
             ["one", "two", "three"]
         )
 
+    def test_only_ascii_whitespace_separates(self):
+        """Only space, tab, newline and carriage return are separators."""
+        self.assertEqual(
+            wc.split_into_words("a\tb\r\nc\u00a0d\x0ce"),
+            ["a", "b", "c\u00a0d\x0ce"]
+        )
+
+
+class TestIterWords(unittest.TestCase):
+    """Tests for iter_words."""
+
+    def test_words_straddling_chunks(self):
+        """Words cut at chunk boundaries are joined back."""
+        text = "alpha  beta\ngamma delta epsilon"
+        for size in range(1, len(text) + 2):
+            self.assertEqual(
+                list(wc.iter_words(io.StringIO(text), chunk_size=size)),
+                wc.split_into_words(text)
+            )
+
+    def test_empty_stream(self):
+        """Empty or whitespace-only input yields no words."""
+        self.assertEqual(list(wc.iter_words(io.StringIO(" \n "), 2)), [])
+
 
 class TestCountWords(unittest.TestCase):
     """Tests for count_words."""
@@ -65,6 +90,229 @@ class TestRunWordCount(unittest.TestCase):
         finally:
             os.unlink(path)
 
+    def test_small_chunks_same_totals(self):
+        """Tiny read chunks give the same report, including totals."""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".txt", delete=False
+        ) as f:
+            f.write("Hello world\nhello  WORLD again\n")
+            path = f.name
+        try:
+            expected, _ = wc.run_word_count(path)
+            text, success = wc.run_word_count(path, chunk_size=3)
+            self.assertTrue(success)
+            self.assertEqual(text, expected)
+            self.assertIn("Total distinct words: 3", text)
+            self.assertIn("Total words: 5", text)
+        finally:
+            os.unlink(path)
+
+    def test_empty_file(self):
+        """A file without words is reported as unsuccessful."""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".txt", delete=False
+        ) as f:
+            f.write(" \n\t\n")
+            path = f.name
+        try:
+            text, success = wc.run_word_count(path)
+            self.assertFalse(success)
+            self.assertIn("No words", text)
+        finally:
+            os.unlink(path)
+
+
+class TestReportModes(unittest.TestCase):
+    """Tests for the top-K and threshold report modes."""
+
+    freq = {"b": 3, "a": 3, "c": 1, "d": 5, "e": 2}
+
+    def test_top_words_ties_alphabetical(self):
+        """Most frequent first; equal counts in alphabetical order."""
+        self.assertEqual(
+            wc.top_words(self.freq, 3), [("d", 5), ("a", 3), ("b", 3)]
+        )
+
+    def test_top_report_keeps_totals(self):
+        """Top-K report lists k words and the full totals."""
+        text = wc.format_report(self.freq, 14, top=2)
+        self.assertIn("d: 5\na: 3\n", text)
+        self.assertNotIn("b: 3", text)
+        self.assertIn("Total distinct words: 5", text)
+        self.assertIn("Total words: 14", text)
+
+    def test_min_count_report(self):
+        """Threshold report lists qualifying words alphabetically."""
+        text = wc.format_report(self.freq, 14, min_count=3)
+        self.assertIn("a: 3\nb: 3\nd: 5\n", text)
+        self.assertNotIn("e: 2", text)
+        self.assertIn("Total distinct words: 5", text)
+
+
+class TestCliModes(unittest.TestCase):
+    """Tests for the CLI mode selection."""
+
+    def test_modes_selected(self):
+        """Each mode option picks its run function."""
+        cases = (
+            ({}, wc.run_word_count),
+            ({"workers": "2", "top": "3"}, wc.run_word_count_parallel),
+            ({"approx": True, "sketch-out": "s.json"}, wc.run_word_count_approx),
+            ({"memory-budget": "5", "spill-dir": "d"}, wc.run_word_count_spill),
+            ({"ngrams": "2", "min-count": "2"}, wc.run_word_count_ngrams),
+            ({"compact-table": True}, wc.run_word_count_compact),
+        )
+        for options, run_func in cases:
+            with self.subTest(options=options):
+                self.assertIs(wc._select_run_func(options).func, run_func)
+
+    def test_conflicting_and_unknown_options(self):
+        """Two modes, options of another mode and unknown names are rejected."""
+        for options in (
+                {"approx": True, "workers": "2"},
+                {"ngrams": "2", "memory-budget": "1"},
+                {"compact-table": True, "workers": "4"},
+                {"sketch-out": "x.json"},
+                {"approx": True, "min-count": "2"},
+                {"workers": "2", "spill-dir": "d"},
+                {"bogus": "3"}):
+            with self.subTest(options=options):
+                with self.assertRaises(ValueError):
+                    wc._select_run_func(options)
+
+
+class TestSpillWordCount(unittest.TestCase):
+    """Tests for the spill-and-merge word count."""
+
+    def test_merge_runs_sums_counts(self):
+        """Runs and in-memory table merge alphabetically with summed counts."""
+        freq, runs, total = wc.count_words_spilling(
+            "b a C b c A d b".split(), memory_budget=2
+        )
+        self.assertEqual(total, 8)
+        self.assertTrue(runs)
+        self.assertEqual(
+            list(wc.merge_runs(freq, runs)),
+            [("a", 2), ("b", 3), ("c", 2), ("d", 1)]
+        )
+
+    def test_runs_merged_by_fan_in(self):
+        """Many spills are merged fan_in at a time and still sum up."""
+        words = [f"w{i % 50}" for i in range(1000)]
+        freq, runs, total = wc.count_words_spilling(
+            words, memory_budget=2, fan_in=3
+        )
+        self.assertEqual(total, 1000)
+        self.assertLess(len(runs), 3 * 6)
+        self.assertEqual(
+            dict(wc.merge_runs(freq, runs)), dict(wc.count_words(words))
+        )
+
+    def test_same_report_as_in_memory(self):
+        """Spilled reports match the in-memory ones in every mode."""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".txt", delete=False
+        ) as f:
+            f.write("one two three two Three THREE four five six\n" * 3)
+            path = f.name
+        try:
+            for options in ({}, {"top": 2}, {"min_count": 6}):
+                expected, _ = wc.run_word_count(path, **options)
+                chunks, success = wc.run_word_count_spill(
+                    path, memory_budget=2, **options
+                )
+                self.assertTrue(success)
+                self.assertEqual("".join(chunks), expected)
+        finally:
+            os.unlink(path)
+
+
+class TestCompactWordCount(unittest.TestCase):
+    """Tests for run_word_count_compact."""
+
+    def test_same_report_as_dict(self):
+        """Compact-table report matches the dict-based one."""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".txt", delete=False
+        ) as f:
+            f.write("b a B c a b\nd")
+            path = f.name
+        try:
+            expected, _ = wc.run_word_count(path)
+            chunks, success = wc.run_word_count_compact(path)
+            self.assertTrue(success)
+            self.assertEqual("".join(chunks), expected)
+        finally:
+            os.unlink(path)
+
+
+class TestApproxWordCount(unittest.TestCase):
+    """Tests for run_word_count_approx."""
+
+    def test_report_and_sketch_merge(self):
+        """Approximate report shows totals; saved sketches can be merged."""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".txt", delete=False
+        ) as f:
+            f.write("Hello world hello")
+            path = f.name
+        sketch_path = path + ".sketch"
+        try:
+            text, success = wc.run_word_count_approx(
+                path, sketch_out=sketch_path, top=5
+            )
+            self.assertTrue(success)
+            self.assertIn("hello: ~2", text)
+            self.assertIn("Total distinct words: ~2", text)
+            self.assertIn("Total words: 3", text)
+            text, _ = wc.run_word_count_approx(
+                path, sketch_in=[sketch_path], top=5
+            )
+            self.assertIn("hello: ~4", text)
+            self.assertIn("Total words: 6", text)
+        finally:
+            os.unlink(path)
+            if os.path.exists(sketch_path):
+                os.unlink(sketch_path)
+
+
+class TestParallelWordCount(unittest.TestCase):
+    """Tests for the map-reduce word count."""
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".txt", delete=False, encoding="utf-8"
+        ) as f:
+            f.write("Año niño ÑANDÚ año\r\n" * 7 + "zeta\talpha beta")
+            self.path = f.name
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_shards_cover_file_and_cut_on_whitespace(self):
+        """Shards are contiguous and start at whitespace."""
+        shards = wc.shard_boundaries(self.path, 5)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        self.assertEqual(shards[0][0], 0)
+        self.assertEqual(shards[-1][1], len(data))
+        for (_, end), (start, _) in zip(shards, shards[1:]):
+            self.assertEqual(end, start)
+            self.assertIn(data[start:start + 1], [b" ", b"\t", b"\n", b"\r"])
+
+    def test_same_report_as_sequential(self):
+        """Parallel output is identical to the sequential report."""
+        expected, _ = wc.run_word_count(self.path)
+        text, success = wc.run_word_count_parallel(self.path, workers=3)
+        self.assertTrue(success)
+        self.assertEqual(text, expected)
+
+    def test_tree_reduce(self):
+        """Partial tables are summed."""
+        tables = [{"a": 1}, {"a": 2, "b": 1}, {"b": 4}]
+        self.assertEqual(wc.tree_reduce(tables), {"a": 3, "b": 5})
+        self.assertEqual(wc.tree_reduce([]), {})
+
 
 if __name__ == "__main__":
     unittest.main()
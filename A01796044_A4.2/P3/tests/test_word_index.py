@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Unit tests for word_index module (P3)."""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import word_index as wi
+
+
+class TestWordIndex(unittest.TestCase):
+    """Tests for WordIndex."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = wi.WordIndex(os.path.join(self.tmp_dir.name, "idx.db"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_incremental_add_and_count(self):
+        """Counts accumulate across files; queries are case-insensitive."""
+        self.index.add_file(self._write("a.txt", "Hello world hello"))
+        self.index.add_file(self._write("b.txt", "hello again"))
+        self.assertEqual(self.index.count("HELLO"), 3)
+        self.assertEqual(self.index.count("missing"), 0)
+        self.assertEqual(self.index.total_words(), 5)
+
+    def test_same_content_is_skipped(self):
+        """A file with already ingested content is not counted twice."""
+        first = self._write("a.txt", "one two")
+        copy = self._write("copy.txt", "one two")
+        self.assertEqual(self.index.add_file(first)[0], "added")
+        self.assertEqual(self.index.add_file(copy)[0], "skipped")
+        self.assertEqual(self.index.count("one"), 1)
+
+    def test_changed_file_is_reported(self):
+        """A known path whose content changed is an error."""
+        path = self._write("a.txt", "one")
+        self.index.add_file(path)
+        self._write("a.txt", "two")
+        self.assertEqual(self.index.add_file(path)[0], "error")
+
+    def test_top_and_entries_after_compaction(self):
+        """Top-K and the alphabetical listing see every ingested count."""
+        self.index.add_file(self._write("a.txt", "b a b c b a"))
+        self.index.compact()
+        self.index.add_file(self._write("b.txt", "c c c"))
+        self.assertEqual(self.index.top(2), [("c", 4), ("b", 3)])
+        self.assertEqual(
+            list(self.index.iter_entries()), [("a", 2), ("b", 3), ("c", 4)]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,10 +3,19 @@
 import sys
 
 
-def parse_numbers(lines):
-    """Parse lines into valid numbers, return (numbers_list, errors_list)."""
+def invalid_line_message(line_num, line):
+    """Error message for a line that is not a number."""
+    return f"Error in line {line_num}: invalid data '{line}'"
+
+
+def parse_number_lines(lines):
+    """
+    Parse lines into valid numbers without reporting errors.
+    Return (numbers_list, invalid) where invalid lists (line_num, line) for
+    every non-blank line that is not a number.
+    """
     numbers = []
-    errors = []
+    invalid = []
     for line_num, line in enumerate(lines, start=1):
         line = line.strip()
         if not line:
@@ -15,9 +24,16 @@ def parse_numbers(lines):
             value = float(line)
             numbers.append(value)
         except ValueError:
-            msg = f"Error in line {line_num}: invalid data '{line}'"
-            errors.append(msg)
-            print(msg, file=sys.stderr)
+            invalid.append((line_num, line))
+    return numbers, invalid
+
+
+def parse_numbers(lines):
+    """Parse lines into valid numbers, return (numbers_list, errors_list)."""
+    numbers, invalid = parse_number_lines(lines)
+    errors = [invalid_line_message(*entry) for entry in invalid]
+    for msg in errors:
+        print(msg, file=sys.stderr)
     return numbers, errors
 
 
@@ -17,23 +17,118 @@ def validate_input_file(input_path):
         sys.exit(1)
 
 
+def split_cli_args(argv, flags=()):
+    """
+    Split argv into (positional_args, options).
+    Options are '--name value' or '--name=value'; names listed in flags
+    take no value and are stored as True. Raises ValueError on a missing value.
+    """
+    positional = []
+    options = {}
+    args = iter(argv)
+    for arg in args:
+        if not arg.startswith("--"):
+            positional.append(arg)
+            continue
+        name, sep, value = arg[2:].partition("=")
+        if name in flags:
+            options[name] = True
+            continue
+        if not sep:
+            value = next(args, None)
+            if value is None:
+                raise ValueError(f"Option --{name} requires a value")
+        options[name] = value
+    return positional, options
+
+
+def parse_cli(argv, usage, parse_options, flags=()):
+    """
+    Split argv (see split_cli_args) and read the options with
+    parse_options(options). Prints the error and usage and exits with 1 if
+    an option is invalid (ValueError) or no input file is given.
+    Returns (positional_args, parse_options_result).
+    """
+    try:
+        args, options = split_cli_args(argv, flags)
+        parsed = parse_options(options)
+    except ValueError as err:
+        print(f"Error: {err}\n{usage}", file=sys.stderr)
+        sys.exit(1)
+    if not args:
+        print(usage, file=sys.stderr)
+        sys.exit(1)
+    return args, parsed
+
+
+def int_option(options, name, default=None, minimum=1):
+    """Read an integer option, raising ValueError if it is below minimum."""
+    if name not in options:
+        return default
+    value = int(options[name])
+    if value < minimum:
+        raise ValueError(f"--{name} must be an integer >= {minimum}")
+    return value
+
+
+def float_option(options, name, default=None, low=0.0, high=1.0):
+    """Read a float option, raising ValueError unless low < value < high."""
+    if name not in options:
+        return default
+    value = float(options[name])
+    if not low < value < high:
+        raise ValueError(f"--{name} must be between {low} and {high}")
+    return value
+
+
 def run_timed_main(run_func, input_path, output_path):
     """
     Validate input, run run_func(input_path), time it, write results to output_path.
-    run_func must return (results_text, success).
+    run_func must return (results_text, success). results_text may also be an
+    iterable of text chunks, which are written and printed as they are produced.
     Exits with 0 if success else 1.
     """
     validate_input_file(input_path)
 
     start = time.perf_counter()
     results_text, success = run_func(input_path)
-    elapsed = time.perf_counter() - start
-
-    time_line = f"Time elapsed: {elapsed:.6f} seconds"
-    full_output = results_text + time_line + "\n"
+    if isinstance(results_text, str):
+        elapsed = time.perf_counter() - start
+        chunks = (results_text,)
+    else:
+        elapsed = None
+        chunks = results_text
 
     with open(output_path, "w", encoding="utf-8") as out_file:
-        out_file.write(full_output)
+        for chunk in chunks:
+            out_file.write(chunk)
+            print(chunk, end="")
+        if elapsed is None:
+            elapsed = time.perf_counter() - start
+        time_line = f"Time elapsed: {elapsed:.6f} seconds"
+        out_file.write(time_line + "\n")
+
+    print(time_line + "\n")
+    sys.exit(0 if success else 1)
+
 
-    print(full_output)
+def run_timed_file_main(run_func, input_path, output_path):
+    """
+    Like run_timed_main for machine-readable output: the file at output_path
+    receives only the results (str or iterable of chunks), nothing is echoed,
+    and the elapsed time goes to stderr. On failure the results text is
+    printed to stderr and no file is written. Exits with 0 if success else 1.
+    """
+    validate_input_file(input_path)
+
+    start = time.perf_counter()
+    results, success = run_func(input_path)
+    chunks = (results,) if isinstance(results, str) else results
+    if success:
+        with open(output_path, "w", encoding="utf-8") as out_file:
+            out_file.writelines(chunks)
+    else:
+        print("".join(chunks), end="", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    print(f"Time elapsed: {elapsed:.6f} seconds", file=sys.stderr)
     sys.exit(0 if success else 1)
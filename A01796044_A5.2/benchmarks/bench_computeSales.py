@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name,wrong-import-position
+"""
+Scaling benchmark for computeSales: for each size, generate a synthetic
+catalogue and sales record (generateSalesData), time run_compute_sales
+writing its report to a file as the command line does, measure its peak
+traced memory (and the peak RSS of the --workers processes), then write
+every result to a JSON file.
+"""
+
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+from computeSales import parse_args, run_compute_sales  # noqa: E402
+from generateSalesData import generate_files  # noqa: E402
+
+DEFAULT_SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+RESULTS_VERSION = 2
+USAGE = (
+    "Usage: python bench_computeSales.py [--sizes N,N,...] [--products N]\n"
+    "       [--items N] [--error-rate F] [--format json|jsonl] "
+    "[--workers N]\n"
+    "       [--repeat N] [--no-memory] [--seed N] [--output results.json]"
+)
+
+
+def parse_size(text):
+    """Line item count, accepting 1000, 1e6 or 10**8."""
+    if "**" in text:
+        base, exponent = text.split("**")
+        return int(base) ** int(exponent)
+    return int(float(text))
+
+
+def children_peak_rss():
+    """
+    Peak resident set size in bytes of the largest child process waited for
+    so far (the worker pools, which are shut down after each run), or None
+    without the resource module. It never decreases during a benchmark.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_to_file(catalogue_path, sales_path, workers=None):
+    """
+    run_compute_sales streaming the report to SalesResults.txt next to the
+    sales file, as the command line does. Returns success.
+    """
+    output_path = os.path.join(os.path.dirname(sales_path),
+                               "SalesResults.txt")
+    with open(output_path, "w", encoding="utf-8") as out:
+        return run_compute_sales(catalogue_path, sales_path, workers,
+                                 output=out)[1]
+
+
+def measure(catalogue_path, sales_path, workers=None, repeat=1,
+            memory=True):
+    """
+    Best wall time of `repeat` runs (run_to_file) and, unless memory is
+    False, the peak memory traced by tracemalloc in one extra run (tracing
+    slows the run down, so it is never timed). tracemalloc only sees this
+    process; with workers the peak RSS of the largest worker so far
+    (children_peak_rss) is returned too. Returns (seconds, peak,
+    worker_peak, success).
+    """
+    seconds = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        success = run_to_file(catalogue_path, sales_path, workers)
+        seconds = min(seconds, time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run_to_file(catalogue_path, sales_path, workers)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    worker_peak = children_peak_rss() if workers and workers > 1 else None
+    return seconds, peak, worker_peak, success
+
+
+def scaling_exponents(results):
+    """
+    Local exponent k of time ~ n**k between consecutive sizes (1 is linear).
+    """
+    exponents = []
+    for prev, cur in zip(results, results[1:]):
+        exponents.append({
+            "from": prev["line_items"],
+            "to": cur["line_items"],
+            "exponent": round(
+                math.log(cur["seconds"] / prev["seconds"])
+                / math.log(cur["line_items"] / prev["line_items"]), 3
+            ),
+        })
+    return exponents
+
+
+def run_benchmark(sizes, products=1000, items=3, error_rate=0.0,
+                  sales_format="json", workers=None, repeat=1, memory=True,
+                  seed=0, status=None):
+    """
+    Benchmark every size (in line items; sales = size // items) and return
+    the results document.
+    """
+    # One keyword argument per command-line option
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    # pylint: disable=too-many-locals
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            catalogue_path, sales_path = generate_files(
+                tmp, products=products, sales=max(1, size // items),
+                items=items, error_rate=error_rate,
+                sales_format=sales_format, seed=seed,
+            )
+            seconds, peak, worker_peak, success = measure(
+                catalogue_path, sales_path, workers, repeat, memory
+            )
+            result = {
+                "line_items": size,
+                "sales": max(1, size // items),
+                "sales_bytes": os.path.getsize(sales_path),
+                "seconds": round(seconds, 6),
+                "line_items_per_second": round(size / seconds),
+                "peak_memory_bytes": peak,
+                "worker_peak_rss_bytes": worker_peak,
+                "success": success,
+            }
+        results.append(result)
+        if status:
+            status(result)
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {
+            "products": products,
+            "items_per_sale": items,
+            "error_rate": error_rate,
+            "format": sales_format,
+            "workers": workers,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+        "scaling": scaling_exponents(results),
+    }
+
+
+def print_result(result):
+    """One progress line per benchmarked size."""
+    peak = result["peak_memory_bytes"]
+    memory = "-" if peak is None else f"{peak / 2 ** 20:.1f} MiB"
+    worker_peak = result["worker_peak_rss_bytes"]
+    if worker_peak is not None:
+        memory += f", worker RSS {worker_peak / 2 ** 20:.1f} MiB"
+    print(f"{result['line_items']:>12} items  {result['seconds']:>10.3f} s  "
+          f"{result['line_items_per_second']:>10} items/s  peak {memory}",
+          flush=True)
+
+
+def main():
+    """Entry point: run the benchmark and write the JSON results."""
+    try:
+        _, options = parse_args(sys.argv[1:], flags=("no-memory",))
+        sizes = [
+            parse_size(size) for size in
+            options.get("sizes", ",".join(map(str, DEFAULT_SIZES))).split(",")
+        ]
+        settings = {
+            "products": int(options.get("products", 1000)),
+            "items": int(options.get("items", 3)),
+            "error_rate": float(options.get("error-rate", 0.0)),
+            "sales_format": options.get("format", "json"),
+            "workers": (int(options["workers"]) if "workers" in options
+                        else None),
+            "repeat": int(options.get("repeat", 1)),
+            "memory": not options.get("no-memory", False),
+            "seed": int(options.get("seed", 0)),
+        }
+        if min(sizes + [settings["products"], settings["items"],
+                        settings["repeat"]]) < 1:
+            raise ValueError("sizes, --products, --items and --repeat "
+                             "must be >= 1")
+    except ValueError as err:
+        print(f"Error: {err}\n{USAGE}", file=sys.stderr)
+        sys.exit(1)
+
+    document = run_benchmark(sizes, status=print_result, **settings)
+    output_path = options.get("output", "benchmark_results.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    for step in document["scaling"]:
+        print(f"{step['from']} -> {step['to']}: time ~ n^{step['exponent']}")
+    print(f"Results written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name,wrong-import-position
+"""
+Compare the installed JSON backends (json_backend.BACKENDS) on large
+files: parsing whole JSON documents, parsing JSON Lines line by line,
+serializing with indent=2 and a full run_compute_sales on each file pair.
+Without file arguments a synthetic catalogue and JSON Lines sales record
+are generated (generateSalesData).
+"""
+
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import json_backend  # noqa: E402
+from computeSales import parse_args, run_compute_sales  # noqa: E402
+from json_readers import JSON_LINES_EXTENSIONS  # noqa: E402
+from generateSalesData import generate_files  # noqa: E402
+
+RESULTS_VERSION = 1
+USAGE = (
+    "Usage: python bench_json_backends.py [catalogue.json sales.json|.jsonl]"
+    "\n       [--sales N] [--repeat N] [--output results.json]"
+)
+
+
+def best_time(func, repeat):
+    """Best wall time of `repeat` calls to func."""
+    seconds = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds
+
+
+def parse_file(path):
+    """Parse a JSON document, or every line of a JSON Lines file."""
+    loads = json_backend.loads
+    if path.lower().endswith(JSON_LINES_EXTENSIONS):
+        with open(path, "rb") as f:
+            return [loads(line) for line in f if line.strip()]
+    with open(path, "r", encoding="utf-8") as f:
+        return loads(f.read())
+
+
+def bench_backend(name, catalogue_path, sales_path, repeat):
+    """Timings (seconds) of every benchmark with one backend."""
+    json_backend.set_backend(name)
+    sales = parse_file(sales_path)
+    return {
+        "backend": name,
+        "parse_catalogue": best_time(
+            lambda: parse_file(catalogue_path), repeat
+        ),
+        "parse_sales": best_time(lambda: parse_file(sales_path), repeat),
+        "dumps_sales": best_time(
+            lambda: json_backend.dumps(sales, indent=2, ensure_ascii=False),
+            repeat,
+        ),
+        "compute_sales": best_time(
+            lambda: run_compute_sales(catalogue_path, sales_path), repeat
+        ),
+    }
+
+
+def run_benchmark(catalogue_path, sales_path, repeat=3):
+    """Benchmark every installed backend and return the results document."""
+    original = json_backend.backend_name()
+    names = []
+    for name in json_backend.BACKENDS:
+        if json_backend.set_backend(name) == name:
+            names.append(name)
+    try:
+        results = [
+            bench_backend(name, catalogue_path, sales_path, repeat)
+            for name in names
+        ]
+    finally:
+        json_backend.set_backend(original)
+    baseline = next(res for res in results if res["backend"] == "json")
+    for res in results:
+        res["speedup"] = {
+            key: round(baseline[key] / res[key], 2)
+            for key in baseline if key != "backend"
+        }
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "files": {
+            path: os.path.getsize(path)
+            for path in (catalogue_path, sales_path)
+        },
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main():
+    """Entry point: run the comparison and write the JSON results."""
+    try:
+        args, options = parse_args(sys.argv[1:])
+        repeat = int(options.get("repeat", 3))
+        sales = int(options.get("sales", 100000))
+        if min(repeat, sales) < 1 or len(args) not in (0, 2):
+            raise ValueError("expected two files, --repeat and --sales >= 1")
+    except ValueError as err:
+        print(f"Error: {err}\n{USAGE}", file=sys.stderr)
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args:
+            args = generate_files(tmp, products=1000, sales=sales,
+                                  sales_format="jsonl")
+        document = run_benchmark(*args, repeat=repeat)
+    output_path = options.get("output", "json_backends.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    for res in document["results"]:
+        print(f"{res['backend']:>7}: " + "  ".join(
+            f"{key} {res[key]:.3f} s (x{res['speedup'][key]})"
+            for key in res["speedup"]
+        ))
+    print(f"Results written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
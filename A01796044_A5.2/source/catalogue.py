@@ -0,0 +1,394 @@
+"""
+Price catalogue of computeSales: validation into a title -> price map,
+with PriceHistory values for products whose prices have effective dates,
+the compiled map cached between runs (see load_price_map), and the
+tolerant title lookup of --normalize-titles (see build_title_index).
+"""
+
+import hashlib
+import json
+import marshal
+import math
+import os
+import sys
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+
+import json_backend
+from json_readers import json_error_message, load_json_file
+from money import to_minor_units
+
+SALE_DATE_KEYS = ("date", "Date")
+# marshal's format is specific to the interpreter, so it is part of the key
+CATALOGUE_CACHE_FORMAT = (
+    f"computeSales-catalogue-3-{sys.implementation.cache_tag}"
+)
+
+
+@lru_cache(maxsize=4096)
+def date_ordinal(text):
+    """
+    Day ordinal of an ISO date "YYYY-MM-DD" (a time part after "T" or a
+    space is ignored). Raises ValueError or TypeError if it is not a date.
+    """
+    if len(text) > 10 and text[10] not in "T ":
+        raise ValueError(f"invalid date '{text}'")
+    return date.fromisoformat(text[:10]).toordinal()
+
+
+def sale_date_ordinal(sale_item):
+    """Day ordinal of a sale's date, or 0 if it has no valid date."""
+    for key in SALE_DATE_KEYS:
+        value = sale_item.get(key)
+        if value:
+            try:
+                return date_ordinal(value)
+            except (TypeError, ValueError):
+                return 0
+    return 0
+
+
+class PriceHistory:
+    """
+    Prices of one product over time: non-overlapping, inclusive day ranges
+    sorted by their first day, so a price is found by bisection.
+    """
+
+    __slots__ = ("starts", "ends", "prices")
+
+    def __init__(self, starts, ends, prices):
+        """Wrap parallel lists of first day, last day and price."""
+        self.starts = starts
+        self.ends = ends
+        self.prices = prices
+
+    def at(self, day):
+        """Price on a day ordinal, or None if no range covers it."""
+        pos = bisect_right(self.starts, day) - 1
+        if pos >= 0 and day <= self.ends[pos]:
+            return self.prices[pos]
+        return None
+
+    def to_tuple(self):
+        """(starts, ends, prices); PriceHistory(*t) rebuilds it."""
+        return self.starts, self.ends, self.prices
+
+    def __eq__(self, other):
+        return (isinstance(other, PriceHistory) and
+                self.to_tuple() == other.to_tuple())
+
+    def __repr__(self):
+        return f"PriceHistory{self.to_tuple()!r}"
+
+
+def _effective_range(item):
+    """
+    (first, last) day ordinals of a dated catalogue entry; a missing bound
+    is open. Raises ValueError or TypeError if the dates are invalid.
+    """
+    first = item.get("effective_from")
+    last = item.get("effective_to")
+    first_day = 1 if first is None else date_ordinal(first)
+    last_day = date.max.toordinal() if last is None else date_ordinal(last)
+    if first_day > last_day:
+        raise ValueError("effective_from is after effective_to")
+    return first_day, last_day
+
+
+def _price_history(title, ranges, errors):
+    """
+    PriceHistory from (first, last, price, entry_idx) ranges of one title.
+    A range overlapping an earlier one is reported in errors and dropped.
+    """
+    starts, ends, prices = [], [], []
+    kept_idx = None
+    for first, last, price, idx in sorted(ranges):
+        if ends and first <= ends[-1]:
+            errors.append(
+                f"Catalog entry {idx + 1} ({title}): effective dates "
+                f"overlap catalog entry {kept_idx + 1}"
+            )
+            continue
+        starts.append(first)
+        ends.append(last)
+        prices.append(price)
+        kept_idx = idx
+    return PriceHistory(starts, ends, prices)
+
+
+def _catalogue_price(price, minor_units):
+    """
+    Validated price of a catalogue entry: a float, or an integer number of
+    minor units with minor_units=True. Raises ValueError with the reason
+    the price is invalid.
+    """
+    try:
+        price_val = float(price)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid price '{price}'") from None
+    if price_val < 0:
+        raise ValueError(f"negative price {price_val}")
+    if not minor_units:
+        return price_val
+    if not math.isfinite(price_val):
+        raise ValueError(f"invalid price '{price}'")
+    try:
+        return to_minor_units(price_val)
+    except ValueError as exc:
+        raise ValueError(f"price '{price}' has {exc}") from None
+
+
+def build_price_map(catalogue_data, minor_units=False):
+    """
+    Build mapping of product title -> price from catalogue.
+    With minor_units=True prices are integers of 1/10000 dollar (see
+    to_minor_units), so sale totals are summed exactly. Entries with
+    effective_from and/or effective_to (inclusive ISO dates) make the
+    title's value a PriceHistory; overlapping ranges, and a title with
+    both dated and undated prices, are reported as errors.
+    Handles invalid entries; returns (dict, list_of_errors).
+    """
+    price_map = {}
+    dated = {}
+    errors = []
+
+    if not isinstance(catalogue_data, list):
+        errors.append("Price catalogue must be a JSON array.")
+        return price_map, errors
+
+    for idx, item in enumerate(catalogue_data):
+        if not isinstance(item, dict):
+            errors.append(
+                f"Catalog entry {idx + 1}: expected object,"
+                f" got {type(item).__name__}"
+            )
+            continue
+
+        title = item.get("title") or item.get("name") or item.get("product")
+        price = item.get("price")
+
+        if title is None or title == "":
+            errors.append(
+                f"Catalog entry {idx + 1}: "
+                "missing product title/name"
+            )
+            continue
+
+        if price is None:
+            errors.append(f"Catalog entry {idx + 1} ({title}): missing price")
+            continue
+
+        try:
+            price_val = _catalogue_price(price, minor_units)
+        except ValueError as exc:
+            errors.append(f"Catalog entry {idx + 1} ({title}): {exc}")
+            continue
+
+        title_str = str(title).strip()
+        if "effective_from" not in item and "effective_to" not in item:
+            if title_str in dated:
+                errors.append(
+                    f"Catalog entry {idx + 1} ({title}): "
+                    "undated price for a product with dated prices"
+                )
+                continue
+            price_map[title_str] = price_val
+            continue
+
+        try:
+            first_day, last_day = _effective_range(item)
+        except (TypeError, ValueError):
+            errors.append(
+                f"Catalog entry {idx + 1} ({title}): invalid effective dates"
+            )
+            continue
+        if title_str in price_map and title_str not in dated:
+            errors.append(
+                f"Catalog entry {idx + 1} ({title}): "
+                "dated price for a product with an undated price"
+            )
+            continue
+        # Keep the catalogue order of titles; the history is set below
+        price_map.setdefault(title_str, None)
+        dated.setdefault(title_str, []).append(
+            (first_day, last_day, price_val, idx)
+        )
+
+    for title_str, ranges in dated.items():
+        price_map[title_str] = _price_history(title_str, ranges, errors)
+
+    return price_map, errors
+
+
+def _catalogue_cache_path(catalogue_path, cache_dir):
+    """Cache file of a catalogue: one per absolute catalogue path."""
+    key = hashlib.sha256(os.path.abspath(catalogue_path).encode("utf-8"))
+    return os.path.join(cache_dir, f"catalogue-{key.hexdigest()[:32]}.bin")
+
+
+def _read_catalogue_cache(cache_path):
+    """Cache entry dict, or None if it is missing, unreadable or stale."""
+    try:
+        with open(cache_path, "rb") as f:
+            # One read: marshal.load on a file object reads in small pieces
+            entry = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (not isinstance(entry, dict) or
+            entry.get("format") != CATALOGUE_CACHE_FORMAT):
+        return None
+    if entry["dated"]:
+        entry["price_map"] = {
+            title: PriceHistory(*price) if isinstance(price, tuple) else price
+            for title, price in entry["price_map"].items()
+        }
+    return entry
+
+
+def _write_catalogue_cache(cache_path, entry):
+    """Write a cache entry atomically; errors are ignored (it is optional)."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    if entry["dated"]:
+        # marshal only handles built-in types: store histories as tuples
+        entry = dict(entry, price_map={
+            title: price.to_tuple() if isinstance(price, PriceHistory)
+            else price
+            for title, price in entry["price_map"].items()
+        })
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(marshal.dumps(entry))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def load_price_map(catalogue_path, cache_dir=None):
+    """
+    Read and validate the catalogue into a price map of minor units.
+    Returns (price_map, errors); price_map is None if the file cannot be
+    read or is not valid JSON.
+
+    With cache_dir, the compiled price map and its validation errors are
+    stored there (marshal) keyed on the catalogue's size, mtime and SHA-256.
+    An entry whose size and mtime match is used without opening the
+    catalogue; if only the mtime changed, the file is hashed and the entry
+    reused when its content is the same. Anything else rebuilds the entry.
+    """
+    if cache_dir is None:
+        catalogue_data, cat_err = load_json_file(catalogue_path)
+        if cat_err:
+            return None, [cat_err]
+        return build_price_map(catalogue_data, minor_units=True)
+
+    cache_path = _catalogue_cache_path(catalogue_path, cache_dir)
+    entry = _read_catalogue_cache(cache_path)
+    try:
+        stat = os.stat(catalogue_path)
+        if entry and (entry["size"], entry["mtime_ns"]) == (
+                stat.st_size, stat.st_mtime_ns):
+            return entry["price_map"], entry["errors"]
+        with open(catalogue_path, "rb") as f:
+            raw = f.read()
+        sha256 = hashlib.sha256(raw).hexdigest()
+        if not (entry and entry["sha256"] == sha256):
+            catalogue_data = json_backend.loads(raw.decode("utf-8"))
+            price_map, errors = build_price_map(
+                catalogue_data, minor_units=True
+            )
+            entry = {
+                "price_map": price_map,
+                "errors": errors,
+                "dated": any(
+                    isinstance(price, PriceHistory)
+                    for price in price_map.values()
+                ),
+            }
+    except (OSError, json.JSONDecodeError) as e:
+        return None, [json_error_message(catalogue_path, e)]
+
+    entry.update(
+        format=CATALOGUE_CACHE_FORMAT,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        sha256=sha256,
+    )
+    _write_catalogue_cache(cache_path, entry)
+    return entry["price_map"], entry["errors"]
+
+
+def normalize_title(title):
+    """Case- and spacing-insensitive form of a product title."""
+    return " ".join(title.split()).casefold()
+
+
+class TitleIndex:  # pylint: disable=too-few-public-methods
+    """
+    Tolerant product title lookup: normalized title (see normalize_title)
+    -> catalogue title, plus normalized aliases for known misspellings.
+    Each distinct raw title is normalized once and its result cached.
+    """
+
+    def __init__(self, keys):
+        """Wrap a normalized key -> catalogue title dict."""
+        self.keys = keys
+        self.resolved = {}
+
+    def resolve(self, title):
+        """Catalogue title matching a raw title, or None."""
+        try:
+            return self.resolved[title]
+        except KeyError:
+            match = self.keys.get(normalize_title(title))
+            self.resolved[title] = match
+            return match
+
+
+def build_title_index(price_map, aliases=None):
+    """
+    Build the TitleIndex of a price map and an optional alias -> catalogue
+    title dict. Returns (TitleIndex, list_of_errors): titles that only
+    differ in case or spacing are ambiguous and only match exactly, and
+    invalid aliases are skipped.
+    """
+    keys = {}
+    clashes = {}
+    errors = []
+    for title in price_map:
+        key = normalize_title(title)
+        if key in keys:
+            clashes.setdefault(key, [keys[key]]).append(title)
+        else:
+            keys[key] = title
+    for key, clashing in clashes.items():
+        del keys[key]
+        errors.append(
+            "Catalog titles " + ", ".join(f"'{title}'" for title in clashing) +
+            " only differ in case or spacing: they are matched exactly"
+        )
+
+    if aliases is None:
+        return TitleIndex(keys), errors
+    if not isinstance(aliases, dict):
+        errors.append("Title aliases must be a JSON object.")
+        return TitleIndex(keys), errors
+    for alias, target in aliases.items():
+        target = target.strip() if isinstance(target, str) else target
+        if target not in price_map:
+            errors.append(
+                f"Alias '{alias}': product '{target}' not in catalogue"
+            )
+            continue
+        key = normalize_title(alias)
+        if keys.get(key, target) != target or key in clashes:
+            errors.append(
+                f"Alias '{alias}': conflicts with a catalogue product title"
+            )
+            continue
+        keys[key] = target
+    return TitleIndex(keys), errors
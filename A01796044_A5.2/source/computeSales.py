@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+# The program is a single script run as `python computeSales.py`
 # pylint: disable=invalid-name
 """
 Compute total cost for all sales using a price catalogue.
@@ -6,239 +7,289 @@ Reads price catalogue JSON and sales record JSON, outputs human-readable
 results to screen and SalesResults.txt. Handles invalid data gracefully.
 """
 
+import io
 import json
+import math
 import os
+import shutil
 import sys
 import time
 
-
-def load_json_file(filepath):
+from catalogue import build_title_index, load_price_map
+from json_readers import (
+    NotAJsonArrayError, detect_sales_format, iter_sales, json_error_message,
+    load_json_file,
+)
+from sale_totals import process_sales
+from sales_follow import FOLLOW_INTERVAL, follow_sales
+from sales_parallel import process_sales_parallel
+from sales_report import (
+    DEFAULT_ERROR_SAMPLE, DEFAULT_TOP, ErrorSummary, SaleDetails,
+    SalesAnalytics, SalesError, write_sales_report,
+)
+
+# Options that only apply to a one-off run
+FOLLOW_UNSUPPORTED = (
+    "workers", "analytics", "top", "export-analytics", "normalize-titles",
+    "aliases", "max-errors", "errors-jsonl", "details-csv",
+)
+USAGE = (
+    "Usage: python computeSales.py "
+    "priceCatalogue.json salesRecord.json [--workers N] [--cache-dir DIR]\n"
+    "       [--analytics] [--top N] [--export-analytics file.csv|file.json]\n"
+    "       [--normalize-titles] [--aliases aliases.json]\n"
+    "       [--max-errors N] [--errors-jsonl errors.jsonl]\n"
+    "       [--details-csv details.csv]\n"
+    "       [--follow [--interval SECONDS] [--checkpoint state.json]]"
+)
+
+
+def _process_sales_file(sales_path, price_map, workers, **options):
     """
-    Load JSON from file. Returns (data, error_message).
-    On success: (data, None). On failure: (None, error_msg).
+    Total a sales file of either format, in a process pool when
+    workers > 1. options are the analytics, titles and errors arguments of
+    process_sales. Returns (details, errors, grand_total).
     """
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data, None
-    except FileNotFoundError:
-        return None, f"Error: File not found: {filepath}"
-    except json.JSONDecodeError as e:
-        return None, f"Error: Invalid JSON in {filepath}: {e}"
-    except OSError as e:
-        return None, f"Error reading {filepath}: {e}"
+    sales_format = detect_sales_format(sales_path)
+    if workers and workers > 1:
+        return process_sales_parallel(
+            sales_path, sales_format, price_map, workers, **options
+        )
+    return process_sales(
+        iter_sales(sales_path, sales_format), price_map, **options
+    )
 
 
-def build_price_map(catalogue_data):
+def _load_lookup(catalogue_path, cache_dir=None, normalize_titles=False,
+                 aliases_path=None):
     """
-    Build mapping of product title -> price from catalogue.
-    Handles invalid entries; returns (dict, list_of_errors).
+    load_price_map plus, with normalize_titles or aliases_path, the
+    TitleIndex of the catalogue (see build_title_index). Returns
+    (price_map, titles, errors); price_map is None if the catalogue or
+    the aliases file cannot be used.
     """
-    price_map = {}
-    errors = []
-
-    if not isinstance(catalogue_data, list):
-        errors.append("Price catalogue must be a JSON array.")
-        return price_map, errors
-
-    for idx, item in enumerate(catalogue_data):
-        if not isinstance(item, dict):
-            errors.append(
-                f"Catalog entry {idx + 1}: expected object,"
-                f" got {type(item).__name__}"
-            )
-            continue
-
-        title = item.get("title") or item.get("name") or item.get("product")
-        price = item.get("price")
-
-        if title is None or title == "":
-            errors.append(
-                f"Catalog entry {idx + 1}: "
-                "missing product title/name"
-            )
-            continue
-
-        if price is None:
-            errors.append(f"Catalog entry {idx + 1} ({title}): missing price")
-            continue
-
-        try:
-            price_val = float(price)
-        except (TypeError, ValueError):
-            errors.append(
-                f"Catalog entry {idx + 1} "
-                f"({title}): invalid price '{price}'"
-            )
-            continue
-
-        if price_val < 0:
-            errors.append(
-                f"Catalog entry {idx + 1} "
-                f"({title}): negative price {price_val}"
-            )
-            continue
-
-        price_map[str(title).strip()] = price_val
-
-    return price_map, errors
-
-
-def compute_sale_total(sale_item, price_map, sale_idx):
+    price_map, errors = load_price_map(catalogue_path, cache_dir)
+    errors = list(errors)
+    if price_map is None or not (normalize_titles or aliases_path):
+        return price_map, None, errors
+    aliases = None
+    if aliases_path:
+        aliases, aliases_err = load_json_file(aliases_path)
+        if aliases_err:
+            return None, None, errors + [aliases_err]
+    titles, title_errors = build_title_index(price_map, aliases)
+    return price_map, titles, errors + title_errors
+
+
+def _open_sinks(errors, max_errors=None, errors_jsonl=None,
+                details_csv=None):
     """
-    Compute total for one sale. Returns (total, errors).
+    Open the SaleDetails of run_compute_sales and, with max_errors and/or
+    errors_jsonl, an ErrorSummary that starts with `errors`. Returns
+    (details, summary, error): summary is None without those options, and
+    error is the message for a file that cannot be written (both sinks are
+    then None).
     """
-    errors = []
-    total = 0.0
-
-    products = (
-        sale_item.get("Products") or
-        sale_item.get("products") or
-        sale_item.get("items") or
-        sale_item.get("items")
-    )
-    if products is None:
-        errors.append(
-            f"Sale {sale_idx + 1}: "
-            "missing Products/products/items array"
-        )
-        return total, errors
-
-    if not isinstance(products, list):
-        errors.append(f"Sale {sale_idx + 1}: Products must be an array")
-        return total, errors
-
-    for pidx, prod in enumerate(products):
-        if not isinstance(prod, dict):
-            errors.append(
-                f"Sale {sale_idx + 1}, "
-                f"item {pidx + 1}: expected object"
-            )
-            continue
-
-        title = prod.get("title") or prod.get("name") or prod.get("product")
-        qty = prod.get("quantity") or prod.get("qty") or prod.get("amount", 1)
-
-        if title is None or title == "":
-            errors.append(
-                f"Sale {sale_idx + 1}, "
-                f"item {pidx + 1}: missing product title"
-            )
-            continue
-
+    summary = None
+    if max_errors is not None or errors_jsonl:
         try:
-            quantity = int(float(qty))
-        except (TypeError, ValueError):
-            msg = (
-                f"Sale {sale_idx + 1}, "
-                f"item {pidx + 1} ({title}): invalid quantity '{qty}'"
-            )
-            errors.append(msg)
-            continue
-
-        if quantity < 0:
-            errors.append(
-                f"Sale {sale_idx + 1}, "
-                f"item {pidx + 1} ({title}): negative quantity"
+            summary = ErrorSummary(
+                DEFAULT_ERROR_SAMPLE if max_errors is None else max_errors,
+                errors_jsonl,
             )
-            continue
-
-        title_str = str(title).strip()
-        if title_str not in price_map:
-            msg = (
-                f"Sale {sale_idx + 1}, item {pidx + 1}: "
-                f"product '{title}' not in catalogue"
-            )
-            errors.append(msg)
-            continue
-
-        total += price_map[title_str] * quantity
-
-    return total, errors
+        except OSError as e:
+            return None, None, f"Error writing {errors_jsonl}: {e}"
+        summary.extend(errors)
+    try:
+        details = SaleDetails(details_csv)
+    except OSError as e:
+        if summary is not None:
+            summary.close()
+        return None, None, f"Error writing {details_csv}: {e}"
+    return details, summary, None
 
 
-def run_compute_sales(catalogue_path, sales_path):
+def run_compute_sales(catalogue_path, sales_path, workers=None,
+                      cache_dir=None, analytics=False, top=DEFAULT_TOP,
+                      export_path=None, normalize_titles=False,
+                      aliases_path=None, max_errors=None, errors_jsonl=None,
+                      output=None, details_csv=None):
     """
-    Load catalogue and sales, compute totals. Returns (results_text, success).
+    Load catalogue, then stream the sales one at a time and compute totals.
+    Sales may be a JSON array or JSON Lines (detected automatically); they
+    are totalled by `workers` processes when workers > 1. Amounts are
+    summed as exact integers of 1/10000 dollar and only rounded to cents
+    in the report. The compiled
+    catalogue is cached in cache_dir if given (see load_price_map).
+    With analytics, per-product and sale size sections (top products
+    limited to `top`) are added to the report; export_path receives the
+    same data as CSV or JSON (see SalesAnalytics.export).
+    With normalize_titles (implied by aliases_path, a JSON object of
+    misspelled title -> catalogue title), sale titles that differ from the
+    catalogue in case or spacing are matched (see build_title_index).
+    With max_errors and/or errors_jsonl, errors are summarized by category
+    with up to max_errors messages each (DEFAULT_ERROR_SAMPLE if only
+    errors_jsonl is given) and errors_jsonl receives all of them.
+    Per-sale details are spooled to a temporary file (see SaleDetails) and
+    also written as CSV to details_csv if given.
+    Returns (results_text, success). With output (a text stream) the report
+    is written there as it is produced instead, and results_text is None.
     Elapsed time is appended by the caller.
     """
+    # One keyword argument per command-line option
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
     # pylint: disable=too-many-locals
-    all_errors = []
+    out = io.StringIO() if output is None else output
 
-    catalogue_data, cat_err = load_json_file(catalogue_path)
-    if cat_err:
-        all_errors.append(cat_err)
-        return "\n".join(all_errors) + "\n", False
+    def finish(success, fatal_errors=None):
+        """Write fatal_errors (the whole report) and build the result."""
+        if fatal_errors is not None:
+            out.write("\n".join(fatal_errors) + "\n")
+        return (out.getvalue() if output is None else None), success
 
-    price_map, cat_parse_errors = build_price_map(catalogue_data)
-    all_errors.extend(cat_parse_errors)
-
-    sales_data, sales_err = load_json_file(sales_path)
-    if sales_err:
-        all_errors.append(sales_err)
-        return "\n".join(all_errors) + "\n", False
+    price_map, titles, all_errors = _load_lookup(
+        catalogue_path, cache_dir, normalize_titles, aliases_path
+    )
+    if price_map is None:
+        return finish(False, all_errors)
 
-    if not isinstance(sales_data, list):
+    details, summary, open_error = _open_sinks(
+        all_errors, max_errors, errors_jsonl, details_csv
+    )
+    if open_error:
+        all_errors.append(open_error)
+        return finish(False, all_errors)
+    stats = None
+    if analytics or export_path:
+        stats = SalesAnalytics(price_map)
+    try:
+        _, sale_errors, grand_total = _process_sales_file(
+            sales_path, price_map, workers, details=details,
+            analytics=stats, titles=titles, errors=summary,
+        )
+        if summary is None:
+            all_errors.extend(sale_errors)
+        else:
+            all_errors = summary
+
+        if export_path:
+            try:
+                stats.export(export_path)
+            except OSError as e:
+                all_errors.append(SalesError(
+                    "export", f"Error writing {export_path}: {e}"
+                ))
+    except NotAJsonArrayError:
         all_errors.append("Sales record must be a JSON array.")
-        return "\n".join(all_errors) + "\n", False
-
-    grand_total = 0.0
-    sale_lines = []
-    sale_num = 0
-
-    for idx, sale_item in enumerate(sales_data):
-        if not isinstance(sale_item, dict):
-            all_errors.append(
-                f"Sale record {idx + 1}: "
-                "expected object, skipped"
-            )
-            continue
+        details.close()
+        return finish(False, all_errors)
+    except (OSError, json.JSONDecodeError) as e:
+        all_errors.append(json_error_message(sales_path, e))
+        details.close()
+        return finish(False, all_errors)
+    finally:
+        if summary is not None:
+            summary.close()
 
-        sale_name = (
-            sale_item.get("Sale") or
-            sale_item.get("sale") or
-            f"Sale {idx + 1}"
+    try:
+        write_sales_report(
+            out, details, grand_total, all_errors, minor_units=True,
+            sections=stats.report_lines(top) if analytics else (),
         )
-        sale_total, sale_errors = compute_sale_total(sale_item, price_map, idx)
-        all_errors.extend(sale_errors)
+    finally:
+        details.close()
+    return finish(len(details) > 0 or grand_total > 0)
 
-        grand_total += sale_total
-        sale_num += 1
-        sale_lines.append(f"  {sale_num}. {sale_name}: ${sale_total:.2f}")
 
-    lines_out = [
-        "Sales Summary",
-        "=" * 50,
-        "",
-        f"Total number of sales: {sale_num}",
-        f"Grand total: ${grand_total:.2f}",
-        "",
-        "Details:",
-        *sale_lines,
-        "",
-    ]
+def parse_args(argv, flags=()):
+    """
+    Split argv into (positional_args, options) where options come from
+    '--name value' or '--name=value'; names listed in flags take no value
+    and are stored as True. Raises ValueError on a missing value.
+    """
+    positional = []
+    options = {}
+    args = iter(argv)
+    for arg in args:
+        if not arg.startswith("--"):
+            positional.append(arg)
+            continue
+        name, sep, value = arg[2:].partition("=")
+        if name in flags:
+            options[name] = True
+            continue
+        if not sep:
+            value = next(args, None)
+            if value is None:
+                raise ValueError(f"Option --{name} requires a value")
+        options[name] = value
+    return positional, options
+
 
-    if all_errors:
-        lines_out.extend(
-            ["Warnings/Errors (execution continued):", "-" * 40] +
-            all_errors + [""]
+def parse_command_line(argv):
+    """
+    parse_args for main, with the numeric options that were given
+    (--workers, --top, --max-errors) checked and converted, and
+    options["interval"] always set. Raises ValueError on an invalid value.
+    """
+    args, options = parse_args(
+        argv, flags=("analytics", "normalize-titles", "follow")
+    )
+    if "workers" in options:
+        options["workers"] = int(options["workers"])
+        if options["workers"] < 1:
+            raise ValueError("--workers must be a positive integer")
+    if "top" in options:
+        options["top"] = int(options["top"])
+        if options["top"] < 1:
+            raise ValueError("--top must be a positive integer")
+    if "max-errors" in options:
+        options["max-errors"] = int(options["max-errors"])
+        if options["max-errors"] < 0:
+            raise ValueError("--max-errors must be a non-negative integer")
+    interval = float(options.get("interval", FOLLOW_INTERVAL))
+    if interval <= 0 or math.isnan(interval):
+        raise ValueError("--interval must be a positive number")
+    options["interval"] = interval
+    return args, options
+
+
+def _follow_main(catalogue_path, sales_path, options):
+    """main for --follow: follow the sales file until interrupted."""
+    unsupported = [f"--{name}" for name in FOLLOW_UNSUPPORTED
+                   if name in options]
+    if unsupported:
+        print(
+            f"Error: --follow cannot be combined with "
+            f"{', '.join(unsupported)}\n{USAGE}", file=sys.stderr
         )
-
-    return "\n".join(lines_out), sale_num > 0 or grand_total > 0
+        sys.exit(1)
+    try:
+        results_text, success = follow_sales(
+            catalogue_path, sales_path, interval=options["interval"],
+            checkpoint_path=options.get("checkpoint"),
+            cache_dir=options.get("cache-dir"), status=print,
+        )
+    except KeyboardInterrupt:
+        success = True
+    if not success:
+        print(results_text, end="", file=sys.stderr)
+    sys.exit(0 if success else 1)
 
 
 def main():
     """Entry point: parse args, run compute sales, write output and time."""
-    if len(sys.argv) < 3:
-        print(
-            "Usage: python computeSales.py "
-            "priceCatalogue.json salesRecord.json",
-            file=sys.stderr,
-        )
+    try:
+        args, options = parse_command_line(sys.argv[1:])
+    except ValueError as err:
+        print(f"Error: {err}\n{USAGE}", file=sys.stderr)
+        sys.exit(1)
+    if len(args) < 2:
+        print(USAGE, file=sys.stderr)
         sys.exit(1)
 
-    catalogue_path = sys.argv[1]
-    sales_path = sys.argv[2]
+    catalogue_path = args[0]
+    sales_path = args[1]
 
     if not os.path.isfile(catalogue_path):
         print(
@@ -252,18 +303,31 @@ def main():
         )
         sys.exit(1)
 
-    start = time.perf_counter()
-    results_text, success = run_compute_sales(catalogue_path, sales_path)
-    elapsed = time.perf_counter() - start
-
-    time_line = f"Time elapsed: {elapsed:.6f} seconds"
-    full_output = results_text + time_line + "\n"
+    if options.get("follow"):
+        _follow_main(catalogue_path, sales_path, options)
 
     output_path = "SalesResults.txt"
+    start = time.perf_counter()
     with open(output_path, "w", encoding="utf-8") as out_file:
-        out_file.write(full_output)
+        _, success = run_compute_sales(
+            catalogue_path, sales_path, workers=options.get("workers"),
+            cache_dir=options.get("cache-dir"),
+            analytics=options.get("analytics", False),
+            top=options.get("top", DEFAULT_TOP),
+            export_path=options.get("export-analytics"),
+            normalize_titles=options.get("normalize-titles", False),
+            aliases_path=options.get("aliases"),
+            max_errors=options.get("max-errors"),
+            errors_jsonl=options.get("errors-jsonl"),
+            output=out_file,
+            details_csv=options.get("details-csv"),
+        )
+        elapsed = time.perf_counter() - start
+        out_file.write(f"Time elapsed: {elapsed:.6f} seconds\n")
 
-    print(full_output)
+    with open(output_path, "r", encoding="utf-8") as out_file:
+        shutil.copyfileobj(out_file, sys.stdout)
+    print()
     sys.exit(0 if success else 1)
 
 
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name
+"""
+Deterministic synthetic data for computeSales: a price catalogue and a
+sales record (JSON array or JSON Lines) of any size, with optional invalid
+line items and alternative field names. The same seed always produces the
+same files; sales are written as they are generated.
+"""
+
+import json
+import os
+import random
+import sys
+
+from computeSales import parse_args
+from sale_totals import PRODUCTS_KEYS, QUANTITY_KEYS, TITLE_KEYS
+
+ERROR_KINDS = (
+    "unknown_product",
+    "invalid_quantity",
+    "negative_quantity",
+    "missing_title",
+    "not_object",
+)
+USAGE = (
+    "Usage: python generateSalesData.py output_dir [--products N] "
+    "[--sales N] [--items N]\n"
+    "       [--error-rate F] [--variants] [--format json|jsonl] [--seed N]"
+)
+
+
+def generate_catalogue(products, rng, variants=False):
+    """
+    Catalogue entries "Product 1".."Product N" with prices between 0.50 and
+    500.00. With variants, the title key is picked from TITLE_KEYS.
+    """
+    catalogue = []
+    for num in range(1, products + 1):
+        title_key = rng.choice(TITLE_KEYS) if variants else "title"
+        catalogue.append({
+            title_key: f"Product {num}",
+            "price": round(rng.uniform(0.5, 500), 2),
+        })
+    return catalogue
+
+
+def _line_item(rng, products, title_key, qty_key, error_rate):
+    """One line item, invalid (a random ERROR_KINDS kind) with error_rate."""
+    title = f"Product {rng.randint(1, products)}"
+    quantity = rng.randint(1, 10)
+    if error_rate and rng.random() < error_rate:
+        kind = rng.choice(ERROR_KINDS)
+        if kind == "not_object":
+            return title
+        if kind == "unknown_product":
+            title = f"Unknown {rng.randint(1, products)}"
+        elif kind == "invalid_quantity":
+            quantity = "many"
+        elif kind == "negative_quantity":
+            quantity = -quantity
+        else:
+            return {qty_key: quantity}
+    return {title_key: title, qty_key: quantity}
+
+
+def generate_sales(sales, products, rng, items=3, error_rate=0.0,
+                   variants=False):
+    """
+    Yield `sales` sale records with 1 to 2 * items - 1 line items each
+    (items on average). A fraction error_rate of the line items is invalid.
+    With variants, each sale picks its keys from PRODUCTS_KEYS, TITLE_KEYS
+    and QUANTITY_KEYS.
+    """
+    # The generation options of generate_files
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    products_key, title_key, qty_key = "Products", "title", "quantity"
+    for num in range(1, sales + 1):
+        if variants:
+            products_key = rng.choice(PRODUCTS_KEYS)
+            title_key = rng.choice(TITLE_KEYS)
+            qty_key = rng.choice(QUANTITY_KEYS)
+        yield {
+            "Sale": f"Sale {num}",
+            products_key: [
+                _line_item(rng, products, title_key, qty_key, error_rate)
+                for _ in range(rng.randint(1, 2 * items - 1))
+            ],
+        }
+
+
+def write_json_array(path, records):
+    """Write records as a JSON array, one element per line, streaming."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        separator = "\n"
+        for record in records:
+            f.write(separator + json.dumps(record))
+            separator = ",\n"
+        f.write("\n]\n")
+
+
+def write_json_lines(path, records):
+    """Write records as JSON Lines, streaming."""
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def generate_files(output_dir, products=100, sales=1000, items=3,
+                   error_rate=0.0, variants=False, sales_format="json",
+                   seed=0):
+    """
+    Write priceCatalogue.json and salesRecord.json (or .jsonl) into
+    output_dir. Returns (catalogue_path, sales_path).
+    """
+    # One keyword argument per command-line option
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    catalogue_path = os.path.join(output_dir, "priceCatalogue.json")
+    with open(catalogue_path, "w", encoding="utf-8") as f:
+        json.dump(generate_catalogue(products, rng, variants), f, indent=1)
+
+    records = generate_sales(sales, products, rng, items, error_rate, variants)
+    if sales_format == "jsonl":
+        sales_path = os.path.join(output_dir, "salesRecord.jsonl")
+        write_json_lines(sales_path, records)
+    else:
+        sales_path = os.path.join(output_dir, "salesRecord.json")
+        write_json_array(sales_path, records)
+    return catalogue_path, sales_path
+
+
+def main():
+    """Entry point: parse options and write the generated files."""
+    try:
+        args, options = parse_args(sys.argv[1:], flags=("variants",))
+        settings = {
+            "products": int(options.get("products", 100)),
+            "sales": int(options.get("sales", 1000)),
+            "items": int(options.get("items", 3)),
+            "error_rate": float(options.get("error-rate", 0.0)),
+            "variants": options.get("variants", False),
+            "sales_format": options.get("format", "json"),
+            "seed": int(options.get("seed", 0)),
+        }
+        if min(settings["products"], settings["sales"], settings["items"]) < 1:
+            raise ValueError("--products, --sales and --items must be >= 1")
+        if not 0 <= settings["error_rate"] <= 1:
+            raise ValueError("--error-rate must be between 0 and 1")
+        if settings["sales_format"] not in ("json", "jsonl"):
+            raise ValueError("--format must be json or jsonl")
+    except ValueError as err:
+        print(f"Error: {err}\n{USAGE}", file=sys.stderr)
+        sys.exit(1)
+    if len(args) != 1:
+        print(USAGE, file=sys.stderr)
+        sys.exit(1)
+
+    for path in generate_files(args[0], **settings):
+        print(f"Wrote {path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+JSON backend for computeSales: orjson when installed, stdlib json otherwise
+(JSON_BACKEND=orjson|json forces one). Results and errors are always the
+stdlib's: a document orjson rejects, or may read differently (integers
+beyond 64 bits), is parsed again by json, which either accepts it (NaN,
+1e400, lone surrogates) or raises the usual json.JSONDecodeError message.
+ujson is not used: it accepts documents json rejects (01, [1.], "-").
+"""
+
+import importlib
+import json
+import os
+
+BACKENDS = ("orjson", "json")
+# orjson turns integers of more than 64 bits into floats or errors:
+# documents with 19 digits in a row go to json (translate + find is several
+# times faster than a regex search)
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_LONG_DIGITS = b"0" * 19
+# orjson writes 1e16 where json writes 1e+16, and NaN/Infinity as null
+# (checked on the text with digits translated to 0)
+_ORJSON_MISMATCHES = (b"0e", b"0E", b"null")
+# orjson writes 1e-05 as 0.00001: floats below 1e-4 have four zeros after
+# the point (checked on the original text)
+_ORJSON_SMALL_FLOAT = b"0.0000"
+
+_STATE = {
+    "name": "json", "module": json, "loads": None, "dumps": None,
+    "dumps_option": 0,
+}
+
+
+def set_backend(name=None):
+    """
+    Use the named backend (None: the first installed one of BACKENDS).
+    A backend that is not installed falls back to the next one. Returns
+    the name of the backend in use.
+    """
+    names = BACKENDS[BACKENDS.index(name):] if name in BACKENDS else BACKENDS
+    for candidate in names:
+        try:
+            module = importlib.import_module(candidate)
+        except ImportError:
+            continue
+        _STATE["name"] = candidate
+        _STATE["module"] = module
+        _STATE["loads"] = None if module is json else module.loads
+        _STATE["dumps"] = None
+        if module is not json:
+            _STATE["dumps"] = module.dumps
+            _STATE["dumps_option"] = (
+                module.OPT_INDENT_2 | module.OPT_PASSTHROUGH_DATACLASS
+                | module.OPT_PASSTHROUGH_DATETIME
+            )
+        break
+    return _STATE["name"]
+
+
+def backend_name():
+    """Name of the backend in use."""
+    return _STATE["name"]
+
+
+def loads(data):
+    """json.loads for a str or bytes document, using the fast backend."""
+    fast_loads = _STATE["loads"]
+    if fast_loads is not None:
+        raw = (data.encode("utf-8", "surrogatepass")
+               if isinstance(data, str) else data)
+        if _LONG_DIGITS not in raw.translate(_DIGITS_TO_ZERO):
+            try:
+                return fast_loads(data)
+            except (ValueError, OverflowError):
+                pass
+    return json.loads(data)
+
+
+def dumps(obj, indent=None, ensure_ascii=True):
+    """
+    json.dumps(obj, indent=indent, ensure_ascii=ensure_ascii). orjson
+    writes it when that gives the same text: indent=2 without ASCII
+    escaping, and no nulls or floats json writes with an exponent (below
+    1e-4 or from 1e16) in the output, so a None value also takes the
+    stdlib path. Types json cannot serialize (datetime, dataclasses) are
+    left to json to reject.
+    """
+    fast_dumps = _STATE["dumps"] if indent == 2 and not ensure_ascii else None
+    if fast_dumps is not None:
+        try:
+            text = fast_dumps(obj, option=_STATE["dumps_option"])
+        except (TypeError, ValueError, OverflowError):
+            text = None
+        if text is not None and _ORJSON_SMALL_FLOAT not in text:
+            digits = text.translate(_DIGITS_TO_ZERO)
+            if not any(part in digits for part in _ORJSON_MISMATCHES):
+                return text.decode("utf-8")
+    return json.dumps(obj, indent=indent, ensure_ascii=ensure_ascii)
+
+
+set_backend(os.environ.get("JSON_BACKEND") or None)
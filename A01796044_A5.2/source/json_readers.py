@@ -0,0 +1,434 @@
+"""
+Readers for the JSON files of computeSales: whole documents through
+json_backend, top-level arrays streamed one element at a time or split
+into byte ranges of whole elements, and JSON Lines files read whole, by
+byte-range shards or as they are appended to.
+"""
+
+import codecs
+import json
+import os
+import re
+from typing import NamedTuple
+
+import json_backend
+
+CHUNK_SIZE = 1 << 20
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+# A decode error this close to the end of the buffer may just be a token
+# cut by the chunk boundary ("tru", "1e", "\\u00"); further back it is final
+_TOKEN_TAIL = 16
+
+
+class NotAJsonArrayError(ValueError):
+    """The file holds valid JSON whose top-level value is not an array."""
+
+
+def json_error_message(filepath, err):
+    """Report line for an error raised while reading a JSON file."""
+    if isinstance(err, FileNotFoundError):
+        return f"Error: File not found: {filepath}"
+    if isinstance(err, json.JSONDecodeError):
+        return f"Error: Invalid JSON in {filepath}: {err}"
+    return f"Error reading {filepath}: {err}"
+
+
+def load_json_file(filepath):
+    """
+    Load JSON from file. Returns (data, error_message).
+    On success: (data, None). On failure: (None, error_msg).
+    """
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json_backend.loads(f.read())
+        return data, None
+    except (OSError, json.JSONDecodeError) as e:
+        return None, json_error_message(filepath, e)
+
+
+class _ArrayReader:  # pylint: disable=too-many-instance-attributes
+    """
+    Buffered reader for iter_json_array: keeps only the unparsed tail of
+    the file in memory and maps buffer positions back to file positions.
+    """
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.base = 0
+        self.base_lines = 0
+        self.last_newline = -1
+
+    def fill(self):
+        """Read another chunk; return False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > self.chunk_size:
+            dropped = self.buffer[:self.pos]
+            newlines = dropped.count("\n")
+            if newlines:
+                self.base_lines += newlines
+                self.last_newline = self.base + dropped.rindex("\n")
+            self.base += self.pos
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += chunk
+        return True
+
+    def skip_whitespace(self):
+        """Advance past whitespace; return the next character ('' at EOF)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def error(self, msg, pos=None):
+        """JSONDecodeError with line/column/char relative to the whole file."""
+        pos = self.pos if pos is None else pos
+        newline = self.buffer.rfind("\n", 0, pos)
+        if newline >= 0:
+            last_newline = self.base + newline
+        else:
+            last_newline = self.last_newline
+        abs_pos = self.base + pos
+        err = json.JSONDecodeError(msg, "", 0)
+        err.pos = abs_pos
+        err.lineno = self.base_lines + self.buffer.count("\n", 0, pos) + 1
+        err.colno = abs_pos - last_newline
+        err.args = (
+            f"{msg}: line {err.lineno} column {err.colno} (char {abs_pos})",
+        )
+        return err
+
+    def decode_value(self, decoder):
+        """Decode the next value, reading more input until it is complete."""
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as err:
+                truncated = (
+                    err.msg.startswith("Unterminated string") or
+                    len(self.buffer) - err.pos <= _TOKEN_TAIL
+                )
+                if truncated and self.fill():
+                    continue
+                raise self.error(err.msg, err.pos) from None
+            # A number running up to the end of the buffer may continue
+            # in the next chunk
+            tail_end = _NUMBER_TAIL.match(self.buffer, end).end()
+            if (
+                    isinstance(value, (int, float)) and
+                    tail_end == len(self.buffer) and
+                    self.fill()):
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(filepath, chunk_size=CHUNK_SIZE):
+    """
+    Yield the elements of a top-level JSON array one at a time, reading the
+    file in chunks so that memory is bounded by the largest element.
+    Raises json.JSONDecodeError (same messages as json.load) on invalid JSON
+    and NotAJsonArrayError if the top-level value is not an array.
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, "r", encoding="utf-8") as f:
+        reader = _ArrayReader(f, chunk_size)
+        if reader.skip_whitespace() != "[":
+            # Not an array: let json.load report exactly what is wrong
+            f.seek(0)
+            json.load(f)
+            raise NotAJsonArrayError(filepath)
+        reader.pos += 1
+        if reader.skip_whitespace() == "]":
+            reader.pos += 1
+        else:
+            while True:
+                reader.skip_whitespace()
+                yield reader.decode_value(decoder)
+                delimiter = reader.skip_whitespace()
+                if delimiter == "]":
+                    reader.pos += 1
+                    break
+                if delimiter != ",":
+                    raise reader.error("Expecting ',' delimiter")
+                reader.pos += 1
+        if reader.skip_whitespace():
+            raise reader.error("Extra data")
+
+
+class InvalidJsonLine(NamedTuple):
+    """Placeholder yielded by iter_json_lines for a line of invalid JSON."""
+
+    message: str
+
+
+def iter_json_lines(filepath, start=0, end=None):
+    """
+    Yield one decoded value per non-blank line of a JSON Lines file, for the
+    lines starting in the byte range [start, end). Invalid lines yield an
+    InvalidJsonLine instead of stopping the iteration.
+    """
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        pos = start
+        for raw in f:
+            if end is not None and pos >= end:
+                break
+            pos += len(raw)
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                yield json_backend.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                yield InvalidJsonLine(f"invalid JSON line ({e})")
+
+
+def detect_sales_format(filepath):
+    """
+    Return "jsonl" for JSON Lines sales files (by extension, or a first line
+    holding a complete JSON object) and "array" otherwise.
+    """
+    if filepath.lower().endswith(JSON_LINES_EXTENSIONS):
+        return "jsonl"
+    with open(filepath, "rb") as f:
+        first_line = f.readline().strip()
+        while not first_line:
+            line = f.readline()
+            if not line:
+                return "array"
+            first_line = line.strip()
+    if not first_line.startswith(b"{"):
+        return "array"
+    try:
+        first = json_backend.loads(first_line)
+        return "jsonl" if isinstance(first, dict) else "array"
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return "array"
+
+
+def iter_sales(filepath, sales_format):
+    """Yield the sale records of a file in the given format."""
+    if sales_format == "jsonl":
+        return iter_json_lines(filepath)
+    return iter_json_array(filepath)
+
+
+def line_shards(filepath, shards):
+    """
+    Split a file into up to `shards` byte ranges (start, end), each starting
+    at the beginning of a line.
+    """
+    size = os.path.getsize(filepath)
+    cuts = [0]
+    with open(filepath, "rb") as f:
+        for i in range(1, shards):
+            pos = max(size * i // shards, cuts[-1])
+            if pos >= size:
+                break
+            f.seek(pos)
+            f.readline()
+            cuts.append(f.tell())
+    cuts.append(size)
+    return [(start, end) for start, end in zip(cuts, cuts[1:]) if end > start]
+
+
+def count_line_records(shard):
+    """Number of records (non-blank lines) in a (path, start, end) shard."""
+    filepath, start, end = shard
+    count = 0
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        pos = start
+        for raw in f:
+            if pos >= end:
+                break
+            pos += len(raw)
+            if raw.strip():
+                count += 1
+    return count
+
+
+def iter_appended_json_lines(filepath, state):
+    """
+    Like iter_json_lines from byte offset state["offset"], but only for
+    complete (newline-terminated) lines: a line still being written is left
+    for the next call. state["offset"] and state["records"] (non-blank
+    lines read) are advanced as lines are consumed.
+    """
+    with open(filepath, "rb") as f:
+        f.seek(state["offset"])
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            state["offset"] += len(raw)
+            line = raw.strip()
+            if not line:
+                continue
+            state["records"] += 1
+            try:
+                yield json_backend.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                yield InvalidJsonLine(f"invalid JSON line ({e})")
+
+
+def _find_comma(reader):
+    """
+    File position of the next ',' from reader.pos (which moves past it), or
+    None at end of file.
+    """
+    while True:
+        idx = reader.buffer.find(",", reader.pos)
+        if idx >= 0:
+            reader.pos = idx + 1
+            return reader.base + idx
+        reader.pos = len(reader.buffer)
+        if not reader.fill():
+            return None
+
+
+def _scan_array_tail(reader, decoder, end):
+    """
+    Parse array elements from reader.pos until the comma after one lies at
+    or past `end`, or the array ends (only whitespace may follow). Returns
+    (count, next_comma, stop): next_comma is None at the end of the array
+    and stop is where the last element's text ends (that comma or the
+    closing bracket). Returns None, with reader.pos at the offending
+    character, if the text from reader.pos is not such a sequence.
+    """
+    count = 0
+    while True:
+        reader.skip_whitespace()
+        try:
+            reader.decode_value(decoder)
+        except json.JSONDecodeError as err:
+            reader.pos = err.pos - reader.base
+            return None
+        count += 1
+        delimiter = reader.skip_whitespace()
+        stop = reader.base + reader.pos
+        if delimiter == ",":
+            reader.pos += 1
+            if stop >= end:
+                return count, stop, stop
+        elif delimiter == "]":
+            reader.pos += 1
+            if reader.skip_whitespace():
+                return None
+            return count, None, stop
+        else:
+            return None
+
+
+def _is_utf8(filepath, start, stop):
+    """Whether bytes start..stop of a file are valid UTF-8."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        try:
+            for pos in range(start, stop, CHUNK_SIZE):
+                decoder.decode(f.read(min(CHUNK_SIZE, stop - pos)))
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
+def scan_array_shard(task):
+    """
+    Worker: find the elements of a JSON array whose preceding comma lies in
+    the byte range [start, end) of the file; the first shard (start at the
+    first element) owns that element instead. The file is read as Latin-1,
+    so string positions are byte offsets. A comma found after `start` may
+    belong to a nested value or a string: parsing elements from it then
+    hits a delimiter or bracket that does not fit and the search goes on
+    from there. Any remaining mistake shows up as shards that do not chain
+    (see chain_array_shards). Returns (comma, count, next_comma, stop),
+    with comma None if there is no comma before end of file, or None if
+    the text is not valid.
+    """
+    filepath, start, end, first = task
+    decoder = json.JSONDecoder()
+    with open(filepath, "r", encoding="latin-1", newline="") as f:
+        f.seek(start)
+        reader = _ArrayReader(f, CHUNK_SIZE)
+        reader.base = start
+        while True:
+            comma = None if first else _find_comma(reader)
+            if not first and (comma is None or comma >= end):
+                return comma, 0, comma, None
+            scan = _scan_array_tail(reader, decoder, end)
+            if scan is not None:
+                break
+            if first:
+                return None
+    count, next_comma, stop = scan
+    if not _is_utf8(filepath, start if first else comma, stop):
+        return None
+    return comma, count, next_comma, stop
+
+
+def array_first_element(filepath):
+    """Byte offset of the first element of a JSON array file, or None."""
+    with open(filepath, "r", encoding="latin-1", newline="") as f:
+        reader = _ArrayReader(f, CHUNK_SIZE)
+        if reader.skip_whitespace() != "[":
+            return None
+        reader.pos += 1
+        if reader.skip_whitespace() in ("]", ""):
+            return None
+        return reader.base + reader.pos
+
+
+def chain_array_shards(sales_path, body, scans):
+    """
+    (path, start, stop, first_index) ranges of whole elements from the
+    scan_array_shard results of consecutive shards of an array whose first
+    element is at byte `body` (see array_first_element), or None if a
+    shard is invalid or does not start at the comma where the previous one
+    stopped, or the last one does not end the array.
+    """
+    tasks = []
+    first_index = 0
+    expected = None
+    for scan in scans:
+        if scan is None:
+            return None
+        comma, count, next_comma, stop = scan
+        if tasks and comma != expected:
+            return None
+        if count:
+            start = comma + 1 if tasks else body
+            tasks.append((sales_path, start, stop, first_index))
+            first_index += count
+        expected = next_comma
+    return tasks if expected is None else None
+
+
+def iter_array_range(filepath, start, stop):
+    """
+    Elements of a JSON array between byte offsets start and stop, a range
+    of whole comma-separated elements (see chain_array_shards).
+    """
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        text = f.read(stop - start).decode("utf-8")
+    decoder = json.JSONDecoder()
+    pos = 0
+    while pos < len(text):
+        value, pos = decoder.raw_decode(
+            text, _WHITESPACE.match(text, pos).end()
+        )
+        yield value
+        pos = _WHITESPACE.match(text, pos).end() + 1
@@ -0,0 +1,49 @@
+"""
+Money amounts of computeSales: prices and totals are exact integers of
+1/10000 dollar (minor units), rounded to cents only when written out.
+"""
+
+from decimal import Decimal
+
+PRICE_DECIMALS = 4
+MINOR_UNITS_PER_UNIT = 10 ** PRICE_DECIMALS
+MINOR_UNITS_PER_CENT = MINOR_UNITS_PER_UNIT // 100
+
+
+def to_minor_units(price):
+    """
+    Price as an exact integer number of minor units (see
+    MINOR_UNITS_PER_UNIT), from the float's shortest decimal form, so 1.005
+    is 10050. Raises ValueError if the price has more than PRICE_DECIMALS
+    decimals instead of rounding it.
+    """
+    amount = Decimal(repr(price)).scaleb(PRICE_DECIMALS)
+    if amount != amount.to_integral_value():
+        raise ValueError(f"more than {PRICE_DECIMALS} decimals")
+    return int(amount)
+
+
+def to_cents(amount):
+    """Amount in minor units rounded half up to whole cents."""
+    cents, rest = divmod(abs(amount), MINOR_UNITS_PER_CENT)
+    if 2 * rest >= MINOR_UNITS_PER_CENT:
+        cents += 1
+    return -cents if amount < 0 else cents
+
+
+def exact_cents(amount):
+    """
+    Amount in minor units as cents for machine-readable output: an int for
+    a whole number of cents, else a float with at most two decimals (the
+    shortest float repr, so it is exact below 2 ** 53 minor units).
+    """
+    cents, rest = divmod(amount, MINOR_UNITS_PER_CENT)
+    return amount / MINOR_UNITS_PER_CENT if rest else cents
+
+
+def format_money(amount):
+    """Format an amount in minor units as dollars rounded to cents."""
+    cents = to_cents(amount)
+    sign = "-" if cents < 0 else ""
+    units, rest = divmod(abs(cents), 100)
+    return f"{sign}{units}.{rest:02d}"
@@ -0,0 +1,320 @@
+"""
+Sale totals of computeSales: each sale record is priced against the
+catalogue's price map, with a fast path for the field layout detected on
+the first records (see make_sale_totaller) and categorized errors for
+everything it cannot count.
+"""
+
+from collections import Counter
+from datetime import date
+from itertools import chain, islice
+
+from catalogue import PriceHistory, sale_date_ordinal
+from json_readers import InvalidJsonLine
+from sales_report import SalesError
+
+PRODUCTS_KEYS = ("Products", "products", "items")
+TITLE_KEYS = ("title", "name", "product")
+QUANTITY_KEYS = ("quantity", "qty", "amount")
+SCHEMA_SAMPLE = 100
+MAX_EXACT_QUANTITY = 2 ** 53
+
+
+def compute_sale_total(sale_item, price_map, sale_idx, items=None,
+                       titles=None):
+    """
+    Compute total for one sale. Returns (total, errors).
+    Products with a PriceHistory are priced on the sale's date. Titles not
+    in price_map are looked up in titles (a TitleIndex) if given.
+    If items is a list, a (title, quantity, amount) tuple is appended to it
+    for every line item counted in the total.
+    """
+    # pylint: disable=too-many-locals,too-many-branches
+    errors = []
+    total = 0
+    sale_day = None
+
+    products = (
+        sale_item.get("Products") or
+        sale_item.get("products") or
+        sale_item.get("items") or
+        sale_item.get("items")
+    )
+    if products is None:
+        errors.append(SalesError(
+            "missing_products",
+            f"Sale {sale_idx + 1}: "
+            "missing Products/products/items array"
+        ))
+        return total, errors
+
+    if not isinstance(products, list):
+        errors.append(SalesError(
+            "invalid_products",
+            f"Sale {sale_idx + 1}: Products must be an array"
+        ))
+        return total, errors
+
+    for pidx, prod in enumerate(products):
+        if not isinstance(prod, dict):
+            errors.append(SalesError(
+                "invalid_item",
+                f"Sale {sale_idx + 1}, "
+                f"item {pidx + 1}: expected object"
+            ))
+            continue
+
+        title = prod.get("title") or prod.get("name") or prod.get("product")
+        qty = prod.get("quantity") or prod.get("qty") or prod.get("amount", 1)
+
+        if title is None or title == "":
+            errors.append(SalesError(
+                "missing_title",
+                f"Sale {sale_idx + 1}, "
+                f"item {pidx + 1}: missing product title"
+            ))
+            continue
+
+        try:
+            quantity = int(float(qty))
+        except (TypeError, ValueError):
+            msg = (
+                f"Sale {sale_idx + 1}, "
+                f"item {pidx + 1} ({title}): invalid quantity '{qty}'"
+            )
+            errors.append(SalesError("invalid_quantity", msg))
+            continue
+
+        if quantity < 0:
+            errors.append(SalesError(
+                "negative_quantity",
+                f"Sale {sale_idx + 1}, "
+                f"item {pidx + 1} ({title}): negative quantity"
+            ))
+            continue
+
+        title_str = str(title).strip()
+        if title_str not in price_map and titles is not None:
+            title_str = titles.resolve(title_str) or title_str
+        if title_str not in price_map:
+            msg = (
+                f"Sale {sale_idx + 1}, item {pidx + 1}: "
+                f"product '{title}' not in catalogue"
+            )
+            errors.append(SalesError("unknown_product", msg))
+            continue
+
+        price = price_map[title_str]
+        if isinstance(price, PriceHistory):
+            if sale_day is None:
+                sale_day = sale_date_ordinal(sale_item)
+            if not sale_day:
+                errors.append(SalesError(
+                    "missing_sale_date",
+                    f"Sale {sale_idx + 1}, item {pidx + 1} ({title}): "
+                    "dated price needs a valid sale date"
+                ))
+                continue
+            price = price.at(sale_day)
+            if price is None:
+                errors.append(SalesError(
+                    "no_price_on_date",
+                    f"Sale {sale_idx + 1}, item {pidx + 1} ({title}): "
+                    f"no price on {date.fromordinal(sale_day)}"
+                ))
+                continue
+
+        amount = price * quantity
+        total += amount
+        if items is not None:
+            items.append((title_str, quantity, amount))
+
+    return total, errors
+
+
+def _first_truthy_key(record, keys):
+    """First key of `keys` whose value in record is truthy, or None."""
+    for key in keys:
+        if record.get(key):
+            return key
+    return None
+
+
+def detect_sale_schema(sales_sample):
+    """
+    Most common (products_key, title_key, quantity_key) layout among a
+    sample of sale records, or None if the sample has no usable line item.
+    """
+    layouts = Counter()
+    for sale_item in sales_sample:
+        if not isinstance(sale_item, dict):
+            continue
+        products_key = _first_truthy_key(sale_item, PRODUCTS_KEYS)
+        products = sale_item.get(products_key) if products_key else None
+        if not isinstance(products, list):
+            continue
+        for prod in products:
+            if isinstance(prod, dict):
+                layouts[(
+                    products_key,
+                    _first_truthy_key(prod, TITLE_KEYS),
+                    _first_truthy_key(prod, QUANTITY_KEYS),
+                )] += 1
+    for layout, _ in layouts.most_common():
+        if None not in layout:
+            return layout
+    return None
+
+
+class _OffSchema(Exception):
+    """A sale that the fast path of make_sale_totaller hands back."""
+
+
+def make_sale_totaller(schema, price_map, titles=None):
+    """
+    Return sale_total(sale_item, sale_idx, items=None) -> (total, errors)
+    specialized for a detected schema: fixed key lookups and a per-run cache
+    of resolved titles (tolerant through titles, a TitleIndex, if given).
+    A sale that does not match the schema exactly (other keys, non-integer
+    quantities, unknown products, ...) is handed to compute_sale_total, so
+    results, errors and items are always the same.
+    """
+    if schema is None:
+        return lambda sale_item, sale_idx, items=None: compute_sale_total(
+            sale_item, price_map, sale_idx, items, titles
+        )
+
+    products_key, title_key, qty_key = schema
+    # Keys that compute_sale_total tries before the schema's ones must be
+    # empty for the fast path to give the same result
+    products_before = PRODUCTS_KEYS[:PRODUCTS_KEYS.index(products_key)]
+    item_before = (
+        TITLE_KEYS[:TITLE_KEYS.index(title_key)] +
+        QUANTITY_KEYS[:QUANTITY_KEYS.index(qty_key)]
+    )
+    resolved = {}
+    canonical = {}
+
+    def price_of(title):
+        """Price of a raw title, resolved once per run; None if unknown."""
+        if title in resolved:
+            return resolved[title]
+        key = title.strip()
+        price = price_map.get(key)
+        if price is None and titles is not None:
+            key = titles.resolve(key)
+            price = price_map.get(key) if key else None
+        resolved[title] = price
+        canonical[title] = key
+        return price
+
+    def fast_total(sale_item, items):
+        # Exact type() checks keep bool and other subclasses off the fast
+        # path; anything else raises _OffSchema
+        # pylint: disable=unidiomatic-typecheck
+        products = sale_item.get(products_key)
+        if (type(products) is not list or not products or  # noqa: E721
+                products_before and
+                any(sale_item.get(key) for key in products_before)):
+            raise _OffSchema
+        total = 0
+        sale_day = None
+        # Items are only handed out once the whole sale took the fast path
+        found = None if items is None else []
+        for prod in products:
+            if type(prod) is not dict:  # noqa: E721
+                raise _OffSchema
+            title = prod.get(title_key)
+            if type(title) is not str:  # noqa: E721
+                raise _OffSchema
+            price = resolved.get(title)
+            if price is None:
+                price = price_of(title)
+                if price is None:
+                    raise _OffSchema
+            if type(price) is PriceHistory:  # noqa: E721
+                if sale_day is None:
+                    sale_day = sale_date_ordinal(sale_item)
+                price = price.at(sale_day) if sale_day else None
+                if price is None:
+                    raise _OffSchema
+            qty = prod.get(qty_key)
+            if (type(qty) is not int or  # noqa: E721
+                    not 0 < qty < MAX_EXACT_QUANTITY or
+                    item_before and any(prod.get(key) for key in item_before)):
+                raise _OffSchema
+            amount = price * qty
+            total += amount
+            if found is not None:
+                found.append((canonical[title], qty, amount))
+        if found:
+            items.extend(found)
+        return total, []
+
+    def sale_total(sale_item, sale_idx, items=None):
+        try:
+            return fast_total(sale_item, items)
+        except _OffSchema:
+            return compute_sale_total(
+                sale_item, price_map, sale_idx, items, titles
+            )
+
+    return sale_total
+
+
+def process_sales(sales, price_map, first_index=0, analytics=None,
+                  titles=None, errors=None, details=None):
+    """
+    Compute the totals of a sequence of sale records numbered from
+    first_index. The field layout is detected on the first SCHEMA_SAMPLE
+    records and used for a fast path (see make_sale_totaller). Totals have
+    the type of the price_map values (integer minor units stay exact). Each
+    sale is also added to analytics (a SalesAnalytics) if one is given;
+    titles is an optional TitleIndex for tolerant product lookups. Errors are
+    added to `errors` (a new list by default, or e.g. an ErrorSummary).
+    Returns (details, errors, grand_total), where details receives the
+    (sale_name, sale_total) of the records that are sales (a new list by
+    default, or e.g. a SaleDetails).
+    """
+    # The optional sinks are passed down from run_compute_sales
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    # pylint: disable=too-many-locals
+    details = [] if details is None else details
+    errors = [] if errors is None else errors
+    grand_total = 0
+    sales = iter(sales)
+    sample = list(islice(sales, SCHEMA_SAMPLE))
+    sale_total_of = make_sale_totaller(
+        detect_sale_schema(sample), price_map, titles
+    )
+    for idx, sale_item in enumerate(chain(sample, sales), start=first_index):
+        if isinstance(sale_item, InvalidJsonLine):
+            errors.append(SalesError(
+                "invalid_json_line",
+                f"Sale record {idx + 1}: {sale_item.message}, skipped"
+            ))
+            continue
+        if not isinstance(sale_item, dict):
+            errors.append(SalesError(
+                "invalid_record",
+                f"Sale record {idx + 1}: "
+                "expected object, skipped"
+            ))
+            continue
+
+        sale_name = (
+            sale_item.get("Sale") or
+            sale_item.get("sale") or
+            f"Sale {idx + 1}"
+        )
+        if analytics is None:
+            sale_total, sale_errors = sale_total_of(sale_item, idx)
+        else:
+            items = []
+            sale_total, sale_errors = sale_total_of(sale_item, idx, items)
+            analytics.add_sale(sale_total, items)
+        errors.extend(sale_errors)
+
+        grand_total += sale_total
+        details.append((sale_name, sale_total))
+    return details, errors, grand_total
@@ -0,0 +1,222 @@
+"""
+Follow mode of computeSales (--follow): a JSON Lines sales file that is
+being appended to is polled, its new lines are totalled and the report is
+rewritten, with an optional checkpoint to resume after a restart.
+"""
+
+import json
+import os
+import tempfile
+import time
+from functools import partial
+
+from catalogue import load_price_map
+from json_readers import detect_sales_format, iter_appended_json_lines
+from money import format_money
+from sale_totals import process_sales
+from sales_report import ErrorLines, SaleDetails, write_sales_report
+
+FOLLOW_INTERVAL = 5.0
+CHECKPOINT_VERSION = 3
+
+
+def write_atomic(path, write):
+    """
+    Replace the file at path with what write(stream) writes to a text
+    stream, never leaving it half written.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def _new_follow_state(sales_path, catalogue_path):
+    """Empty follow state for a sales file and the current catalogue."""
+    cat_stat = os.stat(catalogue_path)
+    return {
+        "version": CHECKPOINT_VERSION,
+        "sales_path": os.path.abspath(sales_path),
+        "catalogue": [cat_stat.st_size, cat_stat.st_mtime_ns],
+        "offset": 0,
+        "records": 0,
+        "grand_total": 0,
+        "sales": 0,
+        "errors": 0,
+        "spooled": [0, 0],
+    }
+
+
+def _load_checkpoint(checkpoint_path, fresh):
+    """
+    Follow state saved at checkpoint_path, or `fresh` if there is none or
+    it belongs to another sales file or catalogue version.
+    """
+    try:
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return fresh
+    if not isinstance(state, dict) or any(
+            state.get(key) != fresh[key]
+            for key in ("version", "sales_path", "catalogue")):
+        return fresh
+    return state
+
+
+def _resume_follow(spools, sales_path, catalogue_path, checkpoint_path,
+                   cat_errors):
+    """
+    (state, sinks) to start following from: the checkpoint's if there is a
+    usable one whose spool files are intact, else a fresh state.
+    """
+    fresh = _new_follow_state(sales_path, catalogue_path)
+    if checkpoint_path:
+        state = _load_checkpoint(checkpoint_path, fresh)
+        sinks = spools.sinks(state, cat_errors)
+        if sinks is not None:
+            return state, sinks
+    return fresh, spools.sinks(fresh, cat_errors)
+
+
+class FollowSpools:
+    """
+    Detail and error line files of follow mode: temporary files, or
+    checkpoint_path + ".details" / ".errors" so that they survive restarts
+    along with the checkpoint.
+    """
+
+    def __init__(self, checkpoint_path=None):
+        """Open (or create) the files; may raise OSError."""
+        if checkpoint_path:
+            # pylint: disable-next=consider-using-with
+            self.files = [open(f"{checkpoint_path}.{kind}", "a+",
+                               encoding="utf-8")
+                          for kind in ("details", "errors")]
+        else:
+            # pylint: disable-next=consider-using-with
+            self.files = [tempfile.TemporaryFile("w+", encoding="utf-8")
+                          for _ in range(2)]
+
+    def sinks(self, state, cat_errors):
+        """
+        (SaleDetails, ErrorLines) continuing from `state`: lines written
+        after it was saved are cut off, and the errors of a fresh state
+        start with cat_errors. None if a file is shorter than the state
+        says (lost or replaced).
+        """
+        for spool, size in zip(self.files, state["spooled"]):
+            if spool.seek(0, os.SEEK_END) < size:
+                return None
+            spool.truncate(size)
+            spool.seek(size)
+        details = SaleDetails(spool=self.files[0], count=state["sales"])
+        errors = ErrorLines(self.files[1], state["errors"])
+        if state["spooled"] == [0, 0]:
+            errors.extend(cat_errors)
+        return details, errors
+
+    def sizes(self):
+        """Byte sizes of the files."""
+        return [spool.seek(0, os.SEEK_END) for spool in self.files]
+
+    def close(self):
+        """Close the files."""
+        for spool in self.files:
+            spool.close()
+
+
+def _follow_new_lines(state, sinks, price_map):
+    """
+    Total the complete lines appended to the sales file since the last
+    poll into state and sinks (SaleDetails, ErrorLines). Returns whether
+    there were new records.
+    """
+    records = state["records"]
+    details, errors = sinks
+    _, _, grand_total = process_sales(
+        iter_appended_json_lines(state["sales_path"], state), price_map,
+        first_index=records, errors=errors, details=details,
+    )
+    state["grand_total"] += grand_total
+    return state["records"] > records
+
+
+def _write_follow_report(out, sinks, grand_total, start):
+    """Follow mode report from sinks, timed since perf_counter `start`."""
+    write_sales_report(
+        out, sinks[0], grand_total, sinks[1], minor_units=True
+    )
+    out.write(f"Time elapsed: {time.perf_counter() - start:.6f} seconds\n")
+
+
+def follow_sales(catalogue_path, sales_path, output_path="SalesResults.txt",
+                 interval=FOLLOW_INTERVAL, checkpoint_path=None,
+                 iterations=None, cache_dir=None, status=None):
+    """
+    Follow a JSON Lines sales file that is being appended to. The price map
+    and running totals stay in memory; every `interval` seconds only the
+    complete lines added since the last poll are processed, and when there
+    were new lines the report is rewritten atomically at output_path.
+    A file that shrank (truncated or rotated) is processed from the start.
+    Detail and error lines are appended to FollowSpools files and copied
+    into each report, so a refresh only formats the new sales.
+
+    With checkpoint_path the state (byte offset, totals and spool sizes)
+    is saved after each refresh, so a restart resumes where it stopped
+    unless the catalogue changed. status, if given, is called with a short
+    line after each refresh. Stops after `iterations` polls (forever if
+    None). Returns (results_text, success) like run_compute_sales with an
+    output stream: results_text is None unless the sales file is not JSON
+    Lines or the catalogue cannot be used.
+    """
+    # Keyword options of the --follow command line and its tests
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    # pylint: disable=too-many-locals
+    if detect_sales_format(sales_path) != "jsonl":
+        return "Follow mode needs a JSON Lines sales file.\n", False
+    price_map, cat_errors = load_price_map(catalogue_path, cache_dir)
+    if price_map is None:
+        return "\n".join(cat_errors) + "\n", False
+
+    spools = FollowSpools(checkpoint_path)
+    try:
+        state, sinks = _resume_follow(
+            spools, sales_path, catalogue_path, checkpoint_path, cat_errors
+        )
+        polls = 0
+        while iterations is None or polls < iterations:
+            if polls:
+                time.sleep(interval)
+            start = time.perf_counter()
+            changed = polls == 0
+            polls += 1
+            try:
+                size = os.path.getsize(sales_path)
+            except OSError:
+                size = state["offset"]
+            if size < state["offset"]:
+                state = _new_follow_state(sales_path, catalogue_path)
+                sinks = spools.sinks(state, cat_errors)
+                changed = True
+            if size > state["offset"]:
+                changed = _follow_new_lines(state, sinks, price_map) or changed
+            if not changed:
+                continue
+            state.update(sales=len(sinks[0]), errors=len(sinks[1]),
+                         spooled=spools.sizes())
+            write_atomic(output_path, partial(
+                _write_follow_report, sinks=sinks,
+                grand_total=state["grand_total"], start=start,
+            ))
+            if checkpoint_path:
+                write_atomic(checkpoint_path, partial(json.dump, state))
+            if status is not None:
+                status(
+                    f"{time.strftime('%H:%M:%S')} "
+                    f"{state['sales']} sales, grand total "
+                    f"${format_money(state['grand_total'])}"
+                )
+        return None, True
+    finally:
+        spools.close()
@@ -0,0 +1,217 @@
+"""
+Process-pool totals of computeSales (--workers): the sales file is split
+into shards that the workers read themselves, or streamed in batches, and
+their partial results are merged back in file order.
+"""
+
+import os
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool, get_start_method
+
+from json_readers import (
+    array_first_element, chain_array_shards, count_line_records,
+    iter_array_range, iter_json_array, iter_json_lines, line_shards,
+    scan_array_shard,
+)
+from sale_totals import process_sales
+from sales_report import SalesAnalytics
+
+SALES_BATCH = 2000
+ARRAY_SHARD_BYTES = 8 << 20
+LINE_SHARD_BYTES = 8 << 20
+
+
+_WORKER_STATE = {}
+
+
+def _init_worker(price_map, analytics, titles):
+    """Pool initializer: keep the catalogue in the worker process."""
+    _WORKER_STATE["price_map"] = price_map
+    _WORKER_STATE["analytics"] = analytics
+    _WORKER_STATE["titles"] = titles
+
+
+def _make_pool(workers, price_map, analytics=False, titles=None):
+    """
+    Process pool whose workers see price_map, the title index and whether
+    to collect analytics. With the fork start method the workers inherit
+    them from this process (no copy is sent); otherwise they are passed
+    once per worker through the initializer.
+    """
+    if get_start_method() == "fork":
+        _init_worker(price_map, analytics, titles)
+        return Pool(workers)
+    return Pool(
+        workers, initializer=_init_worker,
+        initargs=(price_map, analytics, titles),
+    )
+
+
+def _process_in_worker(sales, first_index):
+    """
+    process_sales in a worker; the task's analytics counters (or None) are
+    appended to the result.
+    """
+    price_map = _WORKER_STATE["price_map"]
+    titles = _WORKER_STATE["titles"]
+    if not _WORKER_STATE["analytics"]:
+        result = process_sales(sales, price_map, first_index, titles=titles)
+        return result + (None,)
+    analytics = _WORKER_STATE.get("partial")
+    if analytics is None:
+        analytics = _WORKER_STATE["partial"] = SalesAnalytics(price_map)
+    result = process_sales(sales, price_map, first_index, analytics, titles)
+    return result + (analytics.take_counters(),)
+
+
+def _line_shard_tasks(pool, sales_path, workers):
+    """
+    (path, start, end, first_index) tasks for a JSON Lines file: byte-range
+    shards of about LINE_SHARD_BYTES, at least one per worker, numbered by
+    a first pass in the pool that counts the records of each shard.
+    """
+    shard_count = max(
+        workers, -(-os.path.getsize(sales_path) // LINE_SHARD_BYTES)
+    )
+    shards = [
+        (sales_path, start, end)
+        for start, end in line_shards(sales_path, shard_count)
+    ]
+    tasks = []
+    first_index = 0
+    for shard, count in zip(shards, pool.map(count_line_records, shards)):
+        tasks.append(shard + (first_index,))
+        first_index += count
+    return tasks
+
+
+def _process_shard(task):
+    """Worker: process_sales over one (path, start, end, first_index) shard."""
+    filepath, start, end, first_index = task
+    return _process_in_worker(
+        iter_json_lines(filepath, start, end), first_index
+    )
+
+
+def _process_batch(task):
+    """Worker: process_sales over one (first_index, sales) batch."""
+    first_index, sales = task
+    return _process_in_worker(sales, first_index)
+
+
+def _iter_batches(sales, size):
+    """Group sale records into (first_index, list_of_sales) batches."""
+    sales = iter(sales)
+    first_index = 0
+    while True:
+        batch = list(islice(sales, size))
+        if not batch:
+            return
+        yield first_index, batch
+        first_index += len(batch)
+
+
+def _array_shard_tasks(pool, sales_path, workers):
+    """
+    Split a JSON array file into (path, start, stop, first_index) byte
+    ranges of whole elements, located by the workers (scan_array_shard)
+    in shards of at most ARRAY_SHARD_BYTES. Returns None when the file is
+    not a non-empty array or the shards do not chain (each one must start
+    at the comma where the previous one stopped), so the caller can stream
+    the file instead and report its errors exactly.
+    """
+    body = array_first_element(sales_path)
+    if body is None:
+        return None
+    size = os.path.getsize(sales_path)
+    step = min(ARRAY_SHARD_BYTES, -(-(size - body) // workers))
+    cuts = list(range(body, size, step)) + [size]
+    scans = pool.map(scan_array_shard, [
+        (sales_path, start, end, start == body)
+        for start, end in zip(cuts, cuts[1:])
+    ])
+    return chain_array_shards(sales_path, body, scans)
+
+
+def _process_array_shard(task):
+    """Worker: process_sales over one (path, start, stop, first_index)."""
+    filepath, start, stop, first_index = task
+    return _process_in_worker(
+        iter_array_range(filepath, start, stop), first_index
+    )
+
+
+def _merge_ordered(pool, func, tasks, window, analytics=None, errors=None,
+                   details=None):
+    """
+    Run func over tasks in the pool with at most `window` tasks in flight
+    (so a lazy task iterator is not read ahead without bound) and merge the
+    worker results in task order.
+    """
+    # The optional sinks are passed down from run_compute_sales
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    grand_total = 0
+    details = [] if details is None else details
+    errors = [] if errors is None else errors
+    pending = deque()
+
+    def merge_next():
+        part_details, part_errors, part_total, counters = (
+            pending.popleft().get()
+        )
+        details.extend(part_details)
+        errors.extend(part_errors)
+        if analytics is not None:
+            analytics.merge_counters(counters)
+        return part_total
+
+    for task in tasks:
+        pending.append(pool.apply_async(func, (task,)))
+        if len(pending) >= window:
+            grand_total += merge_next()
+    while pending:
+        grand_total += merge_next()
+    return details, errors, grand_total
+
+
+def process_sales_parallel(sales_path, sales_format, price_map, workers,
+                           analytics=None, titles=None, errors=None,
+                           details=None):
+    """
+    Same result as process_sales, computed by a process pool that shares
+    price_map. JSON Lines files are split into byte-range shards of about
+    LINE_SHARD_BYTES (at least one per worker) read by the workers
+    themselves; a first pass counts the records of each shard so every
+    shard knows the index of its first sale. JSON arrays are split
+    the same way at element boundaries the workers find themselves (see
+    _array_shard_tasks); if that fails they are streamed by this process
+    and sent to the workers in batches. Partial results (and analytics
+    counters) are merged in file order as they arrive, with at most
+    2 * workers tasks in flight, so only their details are held at once.
+    """
+    # The optional sinks are passed down from run_compute_sales
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    pool = _make_pool(workers, price_map, analytics is not None, titles)
+    try:
+        if sales_format == "jsonl":
+            tasks = _line_shard_tasks(pool, sales_path, workers)
+            return _merge_ordered(
+                pool, _process_shard, tasks, 2 * workers, analytics, errors,
+                details,
+            )
+        tasks = _array_shard_tasks(pool, sales_path, workers)
+        if tasks is not None:
+            return _merge_ordered(
+                pool, _process_array_shard, tasks, 2 * workers, analytics,
+                errors, details,
+            )
+        batches = _iter_batches(iter_json_array(sales_path), SALES_BATCH)
+        return _merge_ordered(
+            pool, _process_batch, batches, 2 * workers, analytics, errors,
+            details,
+        )
+    finally:
+        pool.terminate()
+        pool.join()
+        _WORKER_STATE.clear()
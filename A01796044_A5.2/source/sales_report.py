@@ -0,0 +1,396 @@
+"""
+Report building blocks of computeSales: errors tagged with a category,
+the bounded ErrorSummary of --max-errors and --errors-jsonl, the error
+lines spooled by follow mode, the SalesAnalytics of --analytics, and the
+per-sale details and report text written to SalesResults.txt.
+"""
+
+import csv
+import heapq
+import io
+import json
+import os
+import shutil
+import tempfile
+from bisect import bisect_right
+from collections import Counter
+
+from catalogue import PriceHistory
+from money import (
+    MINOR_UNITS_PER_CENT, MINOR_UNITS_PER_UNIT, exact_cents, format_money,
+)
+
+DEFAULT_TOP = 10
+DEFAULT_ERROR_SAMPLE = 10
+# Upper bounds (exclusive, in minor units) of the sale size buckets
+SALE_SIZE_BUCKETS = tuple(
+    dollars * MINOR_UNITS_PER_UNIT for dollars in (10, 50, 100, 500, 1000)
+)
+
+
+class SalesError(str):
+    """An error message (a plain str to callers) tagged with a category."""
+
+    def __new__(cls, category, message):
+        error = super().__new__(cls, message)
+        error.category = category
+        return error
+
+    def __reduce__(self):
+        return SalesError, (self.category, str(self))
+
+
+class ErrorSummary:
+    """
+    Bounded replacement for the list of report errors: counts errors per
+    category (plain strings count as "catalogue"), keeps the first `sample`
+    messages of each category and, if jsonl_path is given, streams every
+    error to that JSON Lines file. Supports append and extend like a list;
+    iterating yields the report lines.
+    """
+
+    def __init__(self, sample=DEFAULT_ERROR_SAMPLE, jsonl_path=None):
+        """Create an empty summary; opening jsonl_path may raise OSError."""
+        self.sample = sample
+        self.counts = Counter()
+        self.samples = {}
+        self.jsonl = None
+        if jsonl_path:
+            # Closed by close(), once all the errors are written
+            # pylint: disable-next=consider-using-with
+            self.jsonl = open(jsonl_path, "w", encoding="utf-8")
+
+    def append(self, error):
+        """Count one error and keep it if its category sample is not full."""
+        category = getattr(error, "category", "catalogue")
+        self.counts[category] += 1
+        kept = self.samples.setdefault(category, [])
+        if len(kept) < self.sample:
+            kept.append(str(error))
+        if self.jsonl is not None:
+            self.jsonl.write(
+                json.dumps({"category": category, "message": str(error)}) +
+                "\n"
+            )
+
+    def extend(self, errors):
+        """Append every error of an iterable."""
+        for error in errors:
+            self.append(error)
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def __iter__(self):
+        yield f"Total errors: {len(self)}"
+        for category, count in self.counts.items():
+            kept = self.samples[category]
+            yield f"{category}: {count}"
+            for message in kept:
+                yield f"  {message}"
+            if count > len(kept):
+                yield f"  ... {count - len(kept)} more"
+
+    def close(self):
+        """Close the JSON Lines file, if any."""
+        if self.jsonl is not None:
+            self.jsonl.close()
+            self.jsonl = None
+
+
+class ErrorLines:
+    """
+    Report error lines appended to an open text file that already holds
+    `count` of them (follow mode), so they neither stay in memory nor are
+    rebuilt for every report. Supports append and extend like a list.
+    """
+
+    def __init__(self, spool, count=0):
+        self._spool = spool
+        self._count = count
+
+    def append(self, error):
+        """Add one error line."""
+        self._count += 1
+        self._spool.write(f"{error}\n")
+
+    def extend(self, errors):
+        """Append every error of an iterable."""
+        for error in errors:
+            self.append(error)
+
+    def __len__(self):
+        return self._count
+
+    def write_to(self, out):
+        """Copy the error lines to the text stream out."""
+        self._spool.seek(0)
+        shutil.copyfileobj(self._spool, out)
+        self._spool.seek(0, os.SEEK_END)
+
+
+class SalesAnalytics:  # pylint: disable=too-many-instance-attributes
+    """
+    Per-product units and revenue plus the sale size distribution, collected
+    while the sales are totalled. Product counters are preallocated lists
+    indexed by the product's position in the price map (catalogue order).
+    Amounts are in the price map's unit (minor units, see
+    MINOR_UNITS_PER_UNIT, for run_compute_sales).
+    """
+
+    def __init__(self, price_map):
+        """Create empty counters for every product of price_map."""
+        self.titles = list(price_map)
+        self.prices = list(price_map.values())
+        self.index = {title: idx for idx, title in enumerate(self.titles)}
+        self.units = [0] * len(self.titles)
+        self.revenue = [0] * len(self.titles)
+        self.size_counts = [0] * (len(SALE_SIZE_BUCKETS) + 1)
+        self.sales = 0
+        self.total = 0
+        self.touched = set()
+
+    def add_sale(self, sale_total, items):
+        """Count one sale and its (title, quantity, amount) line items."""
+        index = self.index
+        units, revenue = self.units, self.revenue
+        for title, quantity, amount in items:
+            idx = index[title]
+            units[idx] += quantity
+            revenue[idx] += amount
+            self.touched.add(idx)
+        self.size_counts[bisect_right(SALE_SIZE_BUCKETS, sale_total)] += 1
+        self.sales += 1
+        self.total += sale_total
+
+    def take_counters(self):
+        """
+        Return the counters as a compact picklable tuple (only the products
+        that were sold) and reset them; used to send worker results back.
+        """
+        products = [
+            (idx, self.units[idx], self.revenue[idx]) for idx in self.touched
+        ]
+        counters = (products, self.size_counts, self.sales, self.total)
+        for idx in self.touched:
+            self.units[idx] = self.revenue[idx] = 0
+        self.touched = set()
+        self.size_counts = [0] * (len(SALE_SIZE_BUCKETS) + 1)
+        self.sales = self.total = 0
+        return counters
+
+    def merge_counters(self, counters):
+        """Add counters returned by take_counters (same price map)."""
+        products, size_counts, sales, total = counters
+        for idx, units, revenue in products:
+            self.units[idx] += units
+            self.revenue[idx] += revenue
+            self.touched.add(idx)
+        self.size_counts = [
+            mine + theirs
+            for mine, theirs in zip(self.size_counts, size_counts)
+        ]
+        self.sales += sales
+        self.total += total
+
+    def top_products(self, top=DEFAULT_TOP):
+        """Indexes of the `top` products with most revenue (ties by title)."""
+        return heapq.nsmallest(
+            top,
+            (idx for idx in self.touched if self.units[idx]),
+            key=lambda idx: (-self.revenue[idx], self.titles[idx]),
+        )
+
+    def size_distribution(self):
+        """(low, high, sales) per sale size bucket; high is None at the end."""
+        lows = (0,) + SALE_SIZE_BUCKETS
+        highs = SALE_SIZE_BUCKETS + (None,)
+        return list(zip(lows, highs, self.size_counts))
+
+    def report_lines(self, top=DEFAULT_TOP):
+        """Report sections for the analytics (amounts in minor units)."""
+        lines_out = [f"Top {top} products by revenue:"]
+        for rank, idx in enumerate(self.top_products(top), start=1):
+            lines_out.append(
+                f"  {rank}. {self.titles[idx]}: {self.units[idx]} units, "
+                f"${format_money(self.revenue[idx])}"
+            )
+        sold = sum(1 for idx in self.touched if self.units[idx])
+        lines_out.extend([
+            "",
+            f"Products sold: {sold} of {len(self.titles)}",
+            f"Units sold: {sum(self.units)}",
+            "",
+            "Sale size distribution:",
+        ])
+        for low, high, sales in self.size_distribution():
+            if high is None:
+                label = f"${format_money(low)} and over"
+            else:
+                label = (
+                    f"${format_money(low)} - "
+                    f"${format_money(high - MINOR_UNITS_PER_CENT)}"
+                )
+            lines_out.append(f"  {label}: {sales}")
+        if self.sales:
+            average = (self.total + self.sales // 2) // self.sales
+            lines_out.append(f"Average sale: ${format_money(average)}")
+        lines_out.append("")
+        return lines_out
+
+    def export(self, path):
+        """
+        Write the analytics as JSON (.json) or CSV (any other name), with
+        amounts in exact cents (see exact_cents). The price of a product
+        with dated prices is left empty.
+        """
+        products = [
+            {
+                "product": title,
+                "price_cents": (
+                    None if isinstance(price, PriceHistory)
+                    else exact_cents(price)
+                ),
+                "units": units,
+                "revenue_cents": exact_cents(revenue),
+            }
+            for title, price, units, revenue in zip(
+                self.titles, self.prices, self.units, self.revenue
+            )
+        ]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            if not path.lower().endswith(".json"):
+                writer = csv.writer(f)
+                writer.writerow(
+                    ["product", "price_cents", "units", "revenue_cents"]
+                )
+                writer.writerows(row.values() for row in products)
+                return
+            json.dump(
+                {
+                    "sales": self.sales,
+                    "total_cents": exact_cents(self.total),
+                    "units": sum(self.units),
+                    "products": products,
+                    "sale_sizes": [
+                        {
+                            "min_cents": exact_cents(low),
+                            "max_cents": None if high is None else (
+                                exact_cents(high - MINOR_UNITS_PER_CENT)
+                            ),
+                            "sales": sales,
+                        }
+                        for low, high, sales in self.size_distribution()
+                    ],
+                },
+                f,
+                indent=2,
+            )
+
+
+class SaleDetails:
+    """
+    Per-sale (sale_name, sale_total) details in minor units, appended as
+    they are computed. Rather than a list, they are kept as formatted
+    report lines in a temporary file (or `spool`, an open text file that
+    already holds `count` lines), so millions of sales do not stay in
+    memory; with csv_path they are also written there as sale_number,
+    sale, total_cents rows (see exact_cents).
+    """
+
+    def __init__(self, csv_path=None, spool=None, count=0):
+        self._count = count
+        self._csv_file = None
+        self._csv = None
+        if csv_path:
+            # pylint: disable-next=consider-using-with
+            self._csv_file = open(csv_path, "w", encoding="utf-8", newline="")
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(["sale_number", "sale", "total_cents"])
+        if spool is None:
+            # pylint: disable-next=consider-using-with
+            spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self._lines = spool
+
+    def append(self, detail):
+        """Add one (sale_name, sale_total) detail."""
+        sale_name, sale_total = detail
+        self._count += 1
+        self._lines.write(
+            f"  {self._count}. {sale_name}: ${format_money(sale_total)}\n"
+        )
+        if self._csv is not None:
+            self._csv.writerow(
+                (self._count, sale_name, exact_cents(sale_total))
+            )
+
+    def extend(self, details):
+        """Add several details."""
+        for detail in details:
+            self.append(detail)
+
+    def __len__(self):
+        return self._count
+
+    def write_to(self, out):
+        """Copy the formatted detail lines to the text stream out."""
+        self._lines.seek(0)
+        shutil.copyfileobj(self._lines, out)
+        self._lines.seek(0, os.SEEK_END)
+
+    def close(self):
+        """Close the CSV file and discard the temporary file."""
+        if self._csv_file is not None:
+            self._csv_file.close()
+        self._lines.close()
+
+
+def write_sales_report(out, details, grand_total, all_errors,
+                       minor_units=False, sections=()):
+    """
+    Write the report to the text stream out, one part at a time: the
+    summary header, the per-sale details (a list of (sale_name, sale_total)
+    or a SaleDetails, whose lines are copied from its temporary file), the
+    extra `sections` lines and all errors (lines, or an ErrorLines copied
+    the same way). Amounts are integer minor units when minor_units is
+    True, else floats.
+    """
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    money = format_money if minor_units else "{:.2f}".format
+    out.write("\n".join([
+        "Sales Summary",
+        "=" * 50,
+        "",
+        f"Total number of sales: {len(details)}",
+        f"Grand total: ${money(grand_total)}",
+        "",
+        "Details:",
+    ]) + "\n")
+    if isinstance(details, SaleDetails):
+        details.write_to(out)
+    else:
+        out.writelines(
+            f"  {num}. {sale_name}: ${money(sale_total)}\n"
+            for num, (sale_name, sale_total) in enumerate(details, start=1)
+        )
+    lines_out = ["", *sections]
+    if all_errors:
+        lines_out.extend(
+            ["Warnings/Errors (execution continued):", "-" * 40]
+        )
+        if isinstance(all_errors, ErrorLines):
+            out.write("\n".join(lines_out) + "\n")
+            all_errors.write_to(out)
+            return
+        lines_out.extend([*all_errors, ""])
+    out.write("\n".join(lines_out))
+
+
+def format_sales_report(details, grand_total, all_errors, minor_units=False,
+                        sections=()):
+    """The text write_sales_report would write, as a string."""
+    out = io.StringIO()
+    write_sales_report(
+        out, details, grand_total, all_errors, minor_units, sections
+    )
+    return out.getvalue()
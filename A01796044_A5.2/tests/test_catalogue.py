@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name,wrong-import-position
+"""Unit tests for catalogue module."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import catalogue as cat  # noqa: E402
+
+
+def temporary_directory(test):
+    """TemporaryDirectory removed when `test` finishes."""
+    # Cleaned up by the test case, so that it outlives setUp
+    # pylint: disable-next=consider-using-with
+    tmp_dir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp_dir.cleanup)
+    return tmp_dir
+
+
+class TestBuildPriceMap(unittest.TestCase):
+    """Tests for build_price_map."""
+
+    def test_valid_catalogue(self):
+        """Build price map from valid catalogue."""
+        catalogue = [
+            {"title": "Product A", "price": 10.5},
+            {"title": "Product B", "price": 25.0},
+        ]
+        price_map, errors = cat.build_price_map(catalogue)
+        self.assertEqual(errors, [])
+        self.assertEqual(price_map["Product A"], 10.5)
+        self.assertEqual(price_map["Product B"], 25.0)
+
+    def test_invalid_catalogue_not_list(self):
+        """Catalogue must be a list."""
+        _, errors = cat.build_price_map({"title": "A", "price": 10})
+        self.assertNotEqual(errors, [])
+        self.assertIn("JSON array", errors[0])
+
+    def test_catalogue_invalid_entry_skipped(self):
+        """Invalid entries are reported but valid ones added."""
+        catalogue = [
+            {"title": "Product A", "price": 10},
+            {"title": "", "price": 5},
+            {"title": "Product B", "price": 25},
+        ]
+        price_map, errors = cat.build_price_map(catalogue)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("Product A", price_map)
+        self.assertIn("Product B", price_map)
+
+    def test_minor_units(self):
+        """Prices become exact integers of 1/10000 dollar, never rounded."""
+        catalogue = [
+            {"title": "Product A", "price": 10.5},
+            {"title": "Product B", "price": "1.005"},
+            {"title": "Product C", "price": 1e400},
+            {"title": "Product D", "price": 0.00001},
+        ]
+        price_map, errors = cat.build_price_map(catalogue, minor_units=True)
+        self.assertEqual(price_map, {"Product A": 105000, "Product B": 10050})
+        self.assertEqual(len(errors), 2)
+        self.assertIn("invalid price", errors[0])
+        self.assertIn("price '1e-05' has more than 4 decimals", errors[1])
+
+
+class TestCatalogueCache(unittest.TestCase):
+    """Tests for the compiled catalogue cache of load_price_map."""
+
+    def setUp(self):
+        tmp_dir = temporary_directory(self)
+        self.cache_dir = os.path.join(tmp_dir.name, "cache")
+        self.cat_path = os.path.join(tmp_dir.name, "catalogue.json")
+        self._write_catalogue([
+            {"title": "Product A", "price": 10.5},
+            {"title": "", "price": 1},
+        ])
+
+    def _write_catalogue(self, catalogue):
+        with open(self.cat_path, "w", encoding="utf-8") as f:
+            json.dump(catalogue, f)
+
+    def test_cache_replays_map_and_errors(self):
+        """A cached catalogue is not parsed again; errors are replayed."""
+        expected = cat.load_price_map(self.cat_path)
+        self.assertEqual(cat.load_price_map(self.cat_path, self.cache_dir),
+                         expected)
+        with mock.patch.object(cat, "build_price_map") as build:
+            self.assertEqual(
+                cat.load_price_map(self.cat_path, self.cache_dir), expected
+            )
+            os.utime(self.cat_path, ns=(0, 0))
+            self.assertEqual(
+                cat.load_price_map(self.cat_path, self.cache_dir), expected
+            )
+        build.assert_not_called()
+        self.assertEqual(expected[0], {"Product A": 105000})
+        self.assertEqual(len(expected[1]), 1)
+
+    def test_changed_catalogue_rebuilds(self):
+        """A changed catalogue replaces the cached entry."""
+        cat.load_price_map(self.cat_path, self.cache_dir)
+        self._write_catalogue([{"title": "Product B", "price": 2}])
+        os.utime(self.cat_path, ns=(0, 0))
+        self.assertEqual(
+            cat.load_price_map(self.cat_path, self.cache_dir),
+            ({"Product B": 20000}, []),
+        )
+
+    def test_corrupt_cache_and_invalid_json(self):
+        """Unreadable cache entries are rebuilt; JSON errors are reported."""
+        cat.load_price_map(self.cat_path, self.cache_dir)
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), "wb") as f:
+                f.write(b"garbage")
+        self.assertEqual(
+            cat.load_price_map(self.cat_path, self.cache_dir)[0],
+            {"Product A": 105000},
+        )
+        with open(self.cat_path, "w", encoding="utf-8") as f:
+            f.write("[{")
+        price_map, errors = cat.load_price_map(self.cat_path, self.cache_dir)
+        self.assertIsNone(price_map)
+        self.assertIn("Invalid JSON", errors[0])
+
+
+class TestBuildTitleIndex(unittest.TestCase):
+    """Tests for build_title_index."""
+
+    price_map = {"Product A": 1050, "Green Tea": 300, "green  tea": 310}
+
+    def test_build_title_index(self):
+        """Clashing titles and bad aliases are reported."""
+        titles, errors = cat.build_title_index(self.price_map, {
+            "prodcut a": "Product A",
+            "Teh": "Missing",
+            "PRODUCT a": "Green Tea",
+        })
+        self.assertEqual(titles.resolve("  product   A "), "Product A")
+        self.assertEqual(titles.resolve("Prodcut  A"), "Product A")
+        self.assertIsNone(titles.resolve("GREEN TEA"))
+        self.assertEqual(len(errors), 3)
+        self.assertIn("'Green Tea', 'green  tea'", errors[0])
+        self.assertIn("Alias 'Teh'", errors[1])
+        self.assertIn("Alias 'PRODUCT a'", errors[2])
+
+
+class TestDatedPrices(unittest.TestCase):
+    """Tests for catalogue prices with effective dates."""
+
+    catalogue = [
+        {"title": "Tea", "price": 2, "effective_to": "2024-01-31"},
+        {"title": "Tea", "price": 3, "effective_from": "2024-03-01"},
+        {"title": "Tea", "price": 2.5, "effective_from": "2024-02-01",
+         "effective_to": "2024-02-29"},
+        {"title": "Mug", "price": 8},
+    ]
+
+    def test_build_price_history(self):
+        """Dated entries become a sorted PriceHistory per product."""
+        price_map, errors = cat.build_price_map(self.catalogue, True)
+        self.assertEqual(errors, [])
+        self.assertEqual(list(price_map), ["Tea", "Mug"])
+        history = price_map["Tea"]
+        for day, price in (("2023-05-01", 20000), ("2024-02-29", 25000),
+                           ("2024-03-01", 30000), ("2099-12-31", 30000)):
+            self.assertEqual(history.at(cat.date_ordinal(day)), price)
+
+    def test_invalid_and_overlapping_entries(self):
+        """Overlaps, bad dates and mixed dated/undated prices are errors."""
+        price_map, errors = cat.build_price_map([
+            {"title": "Tea", "price": 2, "effective_from": "2024-01-01"},
+            {"title": "Tea", "price": 3, "effective_from": "2024-06-01",
+             "effective_to": "2024-06-30"},
+            {"title": "Tea", "price": 4},
+            {"title": "Mug", "price": 8},
+            {"title": "Mug", "price": 9, "effective_to": "2024-01-01"},
+            {"title": "Pot", "price": 1, "effective_from": "soon"},
+            {"title": "Pan", "price": 1, "effective_from": "2024-02-01",
+             "effective_to": "2024-01-01"},
+        ], True)
+        self.assertEqual(list(price_map), ["Tea", "Mug"])
+        self.assertEqual(price_map["Tea"].prices, [20000])
+        self.assertEqual(len(errors), 5)
+        self.assertIn("Catalog entry 2 (Tea): effective dates overlap "
+                      "catalog entry 1", errors[-1])
+
+    def test_history_survives_cache(self):
+        """Price histories are rebuilt from the catalogue cache."""
+        with tempfile.TemporaryDirectory() as tmp:
+            cat_path = os.path.join(tmp, "catalogue.json")
+            with open(cat_path, "w", encoding="utf-8") as f:
+                json.dump(self.catalogue, f)
+            expected = cat.load_price_map(cat_path)
+            self.assertEqual(cat.load_price_map(cat_path, tmp), expected)
+            self.assertEqual(cat.load_price_map(cat_path, tmp), expected)
+            self.assertIsInstance(expected[0]["Tea"], cat.PriceHistory)
+
+
+if __name__ == "__main__":
+    unittest.main()
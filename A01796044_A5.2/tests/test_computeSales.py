@@ -2,110 +2,170 @@
 # pylint: disable=invalid-name,wrong-import-position
 """Unit tests for computeSales module."""
 
+import csv
+import io
 import json
 import os
 import sys
 import tempfile
 import unittest
+from unittest import mock
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
 
 import computeSales as cs  # noqa: E402
+import money  # noqa: E402
+import sales_parallel as sp  # noqa: E402
 
 
-class TestLoadJsonFile(unittest.TestCase):
-    """Tests for load_json_file."""
+def temporary_directory(test):
+    """TemporaryDirectory removed when `test` finishes."""
+    # Cleaned up by the test case, so that it outlives setUp
+    # pylint: disable-next=consider-using-with
+    tmp_dir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp_dir.cleanup)
+    return tmp_dir
 
-    def test_valid_json(self):
-        """Load valid JSON returns data and None error."""
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".json", delete=False
-        ) as f:
-            json.dump([{"title": "A", "price": 10}], f)
-            path = f.name
-        try:
-            data, err = cs.load_json_file(path)
-            self.assertIsNone(err)
-            self.assertEqual(data, [{"title": "A", "price": 10}])
-        finally:
-            os.unlink(path)
 
-    def test_file_not_found(self):
-        """Non-existent file returns error."""
-        _, err = cs.load_json_file("/nonexistent/path.json")
-        self.assertIsNotNone(err)
-        self.assertIn("not found", err)
+class TestTitleIndex(unittest.TestCase):
+    """Tests for tolerant product title lookups."""
 
-    def test_invalid_json(self):
-        """Invalid JSON returns error."""
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".json", delete=False
-        ) as f:
-            f.write("{ invalid json }")
-            path = f.name
-        try:
-            _, err = cs.load_json_file(path)
-            self.assertIsNotNone(err)
-            self.assertIn("Invalid JSON", err)
-        finally:
-            os.unlink(path)
+    price_map = {"Product A": 1050, "Green Tea": 300, "green  tea": 310}
+
+    def test_run_with_aliases(self):
+        """--aliases maps known misspellings, also in worker processes."""
+        with tempfile.TemporaryDirectory() as tmp:
+            cat_path = os.path.join(tmp, "catalogue.json")
+            sales_path = os.path.join(tmp, "sales.jsonl")
+            aliases_path = os.path.join(tmp, "aliases.json")
+            with open(cat_path, "w", encoding="utf-8") as f:
+                json.dump([{"title": "Product A", "price": 10.5}], f)
+            with open(aliases_path, "w", encoding="utf-8") as f:
+                json.dump({"Prodcut A": "Product A"}, f)
+            with open(sales_path, "w", encoding="utf-8") as f:
+                for name in ("product a", "prodcut  A", "Product A") * 5:
+                    f.write(json.dumps(
+                        {"Products": [{"title": name, "quantity": 1}]}
+                    ) + "\n")
+            plain, _ = cs.run_compute_sales(cat_path, sales_path)
+            self.assertIn("Grand total: $52.50", plain)
+            for workers in (None, 2):
+                text, _ = cs.run_compute_sales(
+                    cat_path, sales_path, workers=workers,
+                    aliases_path=aliases_path,
+                )
+                self.assertIn("Grand total: $157.50", text)
+                self.assertNotIn("Warnings/Errors", text)
 
 
-class TestBuildPriceMap(unittest.TestCase):
-    """Tests for build_price_map."""
+class TestErrorSummary(unittest.TestCase):
+    """Tests for categorized, bounded error reporting."""
 
-    def test_valid_catalogue(self):
-        """Build price map from valid catalogue."""
-        catalogue = [
-            {"title": "Product A", "price": 10.5},
-            {"title": "Product B", "price": 25.0},
+    def setUp(self):
+        tmp_dir = temporary_directory(self)
+        self.tmp = tmp_dir.name
+        self.cat_path = os.path.join(self.tmp, "catalogue.json")
+        self.sales_path = os.path.join(self.tmp, "sales.json")
+        with open(self.cat_path, "w", encoding="utf-8") as f:
+            json.dump([{"title": "Pen", "price": 1}, {"price": 2}], f)
+        sales = [
+            {"Products": [{"title": "Pen", "quantity": 1},
+                          {"title": f"Nope {i}", "quantity": 1},
+                          {"title": "Pen", "quantity": "x"}]}
+            for i in range(30)
         ]
-        price_map, errors = cs.build_price_map(catalogue)
-        self.assertEqual(errors, [])
-        self.assertEqual(price_map["Product A"], 10.5)
-        self.assertEqual(price_map["Product B"], 25.0)
-
-    def test_invalid_catalogue_not_list(self):
-        """Catalogue must be a list."""
-        _, errors = cs.build_price_map({"title": "A", "price": 10})
-        self.assertNotEqual(errors, [])
-        self.assertIn("JSON array", errors[0])
-
-    def test_catalogue_invalid_entry_skipped(self):
-        """Invalid entries are reported but valid ones added."""
-        catalogue = [
-            {"title": "Product A", "price": 10},
-            {"title": "", "price": 5},
-            {"title": "Product B", "price": 25},
+        sales.insert(3, 42)
+        with open(self.sales_path, "w", encoding="utf-8") as f:
+            json.dump(sales, f)
+
+    def test_run_with_max_errors_and_jsonl(self):
+        """The report is bounded; the JSON Lines file has every error."""
+        jsonl_path = os.path.join(self.tmp, "errors.jsonl")
+        full, _ = cs.run_compute_sales(self.cat_path, self.sales_path)
+        self.assertEqual(full.count("not in catalogue"), 30)
+        for workers in (None, 2):
+            text, success = cs.run_compute_sales(
+                self.cat_path, self.sales_path, workers=workers,
+                max_errors=1, errors_jsonl=jsonl_path,
+            )
+            self.assertTrue(success)
+            self.assertIn("Total errors: 62\ncatalogue: 1\n", text)
+            self.assertIn("unknown_product: 30\n  Sale 1, item 2: "
+                          "product 'Nope 0' not in catalogue\n"
+                          "  ... 29 more\n", text)
+            self.assertIn("invalid_record: 1\n", text)
+            self.assertEqual(text.count("not in catalogue"), 1)
+            with open(jsonl_path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+            self.assertEqual(
+                [record["message"] for record in records],
+                full.split("----\n", 1)[1].splitlines(),
+            )
+            self.assertEqual(records[-1]["category"], "invalid_quantity")
+
+
+class TestSalesAnalytics(unittest.TestCase):
+    """Tests for per-product and sale size analytics."""
+
+    def setUp(self):
+        tmp_dir = temporary_directory(self)
+        self.tmp = tmp_dir.name
+        self.cat_path = os.path.join(self.tmp, "catalogue.json")
+        with open(self.cat_path, "w", encoding="utf-8") as f:
+            json.dump([{"title": "Pen", "price": 1.5},
+                       {"title": "Book", "price": 12},
+                       {"title": "Lamp", "price": 40}], f)
+        self.sales = [
+            {"Products": [{"title": "Pen", "quantity": i % 3 + 1},
+                          {"title": "Book" if i % 4 else "Nope",
+                           "quantity": 1}]}
+            for i in range(60)
         ]
-        price_map, errors = cs.build_price_map(catalogue)
-        self.assertEqual(len(errors), 1)
-        self.assertIn("Product A", price_map)
-        self.assertIn("Product B", price_map)
-
-
-class TestComputeSaleTotal(unittest.TestCase):
-    """Tests for compute_sale_total."""
-
-    def test_valid_sale(self):
-        """Compute total for valid sale."""
-        price_map = {"Product A": 10.0, "Product B": 25.0}
-        sale = {
-            "Sale": "Sale 1",
-            "Products": [
-                {"title": "Product A", "quantity": 2},
-                {"title": "Product B", "quantity": 1},
-            ],
-        }
-        total, errors = cs.compute_sale_total(sale, price_map, 0)
-        self.assertEqual(errors, [])
-        self.assertEqual(total, 45.0)
 
-    def test_missing_products(self):
-        """Sale without Products returns error."""
-        total, errors = cs.compute_sale_total({"Sale": "S1"}, {}, 0)
-        self.assertNotEqual(errors, [])
-        self.assertEqual(total, 0.0)
+    def test_parallel_matches_sequential(self):
+        """Worker counters merge into the same report and export."""
+        sales_path = os.path.join(self.tmp, "sales.json")
+        with open(sales_path, "w", encoding="utf-8") as f:
+            json.dump(self.sales, f)
+        seq_export = os.path.join(self.tmp, "seq.json")
+        par_export = os.path.join(self.tmp, "par.json")
+        expected = cs.run_compute_sales(
+            self.cat_path, sales_path, analytics=True, top=2,
+            export_path=seq_export,
+        )
+        with mock.patch.object(sp, "SALES_BATCH", 7):
+            result = cs.run_compute_sales(
+                self.cat_path, sales_path, workers=3, analytics=True, top=2,
+                export_path=par_export,
+            )
+        self.assertEqual(result, expected)
+        self.assertIn("  1. Book: 45 units, $540.00", expected[0])
+        self.assertIn("Products sold: 2 of 3", expected[0])
+        with open(seq_export, encoding="utf-8") as f:
+            exported = json.load(f)
+        with open(par_export, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), exported)
+        self.assertEqual(exported["units"], 165)
+        self.assertEqual(exported["total_cents"], 72000)
+
+    def test_csv_export_without_report_sections(self):
+        """Export alone writes CSV and leaves the report unchanged."""
+        sales_path = os.path.join(self.tmp, "sales.json")
+        with open(sales_path, "w", encoding="utf-8") as f:
+            json.dump(self.sales[:4], f)
+        csv_path = os.path.join(self.tmp, "products.csv")
+        text, _ = cs.run_compute_sales(
+            self.cat_path, sales_path, export_path=csv_path
+        )
+        self.assertEqual(text, cs.run_compute_sales(self.cat_path,
+                                                    sales_path)[0])
+        with open(csv_path, encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines(), [
+                "product,price_cents,units,revenue_cents",
+                "Pen,150,7,1050",
+                "Book,1200,3,3600",
+                "Lamp,4000,0,0",
+            ])
 
 
 class TestRunComputeSales(unittest.TestCase):
@@ -152,6 +212,173 @@ class TestRunComputeSales(unittest.TestCase):
             os.unlink(cat_path)
             os.unlink(sales_path)
 
+    def test_totals_are_exact(self):
+        """Many small amounts add up without floating-point drift."""
+        tmp_dir = temporary_directory(self)
+        cat_path = os.path.join(tmp_dir.name, "catalogue.json")
+        sales_path = os.path.join(tmp_dir.name, "sales.json")
+        with open(cat_path, "w", encoding="utf-8") as f:
+            json.dump([{"title": "Gum", "price": 0.1},
+                       {"title": "Pen", "price": 1.005}], f)
+        with open(sales_path, "w", encoding="utf-8") as f:
+            json.dump(
+                [{"Products": [{"title": "Gum", "quantity": 1}]}] * 1000 +
+                [{"Products": [{"title": "Pen", "quantity": 1}]}],
+                f,
+            )
+        text, success = cs.run_compute_sales(cat_path, sales_path)
+        self.assertTrue(success)
+        self.assertIn("Grand total: $101.01", text)
+        self.assertIn("1001. Sale 1001: $1.01", text)
+
+    def test_fatal_error_written_to_output(self):
+        """With an output stream, a catalogue error is written there."""
+        out = io.StringIO()
+        result = cs.run_compute_sales(
+            "missing_catalogue.json", "missing_sales.json", output=out
+        )
+        self.assertEqual(result, (None, False))
+        self.assertIn("missing_catalogue.json", out.getvalue())
+        self.assertTrue(out.getvalue().endswith("\n"))
+
+
+class TestJsonLinesSales(unittest.TestCase):
+    """Tests for JSON Lines sales input and shard-parallel processing."""
+
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+        self.cat_path = os.path.join(self.tmp_dir.name, "catalogue.json")
+        with open(self.cat_path, "w", encoding="utf-8") as f:
+            json.dump(
+                [
+                    {"title": "Product A", "price": 10.50},
+                    {"title": "Product B", "price": 25.00},
+                ],
+                f,
+            )
+        self.sales = [
+            {
+                "Sale": f"Sale {i:03d}",
+                "Products": [
+                    {"title": "Product A", "quantity": i % 4},
+                    {"title": "Product B" if i % 5 else "Nope", "quantity": 1},
+                ],
+            }
+            for i in range(1, 41)
+        ]
+
+    def _write_sales(self, name, lines):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def test_same_report_as_array(self):
+        """JSON Lines input gives the same report as the JSON array."""
+        array_path = self._write_sales("a.json", [json.dumps(self.sales)])
+        lines_path = self._write_sales(
+            "b.jsonl", [json.dumps(sale) for sale in self.sales]
+        )
+        self.assertEqual(
+            cs.run_compute_sales(self.cat_path, lines_path),
+            cs.run_compute_sales(self.cat_path, array_path),
+        )
+
+    def test_invalid_lines_are_skipped(self):
+        """A bad line is reported and processing continues."""
+        path = self._write_sales(
+            "b.jsonl",
+            [
+                json.dumps(self.sales[0]), "{oops", "",
+                json.dumps(self.sales[1]),
+            ],
+        )
+        text, success = cs.run_compute_sales(self.cat_path, path)
+        self.assertTrue(success)
+        self.assertIn("Total number of sales: 2", text)
+        self.assertIn("Sale record 2: invalid JSON line", text)
+
+    def test_streamed_report_and_details_csv(self):
+        """The streamed report equals the text one; details go to CSV."""
+        path = self._write_sales(
+            "sales.jsonl", [json.dumps(sale) for sale in self.sales]
+        )
+        expected, _ = cs.run_compute_sales(self.cat_path, path)
+        csv_path = os.path.join(self.tmp_dir.name, "details.csv")
+        for workers in (None, 3):
+            out = io.StringIO()
+            result = cs.run_compute_sales(
+                self.cat_path, path, workers=workers, output=out,
+                details_csv=csv_path,
+            )
+            self.assertEqual(result, (None, True))
+            self.assertEqual(out.getvalue(), expected)
+            with open(csv_path, "r", encoding="utf-8", newline="") as f:
+                rows = list(csv.reader(f))
+            self.assertEqual(rows[0], ["sale_number", "sale", "total_cents"])
+            self.assertEqual(rows[1], ["1", "Sale 001", "3550"])
+            self.assertEqual(len(rows), 41)
+            total = sum(int(row[2]) for row in rows[1:])
+            self.assertIn(
+                "Grand total: "
+                f"${money.format_money(total * money.MINOR_UNITS_PER_CENT)}",
+                expected,
+            )
+
+    def test_parallel_matches_sequential(self):
+        """Shard-parallel processing keeps sale order and numbering."""
+        lines = [json.dumps(sale) for sale in self.sales]
+        lines[7] = "not json"
+        lines.insert(20, "")
+        path = self._write_sales("b.jsonl", lines)
+        expected = cs.run_compute_sales(self.cat_path, path)
+        for workers in (2, 3, 7):
+            self.assertEqual(
+                cs.run_compute_sales(self.cat_path, path, workers=workers),
+                expected,
+            )
+
+    def test_small_shards_bounded_window(self):
+        """Many small shards are merged with 2 * workers in flight."""
+        lines = [json.dumps(sale) for sale in self.sales]
+        lines[3] = "[1, 2"
+        path = self._write_sales("c.jsonl", lines)
+        expected = cs.run_compute_sales(self.cat_path, path)
+        # pylint: disable=protected-access
+        merge = mock.Mock(wraps=sp._merge_ordered)
+        with mock.patch.object(sp, "LINE_SHARD_BYTES", 300), \
+                mock.patch.object(sp, "_merge_ordered", merge):
+            self.assertEqual(
+                cs.run_compute_sales(self.cat_path, path, workers=2),
+                expected,
+            )
+        tasks, window = merge.call_args.args[2:4]
+        self.assertEqual(window, 4)
+        self.assertGreater(len(tasks), 10)
+
+
+class TestParseCommandLine(unittest.TestCase):
+    """Tests for the option checks of main."""
+
+    def test_only_given_options_converted(self):
+        """Options that were not given stay absent (see --follow)."""
+        args, options = cs.parse_command_line(
+            ["cat.json", "sales.jsonl", "--follow", "--top=3"]
+        )
+        self.assertEqual(args, ["cat.json", "sales.jsonl"])
+        self.assertEqual(options, {
+            "follow": True, "top": 3, "interval": cs.FOLLOW_INTERVAL,
+        })
+
+    def test_invalid_values(self):
+        """Out of range numbers raise ValueError."""
+        for argv in (["--workers", "0"], ["--top", "x"],
+                     ["--max-errors", "-1"], ["--interval", "nan"],
+                     ["--interval", "0"]):
+            with self.subTest(argv=argv):
+                with self.assertRaises(ValueError):
+                    cs.parse_command_line(argv)
+
 
 if __name__ == "__main__":
     unittest.main()
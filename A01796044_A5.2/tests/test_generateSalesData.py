@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name,wrong-import-position
+"""Unit tests for generateSalesData module."""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import computeSales as cs  # noqa: E402
+import generateSalesData as gen  # noqa: E402
+import sale_totals as st  # noqa: E402
+
+
+def _read(path):
+    """File contents as text."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class TestGenerateSalesData(unittest.TestCase):
+    """Tests for the synthetic catalogue and sales generator."""
+
+    def test_same_seed_same_files(self):
+        """Two runs with one seed write identical files."""
+        with tempfile.TemporaryDirectory() as tmp:
+            first = gen.generate_files(os.path.join(tmp, "a"), seed=7,
+                                       error_rate=0.1, variants=True)
+            second = gen.generate_files(os.path.join(tmp, "b"), seed=7,
+                                        error_rate=0.1, variants=True)
+            other = gen.generate_files(os.path.join(tmp, "c"), seed=8)
+            for path_a, path_b in zip(first, second):
+                self.assertEqual(_read(path_a), _read(path_b))
+            self.assertNotEqual(_read(first[1]), _read(other[1]))
+
+    def test_counts_and_variants(self):
+        """Sales count, items range and alternative keys are honoured."""
+        sales = list(gen.generate_sales(200, 5, random.Random(1), items=4,
+                                        variants=True))
+        self.assertEqual(len(sales), 200)
+        products_keys = set()
+        for sale in sales:
+            (key,) = set(sale) - {"Sale"}
+            products_keys.add(key)
+            self.assertTrue(1 <= len(sale[key]) <= 7)
+        self.assertEqual(products_keys, set(st.PRODUCTS_KEYS))
+
+    def test_error_rate(self):
+        """No errors without an error rate; every item fails at rate 1."""
+        for sales_format in ("json", "jsonl"):
+            with tempfile.TemporaryDirectory() as tmp:
+                paths = gen.generate_files(tmp, products=20, sales=50,
+                                           sales_format=sales_format)
+                _, success = cs.run_compute_sales(*paths)
+                self.assertTrue(success)
+
+        sales = gen.generate_sales(50, 20, random.Random(2), error_rate=1)
+        price_map = {f"Product {num}": 1.0 for num in range(1, 21)}
+        for idx, sale in enumerate(sales):
+            items = []
+            total, errors = st.compute_sale_total(sale, price_map, idx,
+                                                  items=items)
+            self.assertEqual((total, items), (0, []))
+            self.assertTrue(errors)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name,wrong-import-position
+"""Unit tests for json_backend module."""
+
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import json_backend  # noqa: E402
+
+DOCUMENTS = [
+    '[{"title": "A", "price": 10.5}, {"title": "B", "price": 1e-7}]',
+    '{"a": 1, "a": 2, "b": [true, false, null], "c": "\\u00e9"}',
+    "123456789012345678901234567890",
+    "[NaN, Infinity, 1e400]",
+    '"\\ud800"',
+    "  [1]\n",
+]
+INVALID = [
+    '{"a": 1,}', "[1, 2", "", "  ", '{"a": 1} x', "\ufeff[1]",
+    "01", "05", "-", "[1.]", '["\t"]', "5.e3471179",
+]
+SERIALIZED = [
+    [{"hotel_id": "H001", "name": "Hotel Plaza", "rooms": 50}],
+    {"price": 1e16, "small": 1e-05, "ratio": 0.1},
+    {"small": 1e-05},
+    [1.5e-05, -2.5e-07, 0.0001, 1e15],
+    {"value": None, "nan": float("nan")},
+    {"big": 10 ** 20, "text": "é\u2028\x1f"},
+    {1: "non-string key"},
+    [],
+]
+
+
+class TestJsonBackend(unittest.TestCase):
+    """Every available backend behaves exactly like the stdlib json."""
+
+    def setUp(self):
+        self.original = json_backend.backend_name()
+
+    def tearDown(self):
+        json_backend.set_backend(self.original)
+
+    def available_backends(self):
+        """Names of the installed backends."""
+        return sorted({json_backend.set_backend(name)
+                       for name in json_backend.BACKENDS})
+
+    def test_loads_matches_json(self):
+        """Same values for str and bytes input, NaN and huge integers."""
+        for name in self.available_backends():
+            json_backend.set_backend(name)
+            for doc in DOCUMENTS:
+                for data in (doc, doc.encode("utf-8")):
+                    with self.subTest(backend=name, data=data):
+                        self.assertEqual(
+                            repr(json_backend.loads(data)),
+                            repr(json.loads(data)),
+                        )
+
+    def test_loads_error_messages_match_json(self):
+        """Invalid documents raise json.JSONDecodeError with its message."""
+        for name in self.available_backends():
+            json_backend.set_backend(name)
+            for doc in INVALID:
+                with self.subTest(backend=name, doc=doc):
+                    with self.assertRaises(json.JSONDecodeError) as expected:
+                        json.loads(doc)
+                    with self.assertRaises(json.JSONDecodeError) as got:
+                        json_backend.loads(doc)
+                    self.assertEqual(str(got.exception),
+                                     str(expected.exception))
+
+    def test_dumps_matches_json(self):
+        """Same text as json.dumps, with and without indentation."""
+        for name in self.available_backends():
+            json_backend.set_backend(name)
+            for obj in SERIALIZED:
+                for options in ({}, {"indent": 2, "ensure_ascii": False}):
+                    with self.subTest(backend=name, obj=obj, **options):
+                        self.assertEqual(json_backend.dumps(obj, **options),
+                                         json.dumps(obj, **options))
+
+    def test_missing_backend_falls_back(self):
+        """Uninstalled backends fall through to the stdlib json."""
+        with mock.patch.dict(sys.modules, {"orjson": None}):
+            self.assertEqual(json_backend.set_backend("orjson"), "json")
+            self.assertEqual(json_backend.set_backend(), "json")
+        self.assertEqual(json_backend.loads(b"[1]"), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name,wrong-import-position
+"""Unit tests for json_readers module."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import json_readers as jr  # noqa: E402
+
+
+class TestLoadJsonFile(unittest.TestCase):
+    """Tests for load_json_file."""
+
+    def test_valid_json(self):
+        """Load valid JSON returns data and None error."""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".json", delete=False
+        ) as f:
+            json.dump([{"title": "A", "price": 10}], f)
+            path = f.name
+        try:
+            data, err = jr.load_json_file(path)
+            self.assertIsNone(err)
+            self.assertEqual(data, [{"title": "A", "price": 10}])
+        finally:
+            os.unlink(path)
+
+    def test_file_not_found(self):
+        """Non-existent file returns error."""
+        _, err = jr.load_json_file("/nonexistent/path.json")
+        self.assertIsNotNone(err)
+        self.assertIn("not found", err)
+
+    def test_invalid_json(self):
+        """Invalid JSON returns error."""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".json", delete=False
+        ) as f:
+            f.write("{ invalid json }")
+            path = f.name
+        try:
+            _, err = jr.load_json_file(path)
+            self.assertIsNotNone(err)
+            self.assertIn("Invalid JSON", err)
+        finally:
+            os.unlink(path)
+
+
+class TestIterJsonArray(unittest.TestCase):
+    """Tests for iter_json_array."""
+
+    def _write(self, text):
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".json", delete=False
+        ) as f:
+            f.write(text)
+        self.addCleanup(os.unlink, f.name)
+        return f.name
+
+    def test_elements_across_chunks(self):
+        """Elements split across small read chunks are decoded."""
+        text = '[{"a": [1, "x]y"]},\n 12345, -1.5e3, true, null, "s"]'
+        path = self._write(text)
+        for size in (1, 2, 7, 1000):
+            self.assertEqual(
+                list(jr.iter_json_array(path, chunk_size=size)),
+                json.loads(text)
+            )
+
+    def test_invalid_json_same_message(self):
+        """Errors carry the same message and position as json.loads."""
+        for text in ("[1,\n2 3]", "[1,", "[1] x", "[{\"a\": }]",
+                     "[1, tru]", "[-]", "[1.]", "[\"ab\\u12\"]",
+                     "[\"abcdef\", {\"k\": 1e}]"):
+            path = self._write(text)
+            with self.assertRaises(json.JSONDecodeError) as expected:
+                json.loads(text)
+            for size in (1, 2, 5):
+                with self.assertRaises(json.JSONDecodeError) as got:
+                    list(jr.iter_json_array(path, chunk_size=size))
+                self.assertEqual(
+                    str(got.exception), str(expected.exception)
+                )
+
+    def test_invalid_element_stops_reading(self):
+        """A malformed element fails without reading the rest of the file."""
+        path = self._write(
+            '[{"a": 1 "b": 2}, ' + ", ".join(["1"] * 100000) + "]"
+        )
+        reader = jr._ArrayReader  # pylint: disable=protected-access
+        with mock.patch.object(
+            reader, "fill", autospec=True, side_effect=reader.fill
+        ) as fill_mock:
+            with self.assertRaises(json.JSONDecodeError):
+                list(jr.iter_json_array(path, chunk_size=64))
+        self.assertLess(fill_mock.call_count, 5)
+
+    def test_not_an_array(self):
+        """A valid non-array document is reported as such."""
+        path = self._write('{"Sale": "S1"}')
+        with self.assertRaises(jr.NotAJsonArrayError):
+            list(jr.iter_json_array(path))
+
+
+class TestJsonLines(unittest.TestCase):
+    """Tests for the JSON Lines readers."""
+
+    def _write(self, suffix, lines):
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=suffix, delete=False
+        ) as f:
+            f.write("\n".join(lines) + "\n")
+        self.addCleanup(os.unlink, f.name)
+        return f.name
+
+    def test_detect_format(self):
+        """JSON Lines is detected by extension or by content."""
+        sales = [{"Sale": f"S{i}", "Products": []} for i in range(5)]
+        array_path = self._write(".json", [json.dumps(sales)])
+        by_content = self._write(".json", [json.dumps(s) for s in sales])
+        by_name = self._write(".ndjson", ["", "[1]"])
+        self.assertEqual(jr.detect_sales_format(array_path), "array")
+        self.assertEqual(jr.detect_sales_format(by_content), "jsonl")
+        self.assertEqual(jr.detect_sales_format(by_name), "jsonl")
+
+    def test_shards_cover_every_line(self):
+        """Line shards split the records without losing or repeating any."""
+        lines = [json.dumps({"n": i}) for i in range(50)]
+        lines[7] = ""
+        lines[20] = "{oops"
+        path = self._write(".jsonl", lines)
+        whole = list(jr.iter_json_lines(path))
+        self.assertEqual(len(whole), 49)
+        self.assertIsInstance(whole[19], jr.InvalidJsonLine)
+        shards = jr.line_shards(path, 4)
+        self.assertEqual(len(shards), 4)
+        self.assertEqual(
+            [jr.count_line_records((path,) + shard) for shard in shards],
+            [len(list(jr.iter_json_lines(path, *shard)))
+             for shard in shards],
+        )
+        self.assertEqual(
+            [value for shard in shards
+             for value in jr.iter_json_lines(path, *shard)],
+            whole,
+        )
+
+    def test_appended_lines_wait_for_newline(self):
+        """A line still being written is left for the next read."""
+        path = self._write(".jsonl", ['{"n": 1}', "", '{"n": 2}'])
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"n": ')
+        state = {"offset": 0, "records": 0}
+        self.assertEqual(list(jr.iter_appended_json_lines(path, state)),
+                         [{"n": 1}, {"n": 2}])
+        self.assertEqual(state["records"], 2)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("3}\n")
+        self.assertEqual(list(jr.iter_appended_json_lines(path, state)),
+                         [{"n": 3}])
+        self.assertEqual(state["offset"], os.path.getsize(path))
+
+
+class TestArrayShards(unittest.TestCase):
+    """Tests for splitting a JSON array into byte ranges of elements."""
+
+    def _shard_tasks(self, path, step):
+        body = jr.array_first_element(path)
+        size = os.path.getsize(path)
+        cuts = list(range(body, size, step)) + [size]
+        scans = [
+            jr.scan_array_shard((path, start, end, start == body))
+            for start, end in zip(cuts, cuts[1:])
+        ]
+        return jr.chain_array_shards(path, body, scans)
+
+    def test_ranges_cover_every_element(self):
+        """Commas inside strings and nested values do not split elements."""
+        values = [{"Sale": f"S{i}, [{i}]", "x": [i, {"y": "é,"}]}
+                  for i in range(40)]
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".json", encoding="utf-8", delete=False
+        ) as f:
+            json.dump(values, f, ensure_ascii=False, indent=1)
+        self.addCleanup(os.unlink, f.name)
+        for step in (97, 300, 1 << 20):
+            decoded = []
+            for _, start, stop, first_index in self._shard_tasks(f.name,
+                                                                 step):
+                self.assertEqual(first_index, len(decoded))
+                decoded.extend(jr.iter_array_range(f.name, start, stop))
+            self.assertEqual(decoded, values)
+
+    def test_invalid_array(self):
+        """Text that is not an array of values has no shard ranges."""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".json", delete=False
+        ) as f:
+            f.write('[{"a": 1}, oops, {"b": 2}]')
+        self.addCleanup(os.unlink, f.name)
+        self.assertIsNone(self._shard_tasks(f.name, 8))
+        self.assertIsNone(self._shard_tasks(f.name, 1 << 20))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name,wrong-import-position
+"""Unit tests for money module."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import money  # noqa: E402
+
+
+class TestMoney(unittest.TestCase):
+    """Tests for minor unit conversion and formatting."""
+
+    def test_to_minor_units(self):
+        """Prices are exact; more than PRICE_DECIMALS decimals is an error."""
+        self.assertEqual(money.to_minor_units(10.5), 105000)
+        self.assertEqual(money.to_minor_units(1.005), 10050)
+        self.assertEqual(money.to_minor_units(0.0001), 1)
+        with self.assertRaises(ValueError):
+            money.to_minor_units(0.00001)
+
+    def test_format_money(self):
+        """Minor units are formatted as dollars rounded half up to cents."""
+        for amount, text in ((0, "0.00"), (460500, "46.05"), (-700, "-0.07"),
+                             (1250, "0.13"), (1249, "0.12"), (-49, "0.00")):
+            self.assertEqual(money.format_money(amount), text)
+
+    def test_exact_cents(self):
+        """Whole cents stay integers; fractions of a cent are kept."""
+        self.assertEqual(money.exact_cents(16500), 165)
+        self.assertEqual(money.exact_cents(1250), 12.5)
+        self.assertEqual(money.exact_cents(4950120), 49501.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name,wrong-import-position
+"""Unit tests for sale_totals module."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import catalogue as cat  # noqa: E402
+import money  # noqa: E402
+import sale_totals as st  # noqa: E402
+import sales_report as rep  # noqa: E402
+
+
+def temporary_directory(test):
+    """TemporaryDirectory removed when `test` finishes."""
+    # Cleaned up by the test case, so that it outlives setUp
+    # pylint: disable-next=consider-using-with
+    tmp_dir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp_dir.cleanup)
+    return tmp_dir
+
+
+class TestComputeSaleTotal(unittest.TestCase):
+    """Tests for compute_sale_total."""
+
+    def test_valid_sale(self):
+        """Compute total for valid sale."""
+        price_map = {"Product A": 10.0, "Product B": 25.0}
+        sale = {
+            "Sale": "Sale 1",
+            "Products": [
+                {"title": "Product A", "quantity": 2},
+                {"title": "Product B", "quantity": 1},
+            ],
+        }
+        total, errors = st.compute_sale_total(sale, price_map, 0)
+        self.assertEqual(errors, [])
+        self.assertEqual(total, 45.0)
+
+    def test_missing_products(self):
+        """Sale without Products returns error."""
+        total, errors = st.compute_sale_total({"Sale": "S1"}, {}, 0)
+        self.assertNotEqual(errors, [])
+        self.assertEqual(total, 0.0)
+
+    def test_sub_cent_prices_summed_exactly(self):
+        """Sub-cent prices by large quantities are only rounded at the end."""
+        price_map, _ = cat.build_price_map(
+            [{"title": "Bolt", "price": 0.125},
+             {"title": "Nut", "price": 0.004}], minor_units=True)
+        sales = [{"Products": [{"title": "Bolt", "quantity": 1000},
+                               {"title": "Nut", "quantity": 10000}]},
+                 {"Products": [{"title": "Nut", "quantity": 1}]}] * 3
+        analytics = rep.SalesAnalytics(price_map)
+        details, _, total = st.process_sales(sales, price_map,
+                                             analytics=analytics)
+        self.assertEqual([money.format_money(amount) for _, amount in details],
+                         ["165.00", "0.00"] * 3)
+        self.assertEqual(money.format_money(total), "495.01")
+        path = os.path.join(temporary_directory(self).name, "a.json")
+        analytics.export(path)
+        with open(path, encoding="utf-8") as f:
+            exported = json.load(f)
+        self.assertEqual(exported["total_cents"], 49501.2)
+        self.assertEqual([(row["price_cents"], row["revenue_cents"])
+                          for row in exported["products"]],
+                         [(12.5, 37500), (0.4, 12001.2)])
+
+
+class TestSaleSchemaFastPath(unittest.TestCase):
+    """Tests for detect_sale_schema and make_sale_totaller."""
+
+    price_map = {"Product A": 10.0, "Product B": 25.0}
+
+    def test_detect_schema(self):
+        """The most common key layout is detected."""
+        sales = [
+            {"items": [{"name": "Product A", "qty": 2}]},
+            {"items": [{"name": "Product B", "qty": 1}]},
+            {"Products": [{"title": "Product A", "quantity": 1}]},
+        ]
+        self.assertEqual(
+            st.detect_sale_schema(sales), ("items", "name", "qty")
+        )
+        self.assertIsNone(st.detect_sale_schema([{"Sale": "S1"}, 3]))
+
+    def test_fast_path_matches_generic(self):
+        """Matching and non-matching sales give compute_sale_total results."""
+        sale_total = st.make_sale_totaller(
+            ("Products", "title", "quantity"), self.price_map
+        )
+        sales = [
+            {"Products": [{"title": "Product A", "quantity": 2},
+                          {"title": " Product B ", "quantity": 1}]},
+            {"Products": [{"title": "Product A", "quantity": 0}]},
+            {"Products": [{"title": "Missing", "quantity": 1}]},
+            {"Products": [{"name": "Product B", "qty": "3"}]},
+            {"Products": [{"title": ["x"], "quantity": 1}]},
+            {"products": [{"title": "Product A", "quantity": 1}]},
+            {"Products": []},
+            {"Sale": "no products"},
+        ]
+        for idx, sale in enumerate(sales):
+            fast_items, items = [], []
+            self.assertEqual(
+                sale_total(sale, idx, fast_items),
+                st.compute_sale_total(sale, self.price_map, idx, items),
+            )
+            self.assertEqual(fast_items, items)
+
+
+class TestDatedPrices(unittest.TestCase):
+    """Tests for sales priced by date."""
+
+    catalogue = [
+        {"title": "Mug", "price": 8},
+        {"title": "Tea", "price": 2, "effective_to": "2024-01-31"},
+        {"title": "Tea", "price": 2.5, "effective_from": "2024-02-01"},
+    ]
+
+    def test_sales_priced_by_date(self):
+        """Each sale uses the price in effect on its date, on both paths."""
+        price_map, _ = cat.build_price_map(self.catalogue, True)
+        sales = [
+            {"date": "2024-01-15", "Products": [
+                {"title": "Tea", "quantity": 2},
+                {"title": "Mug", "quantity": 1}]},
+            {"date": "2024-02-10T09:30:00", "Products": [
+                {"title": "Tea", "quantity": 2}]},
+            {"Products": [{"title": "Tea", "quantity": 1}]},
+            {"date": "2024-13-01", "Products": [
+                {"title": "Mug", "quantity": 1}]},
+        ]
+        details, errors, total = st.process_sales(sales, price_map)
+        self.assertEqual([amount for _, amount in details],
+                         [120000, 50000, 0, 80000])
+        self.assertEqual(total, 250000)
+        self.assertEqual(errors, [
+            "Sale 3, item 1 (Tea): dated price needs a valid sale date",
+        ])
+        sale_total = st.make_sale_totaller(
+            ("Products", "title", "quantity"), price_map
+        )
+        for idx, sale in enumerate(sales):
+            self.assertEqual(sale_total(sale, idx),
+                             st.compute_sale_total(sale, price_map, idx))
+
+    def test_no_price_on_date(self):
+        """Gaps in a price history are reported per item."""
+        price_map, _ = cat.build_price_map([
+            {"title": "Tea", "price": 2, "effective_from": "2024-03-01"},
+        ], True)
+        _, errors = st.compute_sale_total(
+            {"date": "2024-01-01",
+             "Products": [{"title": "Tea", "quantity": 1}]},
+            price_map, 0,
+        )
+        self.assertEqual(errors, ["Sale 1, item 1 (Tea): no price on "
+                                  "2024-01-01"])
+
+
+class TestTitleIndex(unittest.TestCase):
+    """Tests for tolerant product title lookups."""
+
+    price_map = {"Product A": 1050, "Green Tea": 300, "green  tea": 310}
+
+    def test_sales_match_normalized_titles(self):
+        """Both sale paths resolve titles and report the same items."""
+        titles, _ = cat.build_title_index(self.price_map)
+        sales = [
+            {"Products": [{"title": "product a", "quantity": 2},
+                          {"title": "Green Tea", "quantity": 1}]},
+            {"Products": [{"title": "PRODUCT  A", "quantity": 1}]},
+            {"Products": [{"title": "GREEN TEA", "quantity": 1}]},
+        ]
+        sale_total = st.make_sale_totaller(
+            ("Products", "title", "quantity"), self.price_map, titles
+        )
+        for idx, sale in enumerate(sales):
+            fast_items, items = [], []
+            self.assertEqual(
+                sale_total(sale, idx, fast_items),
+                st.compute_sale_total(sale, self.price_map, idx, items,
+                                      titles),
+            )
+            self.assertEqual(fast_items, items)
+        details, errors, _ = st.process_sales(sales, self.price_map,
+                                              titles=titles)
+        self.assertEqual([total for _, total in details], [2400, 1050, 0])
+        self.assertEqual(len(errors), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name,wrong-import-position
+"""Unit tests for sales_follow module."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import computeSales as cs  # noqa: E402
+import sales_follow as sf  # noqa: E402
+
+
+def temporary_directory(test):
+    """TemporaryDirectory removed when `test` finishes."""
+    # Cleaned up by the test case, so that it outlives setUp
+    # pylint: disable-next=consider-using-with
+    tmp_dir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp_dir.cleanup)
+    return tmp_dir
+
+
+class TestFollowSales(unittest.TestCase):
+    """Tests for follow mode over an appended JSON Lines file."""
+
+    def setUp(self):
+        tmp_dir = temporary_directory(self)
+        self.tmp = tmp_dir.name
+        self.cat_path = os.path.join(self.tmp, "catalogue.json")
+        self.sales_path = os.path.join(self.tmp, "sales.jsonl")
+        self.out_path = os.path.join(self.tmp, "SalesResults.txt")
+        self.checkpoint = os.path.join(self.tmp, "state.json")
+        with open(self.cat_path, "w", encoding="utf-8") as f:
+            json.dump([{"title": "Pen", "price": 1.25}, {"title": "X"}], f)
+        self.lines = [
+            json.dumps({"Sale": f"S{i}", "Products": [
+                {"title": "Pen" if i % 4 else "Nope", "quantity": i}
+            ]})
+            for i in range(1, 9)
+        ]
+
+    def _append(self, text):
+        with open(self.sales_path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def _follow(self):
+        text, success = sf.follow_sales(
+            self.cat_path, self.sales_path, self.out_path, interval=0,
+            checkpoint_path=self.checkpoint, iterations=1,
+        )
+        self.assertTrue(success)
+        self.assertIsNone(text)
+        with open(self.out_path, encoding="utf-8") as f:
+            report = f.read()
+        self.assertRegex(report, r"\nTime elapsed: [0-9.]+ seconds\n$")
+        return report[:report.rindex("Time elapsed:")]
+
+    def test_resume_from_checkpoint(self):
+        """Only complete new lines are read; restarts resume the totals."""
+        partial = self.lines[5][:10]
+        self._append("\n".join(self.lines[:5]) + "\n" + partial)
+        self.assertIn("Total number of sales: 5\n", self._follow())
+        with open(self.checkpoint, encoding="utf-8") as f:
+            state = json.load(f)
+        self.assertEqual(state["offset"],
+                         os.path.getsize(self.sales_path) - len(partial))
+        self.assertNotIn("details", state)
+        # Lines spooled after the checkpoint was saved are dropped
+        with open(self.checkpoint + ".details", "a", encoding="utf-8") as f:
+            f.write("  6. stale: $1.00\n")
+
+        self._append(self.lines[5][10:] + "\n\n" +
+                     "\n".join(self.lines[6:]) + "\n")
+        expected, _ = cs.run_compute_sales(self.cat_path, self.sales_path)
+        self.assertEqual(self._follow(), expected)
+
+    def test_array_file_rejected(self):
+        """Only JSON Lines files can be followed."""
+        array_path = os.path.join(self.tmp, "sales.json")
+        with open(array_path, "w", encoding="utf-8") as f:
+            json.dump([json.loads(line) for line in self.lines], f)
+        text, success = sf.follow_sales(
+            self.cat_path, array_path, self.out_path, iterations=1,
+        )
+        self.assertFalse(success)
+        self.assertIn("JSON Lines", text)
+        self.assertFalse(os.path.exists(self.out_path))
+
+    def test_truncation_and_catalogue_change(self):
+        """A shrunk file or a changed catalogue starts over."""
+        self._append("\n".join(self.lines) + "\n")
+        self._follow()
+        with open(self.sales_path, "w", encoding="utf-8") as f:
+            f.write(self.lines[0] + "\n")
+        self.assertIn("Total number of sales: 1\n", self._follow())
+
+        with open(self.cat_path, "w", encoding="utf-8") as f:
+            json.dump([{"title": "Pen", "price": 2}], f)
+        os.utime(self.cat_path, ns=(1, 1))
+        self.assertIn("Grand total: $2.00\n", self._follow())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name,wrong-import-position
+"""Unit tests for sales_parallel module."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import computeSales as cs  # noqa: E402
+import sales_parallel as sp  # noqa: E402
+
+
+def temporary_directory(test):
+    """TemporaryDirectory removed when `test` finishes."""
+    # Cleaned up by the test case, so that it outlives setUp
+    # pylint: disable-next=consider-using-with
+    tmp_dir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp_dir.cleanup)
+    return tmp_dir
+
+
+class TestParallelArraySales(unittest.TestCase):
+    """Tests for process-pool totals over JSON array input."""
+
+    def test_parallel_matches_sequential(self):
+        """Batches computed by workers are merged back in order."""
+        tmp_dir = temporary_directory(self)
+        cat_path = os.path.join(tmp_dir.name, "catalogue.json")
+        sales_path = os.path.join(tmp_dir.name, "sales.json")
+        with open(cat_path, "w", encoding="utf-8") as f:
+            json.dump([{"title": "Product A", "price": 1.25}], f)
+        sales = [
+            {"Sale": f"S{i}", "Products": [
+                {"title": "Product A" if i % 6 else "Nope", "quantity": i}
+            ]}
+            for i in range(50)
+        ]
+        sales.insert(10, "not a sale")
+        with open(sales_path, "w", encoding="utf-8") as f:
+            json.dump(sales, f)
+        expected = cs.run_compute_sales(cat_path, sales_path)
+        with mock.patch.object(sp, "SALES_BATCH", 7), \
+                mock.patch.object(sp, "ARRAY_SHARD_BYTES", 1):
+            self.assertEqual(
+                cs.run_compute_sales(cat_path, sales_path, workers=3),
+                expected,
+            )
+
+    def test_workers_read_array_shards(self):
+        """Workers split the array at element boundaries themselves."""
+        tmp_dir = temporary_directory(self)
+        cat_path = os.path.join(tmp_dir.name, "catalogue.json")
+        sales_path = os.path.join(tmp_dir.name, "sales.json")
+        with open(cat_path, "w", encoding="utf-8") as f:
+            json.dump([{"title": "Café, [A]", "price": 1.25}], f)
+        sales = [
+            {"Sale": f"S{i}, {{\"x\": [{i}]}}", "Products": [
+                {"title": "Café, [A]", "quantity": i},
+                {"title": "Nope" if i % 6 else "Café, [A]", "quantity": 1},
+            ]}
+            for i in range(60)
+        ]
+        sales.insert(10, [1, 2])
+        with open(sales_path, "w", encoding="utf-8") as f:
+            json.dump(sales, f, ensure_ascii=False, indent=1)
+        expected = cs.run_compute_sales(cat_path, sales_path)
+        with mock.patch.object(sp, "ARRAY_SHARD_BYTES", 500), \
+                mock.patch.object(sp, "iter_json_array",
+                                  side_effect=AssertionError):
+            self.assertEqual(
+                cs.run_compute_sales(cat_path, sales_path, workers=3),
+                expected,
+            )
+
+    def test_parallel_invalid_json(self):
+        """Decode errors while streaming batches are reported."""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".json", delete=False
+        ) as f:
+            f.write('[{"Sale": "S1"}, oops]')
+            sales_path = f.name
+        self.addCleanup(os.unlink, sales_path)
+        text, success = cs.run_compute_sales(
+            os.path.join(os.path.dirname(__file__), "..", "data",
+                         "priceCatalogue.json"),
+            sales_path,
+            workers=2,
+        )
+        self.assertFalse(success)
+        self.assertIn("Invalid JSON", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
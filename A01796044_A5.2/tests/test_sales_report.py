@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# pylint: disable=invalid-name,wrong-import-position
+"""Unit tests for sales_report module."""
+
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source"))
+
+import sales_report as rep  # noqa: E402
+
+
+class TestErrorSummary(unittest.TestCase):
+    """Tests for categorized, bounded error summaries."""
+
+    def test_summary_counts_and_samples(self):
+        """Errors are counted per category; only a sample is kept."""
+        summary = rep.ErrorSummary(sample=2)
+        summary.append("Catalog entry 1: missing price")
+        summary.extend(
+            rep.SalesError("unknown_product", f"Sale {i}: unknown")
+            for i in range(5)
+        )
+        self.assertEqual(len(summary), 6)
+        self.assertEqual(list(summary), [
+            "Total errors: 6",
+            "catalogue: 1",
+            "  Catalog entry 1: missing price",
+            "unknown_product: 5",
+            "  Sale 0: unknown",
+            "  Sale 1: unknown",
+            "  ... 3 more",
+        ])
+
+    def test_sales_error_pickles(self):
+        """Errors keep their category on the way back from workers."""
+        error = pickle.loads(pickle.dumps(
+            rep.SalesError("invalid_quantity", "Sale 1: bad quantity")
+        ))
+        self.assertEqual(error, "Sale 1: bad quantity")
+        self.assertEqual(error.category, "invalid_quantity")
+
+
+class TestSalesAnalytics(unittest.TestCase):
+    """Tests for per-product and sale size analytics."""
+
+    price_map = {"Pen": 15000, "Book": 120000, "Lamp": 400000}
+    sales = [
+        (15000, [("Pen", 1, 15000)]),
+        (150000, [("Pen", 2, 30000), ("Book", 1, 120000)]),
+        (165000, [("Pen", 3, 45000), ("Book", 1, 120000)]),
+        (135000, [("Pen", 1, 15000), ("Book", 1, 120000)]),
+    ]
+
+    def test_counters(self):
+        """Units, revenue and sale sizes are counted per product."""
+        analytics = rep.SalesAnalytics(self.price_map)
+        for sale_total, items in self.sales:
+            analytics.add_sale(sale_total, items)
+        self.assertEqual(analytics.units, [7, 3, 0])
+        self.assertEqual(analytics.revenue, [105000, 360000, 0])
+        self.assertEqual(analytics.size_counts, [1, 3, 0, 0, 0, 0])
+        self.assertEqual([analytics.titles[i]
+                          for i in analytics.top_products(5)],
+                         ["Book", "Pen"])
+
+    def test_take_and_merge_counters(self):
+        """Counters taken from workers merge into the same totals."""
+        merged = rep.SalesAnalytics(self.price_map)
+        worker = rep.SalesAnalytics(self.price_map)
+        for sale_total, items in self.sales:
+            worker.add_sale(sale_total, items)
+            merged.merge_counters(worker.take_counters())
+        self.assertEqual(worker.sales, 0)
+        self.assertEqual(worker.units, [0, 0, 0])
+        self.assertEqual(merged.units, [7, 3, 0])
+        self.assertEqual(merged.size_counts, [1, 3, 0, 0, 0, 0])
+        self.assertEqual(merged.total, 465000)
+
+
+class TestSalesReport(unittest.TestCase):
+    """Tests for the per-sale details and the report text."""
+
+    def test_details_spooled_and_exported(self):
+        """SaleDetails writes the same report as a list of details."""
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "details.csv")
+            details = rep.SaleDetails(csv_path)
+            details.extend([("Sale 1", 105000), ("Sale 2", 12)])
+            text = rep.format_sales_report(details, 105012, [], True)
+            details.close()
+            with open(csv_path, encoding="utf-8") as f:
+                rows = f.read().splitlines()
+        self.assertEqual(text, rep.format_sales_report(
+            [("Sale 1", 105000), ("Sale 2", 12)], 105012, [], True
+        ))
+        self.assertIn("Total number of sales: 2\nGrand total: $10.50\n",
+                      text)
+        self.assertIn("  1. Sale 1: $10.50\n  2. Sale 2: $0.00\n", text)
+        self.assertEqual(rows, [
+            "sale_number,sale,total_cents",
+            "1,Sale 1,1050",
+            "2,Sale 2,0.12",
+        ])
+
+    def test_errors_section(self):
+        """Errors follow the details under their own heading."""
+        text = rep.format_sales_report(
+            [("Sale 1", 2.5)], 2.5, ["Sale 2: invalid record"]
+        )
+        self.assertIn("  1. Sale 1: $2.50\n", text)
+        self.assertTrue(text.endswith(
+            "Warnings/Errors (execution continued):\n" + "-" * 40 +
+            "\nSale 2: invalid record\n"
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
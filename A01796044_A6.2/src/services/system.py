@@ -7,6 +7,7 @@ import json
 import os
 
 from ..models import Hotel, Customer, Reservation
+from . import json_backend
 
 
 class ReservationSystem:
@@ -51,7 +52,7 @@ class ReservationSystem:
                     content = f.read()
                     if not content.strip():
                         return default
-                    return json.loads(content)
+                    return json_backend.loads(content)
             return default
         except json.JSONDecodeError as err:
             print(f"Error: Invalid JSON in {filepath}: {err}")
@@ -73,7 +74,8 @@ class ReservationSystem:
         """
         try:
             with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.write(json_backend.dumps(data, indent=2,
+                                           ensure_ascii=False))
             return True
         except IOError as err:
             print(f"Error writing file {filepath}: {err}")
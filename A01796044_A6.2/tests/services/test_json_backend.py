@@ -0,0 +1,85 @@
+"""Unit tests for the JSON backend used by ReservationSystem."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src import ReservationSystem
+from src.services import json_backend
+
+
+class TestJsonBackend(unittest.TestCase):
+    """Every available backend behaves exactly like the stdlib json."""
+
+    def setUp(self):
+        """Remember the backend in use and create a data directory."""
+        self.original = json_backend.backend_name()
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Restore the backend and remove the data directory."""
+        json_backend.set_backend(self.original)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def available_backends(self):
+        """Return the names of the installed backends."""
+        return sorted({json_backend.set_backend(name)
+                       for name in json_backend.BACKENDS})
+
+    def test_saved_file_matches_json_dump(self):
+        """Test that every backend writes the same text as json.dump."""
+        hotel = {'hotel_id': 'H001', 'name': 'Hotel Plaza Ñ',
+                 'total_rooms': 50, 'reserved_rooms': 2}
+        datasets = ([], [hotel], [dict(hotel, rating=1e16, notes=None)],
+                    [dict(hotel, rating=1e-05)],
+                    [dict(hotel, rating=1.5e-05, discount=0.0001)])
+        for name in self.available_backends():
+            json_backend.set_backend(name)
+            system = ReservationSystem(data_dir=self.temp_dir)
+            for data in datasets:
+                with self.subTest(backend=name, data=data):
+                    self.assertTrue(
+                        system._save_json_file(system.hotels_file, data)
+                    )
+                    with open(system.hotels_file, 'r',
+                              encoding='utf-8') as f:
+                        self.assertEqual(
+                            f.read(),
+                            json.dumps(data, indent=2, ensure_ascii=False)
+                        )
+                    self.assertEqual(
+                        system._load_json_file(system.hotels_file), data
+                    )
+
+    def test_invalid_json_message_matches_json(self):
+        """Test that invalid JSON reports the stdlib error message."""
+        for name in self.available_backends():
+            json_backend.set_backend(name)
+            for doc in ('not valid json {', '[1, 2', '{"a": 1,}', '01', '05',
+                        '-', '[1.]', '["\t"]', '5.e3471179'):
+                with self.subTest(backend=name, doc=doc):
+                    with self.assertRaises(json.JSONDecodeError) as expected:
+                        json.loads(doc)
+                    with self.assertRaises(json.JSONDecodeError) as got:
+                        json_backend.loads(doc)
+                    self.assertEqual(str(got.exception),
+                                     str(expected.exception))
+            self.assertEqual(json_backend.loads('[12345678901234567890123]'),
+                             [12345678901234567890123])
+
+    def test_missing_backend_falls_back_to_json(self):
+        """Test that uninstalled backends fall back to the stdlib json."""
+        with patch.dict(sys.modules, {'orjson': None}):
+            self.assertEqual(json_backend.set_backend('orjson'), 'json')
+        path = os.path.join(self.temp_dir, 'data.json')
+        system = ReservationSystem(data_dir=self.temp_dir)
+        self.assertTrue(system._save_json_file(path, [{'id': 1}]))
+        self.assertEqual(system._load_json_file(path), [{'id': 1}])
+
+
+if __name__ == '__main__':
+    unittest.main()